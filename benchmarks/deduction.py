@@ -0,0 +1,90 @@
+"""Compare the proofs of the theorems of theorem.py built with the plain and
+the compact Deduction, in size and build time.
+
+Run from the repository root: python benchmarks/deduction.py
+"""
+import inspect
+import sys
+from functools import partial
+
+sys.path.append("./src")
+
+from timing import bench
+
+import theorem
+from prop import ImplyProp, NotProp, VarProp
+from theorem import Deduction, MultiDeduction, Theorem
+from variable import Variable
+
+REPEAT = 5
+
+
+def compacted(build) -> Theorem:
+    """build(), with every Deduction and MultiDeduction of theorem.py compact."""
+    theorem.Deduction = partial(Deduction, compact=True)  # type: ignore
+    theorem.MultiDeduction = partial(MultiDeduction, compact=True)  # type: ignore
+    try:
+        return build()
+    finally:
+        theorem.Deduction = Deduction  # type: ignore
+        theorem.MultiDeduction = MultiDeduction  # type: ignore
+
+
+def theorems() -> list[tuple[str, type, list]]:
+    """Every theorem built from props and variables only, with its arguments."""
+    x = Variable("x")
+    y = Variable("y")
+    vpb = VarProp(Variable("b"))
+    props = [
+        ImplyProp(VarProp(x), VarProp(Variable("a"))),
+        NotProp(vpb),
+        VarProp(Variable("c")),
+        VarProp(Variable("d")),
+    ]
+    found = []
+    for name, cls in inspect.getmembers(theorem, inspect.isclass):
+        if not issubclass(cls, Theorem) or cls is Theorem:
+            continue
+        params = list(inspect.signature(cls.__init__).parameters.values())[1:]
+        kinds = [p.annotation for p in params]
+        if not kinds or any(k not in ("Prop", "Variable") for k in kinds):
+            continue
+        pools = {"Prop": iter(props), "Variable": iter([x, y])}
+        try:
+            args = [next(pools[k]) for k in kinds]
+        except StopIteration:
+            continue
+        found.append((name, cls, args))
+    return found
+
+
+def main() -> None:
+    print(
+        f"{'':<32}{'plain nodes':>12}{'steps':>10}{'time':>10}"
+        f"{'compact nodes':>15}{'steps':>10}{'time':>10}{'ratio':>8}"
+    )
+    total = [0, 0]
+    for name, cls, args in theorems():
+        try:
+            plain_time, plain = bench(lambda: cls(*args), REPEAT)
+            compact_time, compact = bench(lambda: compacted(lambda: cls(*args)), REPEAT)
+        except ValueError:
+            continue
+        assert compact.proof.prop is plain.proof.prop
+        plain_steps, plain_nodes = plain.proof.steps()
+        steps, nodes = compact.proof.steps()
+        total[0] += plain_nodes
+        total[1] += nodes
+        print(
+            f"{name:<32}{plain_nodes:>12}{plain_steps:>10}{plain_time * 1e3:>8.2f}ms"
+            f"{nodes:>15}{steps:>10}{compact_time * 1e3:>8.2f}ms"
+            f"{nodes / plain_nodes:>8.2f}"
+        )
+    print(
+        f"{'total':<32}{total[0]:>12}{'':>20}{total[1]:>15}{'':>20}"
+        f"{total[1] / total[0]:>8.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
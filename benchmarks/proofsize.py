@@ -0,0 +1,80 @@
+"""Compare the proofs built by completeness.Kalmar with the hand-written
+theorems of theorem.py, in size and build time.
+
+Run from the repository root: python benchmarks/proofsize.py
+"""
+import sys
+
+sys.path.append("./src")
+
+from timing import bench
+
+from completeness import Kalmar
+from prop import IIFProp, VarProp
+from theorem import (
+    Contradiction,
+    DoubleNotElim,
+    DoubleNotIntro,
+    ImplyNotExchange,
+    NotImplyExchange,
+    NotImplyIntro,
+    NotImplyToLeft,
+    NotImplyToNotRight,
+    NotToNotElim,
+    NotToNotIntro,
+    Reflexive,
+)
+from variable import Variable
+
+REPEAT = 5
+
+
+def main() -> None:
+    vpa = VarProp(Variable("a"))
+    vpb = VarProp(Variable("b"))
+    theorems = [
+        ("Reflexive", lambda: Reflexive(vpa)),
+        ("DoubleNotElim", lambda: DoubleNotElim(vpa)),
+        ("DoubleNotIntro", lambda: DoubleNotIntro(vpa)),
+        ("NotToNotElim", lambda: NotToNotElim(vpa, vpb)),
+        ("NotToNotIntro", lambda: NotToNotIntro(vpa, vpb)),
+        ("Contradiction", lambda: Contradiction(vpa, vpb)),
+        ("ImplyNotExchange", lambda: ImplyNotExchange(vpa, vpb)),
+        ("NotImplyExchange", lambda: NotImplyExchange(vpa, vpb)),
+        ("NotImplyToLeft", lambda: NotImplyToLeft(vpa, vpb)),
+        ("NotImplyToNotRight", lambda: NotImplyToNotRight(vpa, vpb)),
+        ("NotImplyIntro", lambda: NotImplyIntro(vpa, vpb)),
+    ]
+    print(
+        f"{'':<20}{'hand nodes':>11}{'steps':>9}{'time':>10}"
+        f"{'kalmar nodes':>14}{'steps':>9}{'time':>10}{'cached':>10}"
+    )
+    for name, build in theorems:
+        hand_time, hand = bench(lambda: build().proof, REPEAT)
+        goal = hand.prop
+        fresh_time, proof = bench(lambda: Kalmar().prove(goal), REPEAT)
+        kalmar = Kalmar()
+        kalmar.prove(goal)
+        cached_time, _ = bench(lambda: kalmar.prove(goal), REPEAT)
+        hand_steps, hand_nodes = hand.steps()
+        steps, nodes = proof.steps()
+        print(
+            f"{name:<20}{hand_nodes:>11}{hand_steps:>9}{hand_time * 1e3:>8.2f}ms"
+            f"{nodes:>14}{steps:>9}{fresh_time * 1e3:>8.2f}ms"
+            f"{cached_time * 1e3:>8.2f}ms"
+        )
+    # Goals over more atoms: (a0 <=> ... <=> an) <=> (an <=> ... <=> a0).
+    for n in (3, 5, 7):
+        vps = [VarProp(Variable(f"a{i}")) for i in range(n)]
+        left, right = vps[0], vps[-1]
+        for i in range(1, n):
+            left = IIFProp(left, vps[i])
+            right = IIFProp(right, vps[n - 1 - i])
+        goal = IIFProp(left, right)
+        fresh_time, proof = bench(lambda: Kalmar().prove(goal), REPEAT)
+        steps, nodes = proof.steps()
+        print(f"{f'{n} atoms':<60}{nodes:>14}{steps:>9}{fresh_time * 1e3:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Timing helper shared by the benchmarks."""
+import gc
+import time
+from typing import Any, Callable
+
+
+def bench(build: Callable[[], Any], repeat: int = 1) -> tuple[float, Any]:
+    """The best time of repeat calls of build(), and the result of the last.
+
+    Like timeit, run with the garbage collector off to keep timings stable.
+    """
+    best = float("inf")
+    result = None
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = build()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best, result
@@ -0,0 +1,175 @@
+"""Compare the stack-based Prop traversals with plain recursive versions.
+
+The recursive versions are reference implementations written here in the
+style of the methods before the traversal engine, not the original methods
+themselves. On plain trees eval, substitute and replacement are no faster
+on the stack, replacement being somewhat slower: what the stack buys there
+is depth beyond the recursion limit. The speedups are for __eq__ and
+__str__, and for formulas that reuse subformulas.
+
+Run from the repository root: python benchmarks/traversal.py
+"""
+import random
+import sys
+
+sys.path.append("./src")
+
+from timing import bench
+
+from prop import (
+    AliasProp,
+    AndProp,
+    ExistProp,
+    ForallProp,
+    IIFProp,
+    ImplyProp,
+    NotProp,
+    OrProp,
+    Prop,
+    VarProp,
+)
+from variable import Variable
+
+DEPTH = 2000
+FORMULAS = 20
+REPEAT = 5
+
+
+def random_prop(
+    rng: random.Random, depth: int, variables: list, shared: bool = False
+) -> Prop:
+    """A random chain of connectives depth levels deep over the variables.
+
+    With shared, the second operand of a binary connective is one of the
+    first few subformulas of the chain instead of a variable, so the result
+    is a DAG that reuses small subformulas, as the formulas in proofs do.
+    """
+    p = VarProp(rng.choice(variables))
+    pool = [p]
+    for _ in range(depth):
+        if shared:
+            q = rng.choice(pool[:20])
+        else:
+            q = VarProp(rng.choice(variables))
+        left, right = (p, q) if rng.random() < 0.5 else (q, p)
+        kind = rng.randrange(7)
+        if kind == 0:
+            p = NotProp(p)
+        elif kind == 1:
+            p = ImplyProp(left, right)
+        elif kind == 2:
+            p = ForallProp(rng.choice(variables), p)
+        elif kind == 3:
+            p = AndProp(left, right)
+        elif kind == 4:
+            p = OrProp(left, right)
+        elif kind == 5:
+            p = IIFProp(left, right)
+        else:
+            p = ExistProp(rng.choice(variables), p)
+        pool.append(p)
+    return p
+
+
+# Recursive reference implementations, as the methods were written before the
+# traversal engine. Like the old eval(), rec_eval() evaluates every node once.
+def rec_eval(p: Prop, memo: dict) -> Prop:
+    if not p._alias:
+        return p
+    if id(p) not in memo:
+        args = [rec_eval(a, memo) if isinstance(a, Prop) else a for a in p.args()]
+        if isinstance(p, AliasProp):
+            memo[id(p)] = rec_eval(p.expand(*args), memo)
+        else:
+            memo[id(p)] = p.__class__(*args)
+    return memo[id(p)]
+
+
+def rec_substitute(p: Prop, x: Variable, y: Variable) -> Prop:
+    if not (p.isfree(x) or p.isbounded(x)):
+        return p
+    if isinstance(p, VarProp):
+        return VarProp(y)
+    args = [
+        rec_substitute(a, x, y) if isinstance(a, Prop) else (y if a is x else a)
+        for a in p.args()
+    ]
+    return p.__class__(*args)
+
+
+def rec_replacement(p: Prop, p1: Prop, p2: Prop) -> Prop:
+    if rec_eq(p, p1):
+        return p2
+    if isinstance(p, VarProp):
+        return p
+    args = [rec_replacement(a, p1, p2) if isinstance(a, Prop) else a for a in p.args()]
+    return p.__class__(*args)
+
+
+def rec_eq(p: Prop, q: Prop) -> bool:
+    if p is q:
+        return True
+    if p._evalhash != q._evalhash or not p._alias:
+        return False
+    if isinstance(p, AliasProp):
+        return rec_eval(p, {}) is rec_eval(q, {})
+    if p.__class__ is not q.__class__:
+        return False
+    for a, b in zip(p.args(), q.args()):
+        if isinstance(a, Prop):
+            if not rec_eq(a, b):
+                return False
+        elif a is not b:
+            return False
+    return True
+
+
+def rec_str(p: Prop) -> str:
+    return "".join(a if isinstance(a, str) else rec_str(a) for a in p.parts())
+
+
+def main() -> None:
+    sys.setrecursionlimit(20 * DEPTH)
+    variables = [Variable(name) for name in "abcxyz"]
+    x, y = variables[3], Variable("w")
+    vpa, vpb = VarProp(variables[0]), VarProp(variables[1])
+    cases = [
+        ("eval", lambda p: rec_eval(p, {}), lambda p: p.eval()),
+        ("substitute", lambda p: rec_substitute(p, x, y), lambda p: p.substitute(x, y)),
+        (
+            "replacement",
+            lambda p: rec_replacement(p, vpa, vpb),
+            lambda p: p.replacement(vpa, vpb),
+        ),
+        ("__eq__", lambda p: rec_eq(p, p.prop), lambda p: p == p.prop),
+        ("__str__", rec_str, str),
+    ]
+    print(f"{'':<24}{'recursive':>13}{'stack':>13}{'ratio':>8}")
+    seed = 0
+    for shared in (False, True):
+        for name, recursive, iterative in cases:
+            best = [float("inf"), float("inf")]
+            for _ in range(REPEAT):
+                seed += 1
+                for i, func in enumerate((recursive, iterative)):
+                    # The same formulas, built afresh: the previous ones are
+                    # gone, and the eval() cache with them.
+                    rng = random.Random(seed)
+                    props = [
+                        random_prop(rng, DEPTH, variables, shared)
+                        for _ in range(FORMULAS)
+                    ]
+                    if name == "__eq__":
+                        props = [AndProp(p, vpa) for p in props]
+                    elapsed, _ = bench(lambda props=props: [func(p) for p in props])
+                    best[i] = min(best[i], elapsed)
+                    del props
+            label = f"{name}{' (shared)' if shared else ''}"
+            print(
+                f"{label:<24}{best[0] * 1000:10.1f} ms{best[1] * 1000:10.1f} ms"
+                f"{best[0] / best[1]:8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional, Sequence
+
+from prop import ImplyProp, NotProp, Prop, VarProp
+
+# The two terminal nodes of every BDD.
+FALSE = 0
+TRUE = 1
+
+
+class BDD:
+    """A reduced ordered binary decision diagram manager.
+
+    Nodes are ints: FALSE, TRUE, or the index of a decision node (var, lo,
+    hi), read as "if var then hi else lo". The unique table keeps a single
+    node per triple and no node with lo == hi, so each boolean function of
+    the atoms has exactly one node, and two functions are equal exactly when
+    their nodes are. A node keeps its function, and so its number, when the
+    variables are reordered.
+
+    Variables are the VarProp atoms of the props built, numbered in order of
+    first appearance and initially ordered the same way.
+    """
+
+    __slots__ = (
+        "atoms",
+        "_index",
+        "_order",
+        "_level",
+        "_var",
+        "_lo",
+        "_hi",
+        "_unique",
+        "_nodes",
+        "_free",
+        "_cache",
+    )
+
+    def __init__(self, atoms: Iterable[VarProp] = ()) -> None:
+        self.atoms: list[VarProp] = []
+        self._index: dict[VarProp, int] = {}
+        # Variables by level from the root, and the level of each variable.
+        self._order: list[int] = []
+        self._level: list[int] = []
+        # Decision nodes; the entries of the terminals are placeholders.
+        self._var: list[int] = [-1, -1]
+        self._lo: list[int] = [FALSE, TRUE]
+        self._hi: list[int] = [FALSE, TRUE]
+        self._unique: dict[tuple[int, int, int], int] = {}
+        # Decision nodes by variable, needed to swap adjacent levels.
+        self._nodes: list[set[int]] = []
+        # Indices of collected nodes, to reuse.
+        self._free: list[int] = []
+        # Computed table of ite().
+        self._cache: dict[tuple[int, int, int], int] = {}
+        for atom in atoms:
+            self.var(atom)
+
+    def var(self, atom: VarProp) -> int:
+        """The node of the atom, adding it below all others if it is new."""
+        x = self._index.get(atom)
+        if x is None:
+            x = self._index[atom] = len(self.atoms)
+            self.atoms.append(atom)
+            self._level.append(len(self._order))
+            self._order.append(x)
+            self._nodes.append(set())
+        return self._mk(x, FALSE, TRUE)
+
+    def _mk(self, x: int, lo: int, hi: int) -> int:
+        if lo == hi:
+            return lo
+        key = (x, lo, hi)
+        u = self._unique.get(key)
+        if u is None:
+            if self._free:
+                u = self._free.pop()
+                self._var[u] = x
+                self._lo[u] = lo
+                self._hi[u] = hi
+            else:
+                u = len(self._var)
+                self._var.append(x)
+                self._lo.append(lo)
+                self._hi.append(hi)
+            self._unique[key] = u
+            self._nodes[x].add(u)
+        return u
+
+    def ite(self, f: int, g: int, h: int) -> int:
+        """The node of "if f then g else h".
+
+        Driven by an explicit stack, so the number of variables is not limited
+        by the recursion limit. Every call is cached in the computed table.
+        """
+        var = self._var
+        lo = self._lo
+        hi = self._hi
+        level = self._level
+        cache = self._cache
+        results: list[int] = []
+        stack: list[tuple] = [(f, g, h)]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            item = pop()
+            if len(item) == 4:
+                # Both cofactors are done: combine them.
+                r1 = results.pop()
+                r0 = results.pop()
+                f, g, h, x = item
+                r = cache[(f, g, h)] = self._mk(x, r0, r1)
+                results.append(r)
+                continue
+            f, g, h = item
+            if f == TRUE or g == h:
+                results.append(g)
+                continue
+            if f == FALSE:
+                results.append(h)
+                continue
+            if g == TRUE and h == FALSE:
+                results.append(f)
+                continue
+            r = cache.get(item)
+            if r is not None:
+                results.append(r)
+                continue
+            top = level[var[f]]
+            if g > TRUE and level[var[g]] < top:
+                top = level[var[g]]
+            if h > TRUE and level[var[h]] < top:
+                top = level[var[h]]
+            x = self._order[top]
+            f0, f1 = (lo[f], hi[f]) if var[f] == x else (f, f)
+            g0, g1 = (lo[g], hi[g]) if g > TRUE and var[g] == x else (g, g)
+            h0, h1 = (lo[h], hi[h]) if h > TRUE and var[h] == x else (h, h)
+            push((f, g, h, x))
+            push((f1, g1, h1))
+            push((f0, g0, h0))
+        return results[0]
+
+    def neg(self, f: int) -> int:
+        return self.ite(f, FALSE, TRUE)
+
+    def implies(self, f: int, g: int) -> int:
+        return self.ite(f, g, TRUE)
+
+    def build(self, p: Prop) -> int:
+        """The node of p.eval(), adding its atoms as needed.
+
+        Raise:
+            ValueError: if p has quantifiers.
+        """
+        root = p.eval()
+        done: dict[int, int] = {}
+        stack: list = [root]
+        while stack:
+            node = stack.pop()
+            if id(node) in done:
+                continue
+            cls = node.__class__
+            if cls is VarProp:
+                done[id(node)] = self.var(node)  # type: ignore
+                continue
+            missing = [c for c in node.children() if id(c) not in done]
+            if missing:
+                stack.append(node)
+                stack.extend(missing)
+            elif cls is NotProp:
+                done[id(node)] = self.neg(done[id(node.child)])
+            elif cls is ImplyProp:
+                left = done[id(node.left_child)]
+                done[id(node)] = self.implies(left, done[id(node.right_child)])
+            else:
+                raise ValueError(f"BDD.build(): {node.getname()} is not propositional")
+        return done[id(root)]
+
+    def countermodel(self, f: int) -> Optional[dict[VarProp, bool]]:
+        """Values of some atoms making f false whatever the others are, or
+        None if f is TRUE."""
+        if f == TRUE:
+            return None
+        model: dict[VarProp, bool] = {}
+        # Every decision node is a non-constant function, so it has a path to
+        # FALSE through lo unless lo is TRUE.
+        while f != FALSE:
+            x = self._var[f]
+            if self._lo[f] != TRUE:
+                model[self.atoms[x]] = False
+                f = self._lo[f]
+            else:
+                model[self.atoms[x]] = True
+                f = self._hi[f]
+        return model
+
+    def order(self) -> list[VarProp]:
+        """The atoms from the root level down."""
+        return [self.atoms[x] for x in self._order]
+
+    def size(self, roots: Iterable[int]) -> int:
+        """The number of decision nodes reachable from roots."""
+        return len(self._reachable(roots))
+
+    def _reachable(self, roots: Iterable[int]) -> set[int]:
+        seen: set[int] = set()
+        stack = [u for u in roots if u > TRUE]
+        while stack:
+            u = stack.pop()
+            if u in seen:
+                continue
+            seen.add(u)
+            for v in (self._lo[u], self._hi[u]):
+                if v > TRUE and v not in seen:
+                    stack.append(v)
+        return seen
+
+    def collect(self, roots: Iterable[int]) -> None:
+        """Free the decision nodes not reachable from roots, whose numbers
+        may then be reused by new nodes."""
+        live = self._reachable(roots)
+        for x, nodes in enumerate(self._nodes):
+            dead = nodes - live
+            for u in dead:
+                del self._unique[(x, self._lo[u], self._hi[u])]
+            nodes -= dead
+            self._free.extend(dead)
+        # Cached results may name freed nodes.
+        self._cache.clear()
+
+    def _swap(self, i: int) -> None:
+        """Swap the variables at levels i and i + 1, keeping every node's
+        function."""
+        x = self._order[i]
+        y = self._order[i + 1]
+        var = self._var
+        lo = self._lo
+        hi = self._hi
+        for f in list(self._nodes[x]):
+            f0 = lo[f]
+            f1 = hi[f]
+            ylo = f0 > TRUE and var[f0] == y
+            yhi = f1 > TRUE and var[f1] == y
+            if not ylo and not yhi:
+                # f does not test y: it just moves down a level.
+                continue
+            f00, f01 = (lo[f0], hi[f0]) if ylo else (f0, f0)
+            f10, f11 = (lo[f1], hi[f1]) if yhi else (f1, f1)
+            del self._unique[(x, f0, f1)]
+            self._nodes[x].discard(f)
+            # f = y ? (x ? f11 : f01) : (x ? f10 : f00), and both cofactors
+            # differ as f tests y.
+            g0 = self._mk(x, f00, f10)
+            g1 = self._mk(x, f01, f11)
+            var[f] = y
+            lo[f] = g0
+            hi[f] = g1
+            self._unique[(y, g0, g1)] = f
+            self._nodes[y].add(f)
+        self._order[i] = y
+        self._order[i + 1] = x
+        self._level[y] = i
+        self._level[x] = i + 1
+
+    def reorder(
+        self, roots: Sequence[int], order: Optional[Sequence[VarProp]] = None
+    ) -> None:
+        """Reorder the variables, freeing the nodes not reachable from roots.
+
+        With order, a permutation of self.atoms, the variables are put in that
+        order. Without it, each variable in turn, those with the most nodes
+        first, is sifted to the level where the fewest nodes are reachable
+        from roots. Nodes reachable from roots keep their numbers.
+
+        Raise:
+            ValueError: if order is not a permutation of self.atoms.
+        """
+        self.collect(roots)
+        if order is not None:
+            target = [self._index.get(atom, -1) for atom in order]
+            if sorted(target) != list(range(len(self.atoms))):
+                raise ValueError("BDD.reorder(): order should list every atom once")
+            # Bubble each variable up to its place.
+            for i, x in enumerate(target):
+                for j in range(self._level[x], i, -1):
+                    self._swap(j - 1)
+            self.collect(roots)
+            return
+        for x in sorted(range(len(self._order)), key=lambda x: -len(self._nodes[x])):
+            self._sift(roots, x)
+
+    def _sift(self, roots: Sequence[int], x: int) -> None:
+        """Move x through every level, then back to the one where the fewest
+        nodes are reachable from roots."""
+        n = len(self._order)
+        start = self._level[x]
+        best = start
+        least = len(self._unique)
+        for i in range(start, n - 1):
+            self._swap(i)
+            self.collect(roots)
+            if len(self._unique) < least:
+                best = i + 1
+                least = len(self._unique)
+        for i in range(n - 1, 0, -1):
+            self._swap(i - 1)
+            self.collect(roots)
+            if len(self._unique) < least:
+                best = i - 1
+                least = len(self._unique)
+        for i in range(best):
+            self._swap(i)
+        self.collect(roots)
+
+
+def istautology(p: Prop) -> bool:
+    """Whether p is true under every assignment of its atoms."""
+    return BDD().build(p) == TRUE
+
+
+def equivalent(p1: Prop, p2: Prop) -> bool:
+    """Whether p1 and p2 have the same truth value under every assignment."""
+    bdd = BDD()
+    return bdd.build(p1) == bdd.build(p2)
+
+
+def countermodel(p: Prop) -> Optional[dict[VarProp, bool]]:
+    """An assignment of the atoms of p making it false, or None if there is
+    none. Atoms whose value does not matter are false."""
+    bdd = BDD()
+    model = bdd.countermodel(bdd.build(p))
+    if model is None:
+        return None
+    return {atom: model.get(atom, False) for atom in bdd.atoms}
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import truthtable
+from proof import Assumption, Axiom1, FromEvalAxiom, ModusPonens, Proof
+from prop import ImplyProp, NotProp, Prop, VarProp
+from theorem import (
+    Contradiction,
+    Deduction,
+    DoubleNotIntro,
+    NotImplyIntro,
+    NotToNotElim,
+    Transitive,
+)
+
+
+class Kalmar:
+    """Proofs of propositional tautologies from Axiom1-3 and ModusPonens, by
+    Kalmar's completeness construction.
+
+    For a row, an assignment of the atoms, let a literal be an atom if it is
+    true in the row and its negation otherwise, and let B' be B if B is true
+    in the row and !B otherwise. Every subformula B of the goal gets a proof
+    of B' from the literals of its own atoms, by induction on B. For a
+    tautology A that is a proof of A from the literals of each row; rows
+    differing in the last atom a are then merged by discharging a and !a and
+    applying Contradiction(a, A), until no literal is left.
+
+    Every proof is cached: those of B' by B and the values of the atoms of B
+    only, so a subformula is handled once per assignment of its own atoms
+    rather than once per row, the lemmas of each connective by their props,
+    and merged proofs by the two proofs merged. Literals are discharged by
+    Deduction, whose output for a subproof is the same node each time, as
+    proofs are hash-consed. Proofs are DAGs sharing all of these, and a
+    Kalmar object keeps its caches from one goal to the next.
+    """
+
+    def __init__(self) -> None:
+        self._lemmas: dict[tuple, Proof] = {}
+        self._rows: dict[tuple[Prop, int], Proof] = {}
+        self._merged: dict[tuple[int, int], Proof] = {}
+        # Atoms are numbered across goals, so that the cached proofs of a
+        # subformula are found by the values of its atoms whatever the goal.
+        self._bits: dict[VarProp, int] = {}
+        # _merged is keyed by id(): this keeps the proofs merged, and so every
+        # node in them, alive.
+        self._roots: list[Proof] = []
+
+    def prove(self, p: Prop) -> Proof:
+        """A proof of p without assumptions.
+
+        Alias connectives are proved through p.eval(), with one FromEvalAxiom
+        step at the end; the rest of the proof only uses Axiom1, Axiom2,
+        Axiom3 and ModusPonens.
+
+        Raise:
+            ValueError: if p is not a tautology or has quantifiers.
+        """
+        goal = p.eval()
+        atoms = truthtable.atoms(goal)
+        model = truthtable.countermodel(goal)
+        if model is not None:
+            row = ", ".join(f"{a}={int(v)}" for a, v in model.items())
+            raise ValueError(f"Kalmar.prove(): not a tautology, false for {row}")
+        bits = [self._bits.setdefault(a, 1 << len(self._bits)) for a in atoms]
+        masks = self._masks(goal, atoms, bits)
+        rows = [0]
+        for bit in bits:
+            rows += [row | bit for row in rows]
+        proofs = [self._row(goal, row, masks) for row in rows]
+        for i in range(len(atoms) - 1, -1, -1):
+            atom = atoms[i]
+            half = 1 << i
+            proofs = [
+                self._merge(atom, proofs[r | half], proofs[r]) for r in range(half)
+            ]
+        proof = proofs[0]
+        if goal is not p:
+            proof = ModusPonens(proof, FromEvalAxiom(p))
+        return proof
+
+    def _lemma(self, name: str, *props: Prop) -> Proof:
+        """The closed lemma name over props, built once."""
+        key = (name, *props)
+        proof = self._lemmas.get(key)
+        if proof is None:
+            if name == "double":
+                # a => !!a
+                proof = DoubleNotIntro(*props).proof
+            elif name == "false":
+                # !a => (a => b)
+                a, b = props
+                proof = Transitive(
+                    Axiom1(NotProp(a), NotProp(b)), NotToNotElim(b, a).proof
+                ).proof
+            elif name == "true":
+                # b => (a => b)
+                a, b = props
+                proof = Axiom1(b, a)
+            elif name == "notimply":
+                # a => (!b => !(a => b))
+                proof = NotImplyIntro(*props).proof
+            else:
+                # (a => b) => ((!a => b) => b)
+                proof = Contradiction(*props).proof
+            self._lemmas[key] = proof
+        return proof
+
+    def _masks(
+        self, goal: Prop, atoms: list[VarProp], bits: list[int]
+    ) -> dict[int, int]:
+        """The bitmask of the atoms of each subformula, by id()."""
+        masks: dict[int, int] = {id(a): bit for a, bit in zip(atoms, bits)}
+        stack: list = [goal]
+        while stack:
+            node = stack.pop()
+            if id(node) in masks:
+                continue
+            missing = [c for c in node.children() if id(c) not in masks]
+            if missing:
+                stack.append(node)
+                stack.extend(missing)
+                continue
+            mask = 0
+            for c in node.children():
+                mask |= masks[id(c)]
+            masks[id(node)] = mask
+        return masks
+
+    def _row(self, goal: Prop, row: int, masks: dict[int, int]) -> Proof:
+        """The proof of goal' from the literals of row, the bit of each atom
+        in row being its value."""
+        rows = self._rows
+        stack: list = [goal]
+        while stack:
+            node = stack.pop()
+            key = (node, row & masks[id(node)])
+            if key in rows:
+                continue
+            cls = node.__class__
+            if cls is VarProp:
+                bit = masks[id(node)]
+                rows[key] = Assumption(node if row & bit else NotProp(node))
+                continue
+            children = node.children()
+            missing = [c for c in children if (c, row & masks[id(c)]) not in rows]
+            if missing:
+                stack.append(node)
+                stack.extend(missing)
+                continue
+            proofs = [rows[(c, row & masks[id(c)])] for c in children]
+            if cls is NotProp:
+                c = node.child
+                if proofs[0].prop is c:
+                    # c true: prove !!c.
+                    proof = ModusPonens(proofs[0], self._lemma("double", c))
+                else:
+                    proof = proofs[0]
+            elif cls is ImplyProp:
+                c, d = children
+                pc, pd = proofs
+                if pc.prop is not c:
+                    proof = ModusPonens(pc, self._lemma("false", c, d))
+                elif pd.prop is d:
+                    proof = ModusPonens(pd, self._lemma("true", c, d))
+                else:
+                    lemma = self._lemma("notimply", c, d)
+                    proof = ModusPonens(pd, ModusPonens(pc, lemma))
+            else:
+                name = node.getname()
+                raise ValueError(f"Kalmar.prove(): {name} is not propositional")
+            rows[key] = proof
+        return rows[(goal, row & masks[id(goal)])]
+
+    def _merge(self, atom: VarProp, true: Proof, false: Proof) -> Proof:
+        """A proof of the goal from the proofs assuming atom and !atom."""
+        if not true.isassumed(atom):
+            return true
+        if not false.isassumed(NotProp(atom)):
+            return false
+        key = (id(true), id(false))
+        proof = self._merged.get(key)
+        if proof is None:
+            goal = true.prop
+            self._roots.extend((true, false))
+            p1 = Deduction(Assumption(atom), true).proof  # atom => goal
+            p2 = Deduction(Assumption(NotProp(atom)), false).proof  # !atom => goal
+            lemma = self._lemma("contradiction", atom, goal)
+            proof = self._merged[key] = ModusPonens(p2, ModusPonens(p1, lemma))
+        return proof
+
+
+def prove(p: Prop) -> Proof:
+    """Kalmar().prove(p), without keeping the caches."""
+    return Kalmar().prove(p)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+from prop import ForallProp, ImplyProp, NotProp, Prop, VarProp
+from variable import Variable
+
+# A table over the variables v0, ..., v(m-1) and a domain of n elements is an
+# int of n^m bits: bit r is the value of the formula when vi takes the value
+# r // n^i % n, its i-th digit in base n. Quantifying vi is then a reduction
+# over that digit, done with n shifts of the whole table.
+MAX_ROWS = 1 << 24
+
+
+class Model:
+    """A domain {0, ..., size-1}, the predicate P = {0, ..., predicate-1},
+    and values of variables.
+
+    A VarProp x reads as P(x): it is true when the value of x is in P. One
+    predicate is shared by all atoms, as Axiom4 renames them, and an atom only
+    depends on its own variable, as Axiom5 requires, so every provable prop
+    holds in every model. Renaming elements maps models to models satisfying
+    the same props, so the elements of P are always the first ones.
+    """
+
+    __slots__ = ("size", "predicate", "values")
+
+    def __init__(self, size: int, predicate: int, values: dict[Variable, int]) -> None:
+        if not 0 <= predicate <= size or not all(
+            0 <= v < size for v in values.values()
+        ):
+            raise ValueError("Model(): values should be in range(size)")
+        self.size = size
+        self.predicate = predicate
+        self.values = values
+
+    def satisfies(self, p: Prop) -> bool:
+        """Whether p is true in this model.
+
+        Raise:
+            ValueError: if a free variable of p has no value.
+        """
+        order = variables(p)
+        row = 0
+        for i, x in enumerate(order):
+            if p.isfree(x):
+                if x not in self.values:
+                    raise ValueError(f"Model.satisfies(): {x} has no value")
+                row += self.values[x] * self.size**i
+        return table(p, self.size, self.predicate, order) >> row & 1 == 1
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{x}={v}" for x, v in self.values.items())
+        return f"Model({self.size}, {self.predicate}, {{{values}}})"
+
+
+def variables(p: Prop) -> list[Variable]:
+    """The free and bound variables of p.eval(), by Variable.index."""
+    root = p.eval()
+    found = Variable.frommask(root._free | root._bound)
+    return sorted(found, key=lambda x: x.index)
+
+
+def _column(i: int, m: int, n: int, k: int) -> int:
+    """The rows over m variables and n elements whose digit i is below k."""
+    stride = n**i
+    bits = (1 << k * stride) - 1
+    width = n * stride
+    size = n**m
+    while width < size:
+        bits |= bits << width
+        width <<= 1
+    return bits & ((1 << size) - 1)
+
+
+def table(
+    p: Prop, size: int, predicate: int, order: Optional[Sequence[Variable]] = None
+) -> int:
+    """The table of p over order, by default variables(p), in the domain of
+    size elements whose first predicate elements are in P.
+
+    Aliases are evaluated through p.eval(), and each distinct node of the
+    resulting DAG costs one big int operation, or size of them for each
+    quantifier.
+
+    Raise:
+        ValueError: if a variable of p is missing from order, or if there are
+            more than MAX_ROWS rows.
+    """
+    if order is None:
+        order = variables(p)
+    n = size
+    m = len(order)
+    if n < 1 or n**m > MAX_ROWS:
+        raise ValueError(f"table(): {n}^{m} rows, at most {MAX_ROWS} supported")
+    axes = {id(x): i for i, x in enumerate(order)}
+    return _evaluate(p.eval(), axes, m, n, predicate)
+
+
+def _evaluate(root: Prop, axes: dict[int, int], m: int, n: int, predicate: int) -> int:
+    """The table of root, the digit of each variable being given by axes."""
+    full = (1 << n**m) - 1
+    atoms: dict[int, int] = {}
+    # Rows whose digit i is 0, where a quantifier over digit i is reduced.
+    zeros: dict[int, int] = {}
+    done: dict[int, int] = {}
+    stack: list = [root]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node = pop()
+        if id(node) in done:
+            continue
+        cls = node.__class__
+        if cls is VarProp:
+            i = _axis(axes, node.variable)
+            if i not in atoms:
+                atoms[i] = _column(i, m, n, predicate)
+            done[id(node)] = atoms[i]
+            continue
+        missing = [c for c in node.children() if id(c) not in done]
+        if missing:
+            push(node)
+            stack.extend(missing)
+        elif cls is NotProp:
+            done[id(node)] = full ^ done[id(node.child)]
+        elif cls is ImplyProp:
+            left = done[id(node.left_child)]
+            done[id(node)] = (full ^ left) | done[id(node.right_child)]
+        elif cls is ForallProp:
+            i = _axis(axes, node.variable)
+            if i not in zeros:
+                zeros[i] = _column(i, m, n, 1)
+            done[id(node)] = _forall(done[id(node.child)], i, n, zeros[i])
+        else:
+            raise ValueError(f"table(): {node.getname()} is not a connective")
+    return done[id(root)]
+
+
+def _axis(axes: dict[int, int], x: Variable) -> int:
+    """The digit of x in the rows of table()."""
+    i = axes.get(id(x))
+    if i is None:
+        raise ValueError(f"table(): variable {x} is not in order")
+    return i
+
+
+def _forall(child: int, i: int, n: int, zero: int) -> int:
+    """The table of child quantified over digit i, zero being the rows whose
+    digit i is 0."""
+    stride = n**i
+    # The rows with digit i = 0 get the AND over the n values of the digit,
+    # which is then copied to the other n - 1 values.
+    result = child
+    for d in range(1, n):
+        result &= child >> d * stride
+    result &= zero
+    spread = result
+    for d in range(1, n):
+        spread |= result << d * stride
+    return spread
+
+
+def countermodel(p: Prop, maxsize: int = 2) -> Optional[Model]:
+    """A model of at most maxsize elements in which p is false, or None.
+
+    Domains are tried from the smallest, and in each the predicates P of 0 to
+    size elements, all assignments being checked at once by table(). Up to
+    renaming elements there is no other predicate.
+
+    Two elements that are both in P or both out of it satisfy the same
+    props, since there is no equality, so every model, infinite ones
+    included, satisfies the same props as one of at most 2 elements. The
+    default maxsize therefore finds a countermodel of every prop that is not
+    valid, and larger domains only repeat smaller ones.
+
+    Raise:
+        ValueError: if maxsize < 1, or if a domain has more than MAX_ROWS rows.
+    """
+    if maxsize < 1:
+        raise ValueError("countermodel(): maxsize should be at least 1")
+    order = variables(p)
+    m = len(order)
+    for n in range(1, maxsize + 1):
+        full = (1 << n**m) - 1
+        for k in range(n + 1):
+            rows = full ^ table(p, n, k, order)
+            if rows:
+                r = (rows & -rows).bit_length() - 1
+                values = {
+                    x: r // n**i % n for i, x in enumerate(order) if p.isfree(x)
+                }
+                return Model(n, k, values)
+    return None
+
+
+def isvalid(p: Prop, maxsize: int = 2) -> bool:
+    """Whether p is true in every model of at most maxsize elements, which
+    with the default maxsize means in every model."""
+    return countermodel(p, maxsize) is None
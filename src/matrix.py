@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+from itertools import chain, permutations, repeat
+from operator import add, mul
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+from proof import Proof
+from prop import ImplyProp, NotProp, Prop, VarProp
+from truthtable import atoms
+from variable import Variable
+
+Schema = Union[Prop, type]
+
+
+class Matrix:
+    """A k-valued matrix: tables for NotProp and ImplyProp over the values
+    0, ..., k-1, and the set of designated values.
+
+    A prop is valid in the matrix when it takes a designated value under every
+    assignment of its atoms.
+    """
+
+    __slots__ = ("k", "neg", "imp", "designated")
+
+    def __init__(
+        self,
+        neg: Sequence[int],
+        imp: Sequence[Sequence[int]],
+        designated: Iterable[int],
+    ) -> None:
+        k = len(neg)
+        self.k = k
+        self.neg = tuple(neg)
+        self.imp = tuple(tuple(row) for row in imp)
+        self.designated = frozenset(designated)
+        values = range(k)
+        if (
+            len(self.imp) != k
+            or any(len(row) != k for row in self.imp)
+            or not all(v in values for v in chain(self.neg, *self.imp))
+            or not self.designated <= set(values)
+        ):
+            raise ValueError("Matrix(): tables must be k by k over range(k)")
+
+    def table(self, p: Prop, order: Optional[Sequence[VarProp]] = None) -> tuple:
+        """The values of p under all k^n assignments of order, by default
+        atoms(p). Atom i takes the value r // k^i % k in row r.
+
+        Each distinct node of p.eval() is evaluated over all rows at once.
+        """
+        k = self.k
+        if order is None:
+            order = atoms(p)
+        n = len(order)
+        done: dict[int, tuple] = {}
+        for i, atom in enumerate(order):
+            block = chain.from_iterable(repeat(v, k**i) for v in range(k))
+            done[id(atom)] = tuple(block) * k ** (n - i - 1)
+        neg = self.neg.__getitem__
+        imp = tuple(chain(*self.imp)).__getitem__
+        root = p.eval()
+        stack: list = [root]
+        while stack:
+            node = stack.pop()
+            if id(node) in done:
+                continue
+            missing = [c for c in node.children() if id(c) not in done]
+            if missing:
+                stack.append(node)
+                stack.extend(missing)
+                continue
+            cls = node.__class__
+            if cls is NotProp:
+                done[id(node)] = tuple(map(neg, done[id(node.child)]))
+            elif cls is ImplyProp:
+                left = map(mul, done[id(node.left_child)], repeat(k))
+                right = done[id(node.right_child)]
+                done[id(node)] = tuple(map(imp, map(add, left, right)))
+            elif cls is VarProp:
+                raise ValueError(f"Matrix.table(): atom {node} is not in order")
+            else:
+                name = node.getname()
+                raise ValueError(f"Matrix.table(): {name} is not propositional")
+        return done[id(root)]
+
+    def countermodel(self, p: Prop) -> Optional[dict[VarProp, int]]:
+        """An assignment of the atoms of p giving it an undesignated value, or
+        None if p is valid."""
+        order = atoms(p)
+        for r, v in enumerate(self.table(p, order)):
+            if v not in self.designated:
+                return {atom: r // self.k**i % self.k for i, atom in enumerate(order)}
+        return None
+
+    def validates(self, p: Schema) -> bool:
+        """Whether the schema p is valid in this matrix."""
+        return self.countermodel(schema(p)) is None
+
+    def validatesmp(self) -> bool:
+        """Whether ModusPonens preserves designated values."""
+        d = self.designated
+        undesignated = [y for y in range(self.k) if y not in d]
+        return all(self.imp[x][y] not in d for x in d for y in undesignated)
+
+    def __eq__(self, __o: object) -> bool:
+        if not isinstance(__o, Matrix):
+            return NotImplemented
+        return (self.neg, self.imp, self.designated) == (
+            __o.neg,
+            __o.imp,
+            __o.designated,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.neg, self.imp, self.designated))
+
+    def __repr__(self) -> str:
+        designated = sorted(self.designated)
+        return f"Matrix({list(self.neg)}, {[list(r) for r in self.imp]}, {designated})"
+
+
+def schema(s: Schema) -> Prop:
+    """The prop of a schema: a prop is its own schema, and an axiom class of
+    proof.py taking only props, such as Axiom1, is instantiated with the atoms
+    p1, p2, ...
+
+    Raise:
+        ValueError: if s is an axiom class taking variables or proofs.
+    """
+    if isinstance(s, Prop):
+        return s
+    if isinstance(s, type) and issubclass(s, Proof):
+        names = s.inputnames
+        if names and all(name.startswith("prop") for name in names):
+            return s(*(VarProp(Variable(f"p{i + 1}")) for i in range(len(names)))).prop
+    raise ValueError(f"schema(): {s!r} is not a propositional schema")
+
+
+def _compile(p: Prop, order: Sequence[VarProp]) -> tuple[list, int]:
+    """p.eval() as a program over slots: the atoms take slots 0..n-1, and each
+    step (a, b) puts the value of NotProp(slot a), if b < 0, or of
+    ImplyProp(slot a, slot b) in the next slot. Returns the steps and the slot
+    of p."""
+    slots: dict[int, int] = {id(atom): i for i, atom in enumerate(order)}
+    steps: list = []
+    root = p.eval()
+    stack: list = [root]
+    while stack:
+        node = stack.pop()
+        if id(node) in slots:
+            continue
+        missing = [c for c in node.children() if id(c) not in slots]
+        if missing:
+            stack.append(node)
+            stack.extend(missing)
+            continue
+        if node.__class__ is NotProp:
+            steps.append((slots[id(node.child)], -1))
+        elif node.__class__ is ImplyProp:
+            steps.append((slots[id(node.left_child)], slots[id(node.right_child)]))
+        else:
+            raise ValueError(f"search(): {node.getname()} is not propositional")
+        slots[id(node)] = len(order) + len(steps) - 1
+    return steps, slots[id(root)]
+
+
+def _rows(k: int, n: int) -> list[tuple[int, ...]]:
+    return [tuple(r // k**i % k for i in range(n)) for r in range(k**n)]
+
+
+def search(
+    k: int, axioms: Iterable[Schema], target: Optional[Schema] = None
+) -> Iterator[Matrix]:
+    """Every k-valued matrix, up to renaming values, in which all axioms are
+    valid and ModusPonens preserves designated values, and which refutes
+    target if given.
+
+    Axioms are props or axiom classes, see schema(). Each matrix is generated
+    once, as its least renaming among those keeping the designated values
+    0, ..., d-1 designated.
+
+    The cells of the tables are filled in one at a time, the most constrained
+    first, and each pair of a schema and an assignment of its atoms is checked
+    as soon as the cells it depends on are filled, watching one cell it is
+    still waiting for. A target is refuted by first choosing the row refuting
+    it, which is then checked like an axiom with the opposite requirement.
+
+    Raise:
+        ValueError: if k < 2, or if a schema is not propositional.
+    """
+    if k < 2:
+        raise ValueError("search(): k should be at least 2")
+    programs = []
+    for a in axioms:
+        p = schema(a)
+        order = atoms(p)
+        steps, root = _compile(p, order)
+        programs.extend((steps, root, row, True) for row in _rows(k, len(order)))
+    goals: list = [None]
+    if target is not None:
+        p = schema(target)
+        order = atoms(p)
+        steps, root = _compile(p, order)
+        goals = [(steps, root, row, False) for row in _rows(k, len(order))]
+    for d in range(1, k):
+        # A matrix may be found from several rows refuting the target, and
+        # in several renamings. Rows with fewer designated values are tried
+        # first, as they are the easiest to refute.
+        seen: set[Matrix] = set()
+        if target is not None:
+            goals.sort(key=lambda goal: sum(v < d for v in goal[2]))
+        for goal in goals:
+            constraints = programs if goal is None else programs + [goal]
+            for m in _solve(k, d, constraints, () if goal is None else goal[2]):
+                if m not in seen:
+                    seen.add(m)
+                    yield m
+
+
+def _solve(k: int, d: int, constraints: list, row: tuple) -> Iterator[Matrix]:
+    """The least renamings of the matrices with designated values 0..d-1
+    satisfying constraints, the values in row counting as already used."""
+    state = _Search(k, d, row)
+    if not state.propagate(constraints):
+        return
+    state.trail.clear()
+    yield from state.fill(len(state.cells))
+
+
+class _Search:
+    """The partial tables of _solve() and the constraints watching them."""
+
+    __slots__ = (
+        "k",
+        "d",
+        "cells",
+        "domains",
+        "indices",
+        "watches",
+        "forced",
+        "trail",
+        "used",
+        "perms",
+    )
+
+    def __init__(self, k: int, d: int, row: tuple) -> None:
+        self.k = k
+        self.d = d
+        # Cells 0..k-1 hold neg[x], and cell k + x*k + y holds imp[x][y].
+        ncells = k + k * k
+        self.cells: list = [None] * ncells
+        designated = range(d)
+        undesignated = range(d, k)
+        self.domains: list = [range(k)] * ncells
+        for x in designated:
+            for y in undesignated:
+                # ModusPonens: x and imp[x][y] designated force y designated.
+                self.domains[k + x * k + y] = undesignated
+        self.indices: list[tuple] = [(x,) for x in range(k)]
+        self.indices += [(x, y) for x in range(k) for y in range(k)]
+        self.watches: list[list] = [[] for _ in range(ncells)]
+        # How many constraints wait for a cell as their last step, and so
+        # force it to be designated (index 1) or not (index 0).
+        self.forced: list[list] = [[0, 0] for _ in range(ncells)]
+        self.trail: list[tuple] = []
+        # How many filled cells, by index or value, and rows use each value.
+        self.used = [0] * k
+        for v in row:
+            self.used[v] += 1
+        self.perms = [
+            p1 + p2
+            for p1 in permutations(designated)
+            for p2 in permutations(undesignated)
+        ]
+
+    def evaluate(self, c: tuple) -> int:
+        """The value of constraint c as ~value, or the cell it waits for as
+        2 * cell + 1 if that cell is its value, else 2 * cell."""
+        k = self.k
+        cells = self.cells
+        steps, root, row, _ = c
+        vals = list(row)
+        for a, b in steps:
+            cell = vals[a] if b < 0 else k + vals[a] * k + vals[b]
+            v = cells[cell]
+            if v is None:
+                return 2 * cell + (len(vals) == root)
+            vals.append(v)
+        return ~vals[root]
+
+    def propagate(self, constraints: list) -> bool:
+        """Check constraints, watching a missing cell of the pending ones.
+        False if one of them fails."""
+        for c in constraints:
+            res = self.evaluate(c)
+            if res >= 0:
+                cell = res >> 1
+                self.watches[cell].append(c)
+                if res & 1:
+                    self.forced[cell][c[3]] += 1
+                self.trail.append((cell, res & 1, c[3]))
+            elif (~res < self.d) != c[3]:
+                return False
+        return True
+
+    def undo(self, mark: int) -> None:
+        """Drop the watches set since the trail had length mark."""
+        trail = self.trail
+        while len(trail) > mark:
+            i, last, want = trail.pop()
+            self.watches[i].pop()
+            if last:
+                self.forced[i][want] -= 1
+
+    def choose(self) -> tuple[int, Sequence[int]]:
+        """The unfilled cell with the fewest values left, then the one most
+        constraints wait for, and its values; -1 if a cell has none."""
+        d = self.d
+        cell = -1
+        best = (self.k + 1, 0)
+        for i, v in enumerate(self.cells):
+            if v is None:
+                undes, des = self.forced[i]
+                if undes and des:
+                    return -1, ()
+                size = d if des else self.k - d if undes else len(self.domains[i])
+                key = (size, -len(self.watches[i]))
+                if key < best:
+                    cell = i
+                    best = key
+        undes, des = self.forced[cell]
+        if not des and not undes:
+            return cell, self.domains[cell]
+        return cell, [v for v in self.domains[cell] if (v < d) == bool(des)]
+
+    def fresh(self) -> tuple[int, int]:
+        """The least designated and undesignated values no filled cell uses
+        yet, or -1. The others are interchangeable with them."""
+        used = self.used
+        designated = next((v for v in range(self.d) if not used[v]), -1)
+        undesignated = next((v for v in range(self.d, self.k) if not used[v]), -1)
+        return designated, undesignated
+
+    def fill(self, left: int) -> Iterator[Matrix]:
+        if not left:
+            neg, imp = _least(self.k, self.cells, self.perms)
+            yield Matrix(neg, imp, range(self.d))
+            return
+        cell, domain = self.choose()
+        if cell < 0:
+            return
+        used = self.used
+        index = self.indices[cell]
+        for v in index:
+            used[v] += 1
+        fresh = self.fresh()
+        for v in domain:
+            if not used[v] and v not in fresh:
+                continue
+            self.cells[cell] = v
+            used[v] += 1
+            mark = len(self.trail)
+            if self.propagate(self.watches[cell]):
+                yield from self.fill(left - 1)
+            self.undo(mark)
+            used[v] -= 1
+        for v in index:
+            used[v] -= 1
+        self.cells[cell] = None
+
+
+def _least(k: int, cells: list, perms: list) -> tuple[list, list]:
+    """The least renaming of the tables in cells by perms."""
+    best = None
+    for perm in perms:
+        inverse = [0] * k
+        for v, u in enumerate(perm):
+            inverse[u] = v
+        renamed = [perm[cells[inverse[u]]] for u in range(k)]
+        renamed += [
+            perm[cells[k + inverse[x] * k + inverse[y]]]
+            for x in range(k)
+            for y in range(k)
+        ]
+        if best is None or renamed < best:
+            best = renamed
+    return best[:k], [best[k + x * k : k + x * k + k] for x in range(k)]
@@ -1,15 +1,56 @@
 from __future__ import annotations
 
-from prop import ForallProp, ImplyProp, NotProp, Prop
+import heapq
+import weakref
+from typing import Optional
+
+from prop import ForallProp, ImplyProp, NotProp, Prop, UniqueMeta, _join
 from variable import Variable
 
+# Upper bound for sys.getsizeof() of any single Proof node. Inputs are kept in
+# a tuple named by the class-level inputnames, and assumptions in an int
+# bitmask that proofs without assumptions share as 0, so no per-node dict, list
+# or set is allocated; the weak reference slot is what the unique table needs.
+PROOF_NODE_BYTES = 72
+
 
 # BUG: assumption不一样的Proof是否应该相等呢？
 # BUG: 现在的代码没有突出Deduction的意义，即消除assumption。
-class Proof:
+class Proof(metaclass=UniqueMeta):
+    """A proof step.
+
+    Proofs are hash-consed like props: a rule applied to the same arguments
+    (props, variables or proofs, which are all unique) returns the same node,
+    so a derivation repeated by several theorems is one shared node of the
+    proof DAG.
+
+    The assumptions a proof depends on are kept as a bitmask over their
+    Assumption.index, so that merging them is an or and testing one is a
+    shift, whatever the size of the proof.
+    """
+
+    __slots__ = ("prop", "_assumed", "_input", "__weakref__")
+
+    inputnames: tuple[str, ...] = ()
+
     def __init__(self, p: Prop) -> None:
         self.prop = p
-        self.assumption = []
+        self._assumed = 0
+        self._input: tuple = ()
+
+    @property
+    def assumption(self) -> tuple[Proof, ...]:
+        """The assumptions this proof depends on, each once."""
+        return Assumption.frommask(self._assumed)
+
+    def isassumed(self, p: Prop) -> bool:
+        """Whether this proof depends on an assumption equal to p."""
+        i = Assumption._index.get(p)
+        return i is not None and self._assumed >> i & 1 == 1
+
+    @property
+    def input(self) -> dict:
+        return dict(zip(self.inputnames, self._input))
 
     def getname(self) -> str:
         return self.__class__.__name__
@@ -20,17 +61,115 @@ class Proof:
     def __eq__(self, __o: Proof) -> bool:
         return self.prop == __o.prop
 
+    def steps(self) -> tuple[int, int]:
+        """The number of steps of this proof written out as a tree, and the
+        number of distinct nodes of its DAG."""
+        total: dict[int, int] = {}
+        stack: list = [self]
+        while stack:
+            node = stack[-1]
+            if id(node) in total:
+                stack.pop()
+                continue
+            inputs = [a for a in node._input if isinstance(a, Proof)]
+            missing = [a for a in inputs if id(a) not in total]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            total[id(node)] = 1 + sum(total[id(a)] for a in inputs)
+        return total[id(self)], len(total)
+
+    def parts(self) -> tuple:
+        """Printed form of this proof, as strings, props and input proofs.
+
+        A proof with inputs prints as Name(input1, input2, ...), one without
+        as Name[prop].
+        """
+        if not self._input:
+            return (self.getname(), "[", self.prop, "]")
+        parts: list = [self.getname(), "("]
+        for a in self._input:
+            parts.append(a.__str__() if isinstance(a, Variable) else a)
+            parts.append(", ")
+        parts[-1] = ")"
+        return tuple(parts)
+
     def __str__(self) -> str:
-        return self.getname() + "[" + self.prop.__str__() + "]"
+        return _join(self)
+
+
+class _AssumptionRef(weakref.ref):
+    __slots__ = ("prop", "index")
 
 
 class Assumption(Proof):
+    """An assumed prop.
+
+    Each assumed prop in use gets a small integer index, equal props (see
+    Prop.__eq__) sharing it, which proofs use as the bit position of the
+    assumption. Like variables, assumptions are only weakly held: once no
+    assumption of a prop is left, and so no proof depending on it, its index
+    is given to the next new one, the smallest free index first.
+    """
+
+    __slots__ = ()
+
+    _index: dict[Prop, int] = {}
+    # The live assumptions of each index, weakly held.
+    _assumptions: list[Optional[list[_AssumptionRef]]] = []
+    # Indices no assumption uses, as a heap.
+    _unused: list[int] = []
+
     def __init__(self, p: Prop):
         super().__init__(p)
-        self.assumption = [self]
+        i = Assumption._index.get(p)
+        if i is None:
+            if Assumption._unused:
+                i = heapq.heappop(Assumption._unused)
+            else:
+                i = len(Assumption._assumptions)
+                Assumption._assumptions.append(None)
+            Assumption._index[p] = i
+            Assumption._assumptions[i] = []
+        ref = _AssumptionRef(self, _assumption_remove)
+        ref.prop = p
+        ref.index = i
+        Assumption._assumptions[i].append(ref)  # type: ignore
+        self._assumed = 1 << i
+
+    @property
+    def index(self) -> int:
+        return self._assumed.bit_length() - 1
+
+    @staticmethod
+    def frommask(mask: int) -> tuple[Assumption, ...]:
+        """The assumptions whose index bits are set in mask, by index, one
+        for each set of equal props."""
+        assumptions = []
+        while mask:
+            low = mask & -mask
+            assumptions.append(Assumption._assumptions[low.bit_length() - 1][0]())  # type: ignore
+            mask ^= low
+        return tuple(assumptions)
+
+
+def _assumption_remove(ref: _AssumptionRef) -> None:
+    refs = Assumption._assumptions[ref.index]
+    if refs is None or ref not in refs:
+        return
+    refs.remove(ref)
+    if not refs:
+        Assumption._assumptions[ref.index] = None
+        del Assumption._index[ref.prop]
+        heapq.heappush(Assumption._unused, ref.index)
 
 
 class Axiom1(Proof):
+    __slots__ = ()
+
+    inputnames = ("prop1", "prop2")
+
     def __init__(self, p1: Prop, p2: Prop) -> None:
         """Axiom1
 
@@ -41,15 +180,15 @@ class Axiom1(Proof):
         Returns:
             Proof: p1 => (p2 => p1)
         """
-        self.input = {"prop1": p1, "prop2": p2}
-        self.prop = ImplyProp(p1, ImplyProp(p2, p1))
-        self.assumption = []
-
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
+        super().__init__(ImplyProp(p1, ImplyProp(p2, p1)))
+        self._input = (p1, p2)
 
 
 class Axiom2(Proof):
+    __slots__ = ()
+
+    inputnames = ("prop1", "prop2", "prop3")
+
     def __init__(self, p1: Prop, p2: Prop, p3: Prop) -> None:
         """Axiom2
 
@@ -61,18 +200,18 @@ class Axiom2(Proof):
         Returns:
             Proof: (p1 => (p2 => p3)) => ((p1 => p2) => (p1 => p3))
         """
-        self.input = {"prop1": p1, "prop2": p2, "prop3": p3}
         p4 = ImplyProp(p1, ImplyProp(p2, p3))
         p5 = ImplyProp(ImplyProp(p1, p2), ImplyProp(p1, p3))
         p6 = ImplyProp(p4, p5)
-        self.prop = p6
-        self.assumption = []
-
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input.__str__()})"
+        super().__init__(p6)
+        self._input = (p1, p2, p3)
 
 
 class Axiom3(Proof):
+    __slots__ = ()
+
+    inputnames = ("prop1", "prop2")
+
     def __init__(self, p1: Prop, p2: Prop) -> None:
         """Axiom3
 
@@ -83,18 +222,18 @@ class Axiom3(Proof):
         Returns:
             Proof: (!p1 => !p2) => ((!p1 => p2) => p1)
         """
-        self.input = {"prop1": p1, "prop2": p2}
         p3 = ImplyProp(NotProp(p1), NotProp(p2))
         p4 = ImplyProp(NotProp(p1), p2)
         p5 = ImplyProp(p3, ImplyProp(p4, p1))
-        self.prop = p5
-        self.assumption = []
-
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
+        super().__init__(p5)
+        self._input = (p1, p2)
 
 
 class Axiom4(Proof):
+    __slots__ = ()
+
+    inputnames = ("prop1", "var1")
+
     def __init__(self, p: Prop, x: Variable, y: Variable) -> None:
         """(forall x, p) => p
 
@@ -111,20 +250,18 @@ class Axiom4(Proof):
 
         p1 = ForallProp(x, p)
 
-        if x == y:
-            p2 = p
-        else:
-            p2 = p.substitute(x, y)
+        p2, _ = p.substitutevars({x: y})
 
         p3 = ImplyProp(p1, p2)
-        self.input = {"prop1": p, "var1": x}
         super().__init__(p3)
-
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['var1'].__str__()})"
+        self._input = (p, x)
 
 
 class Axiom5(Proof):
+    __slots__ = ()
+
+    inputnames = ("prop1", "prop2", "var1")
+
     def __init__(self, p1: Prop, p2: Prop, x: Variable) -> None:
         """(forall x, p1 => p2) => (p1 => (forall x, p2))
             where x is not free in p1
@@ -139,14 +276,15 @@ class Axiom5(Proof):
         prop1 = ForallProp(x, ImplyProp(p1, p2))
         prop2 = ImplyProp(p1, ForallProp(x, p2))
         prop3 = ImplyProp(prop1, prop2)
-        self.input = {"prop1": p1, "prop2": p2, "var1": x}
         super().__init__(prop3)
-
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop1'].__str__()}, {self.input['var1'].__str__()})"
+        self._input = (p1, p2, x)
 
 
 class Generalization(Proof):
+    __slots__ = ()
+
+    inputnames = ("proof1", "var1")
+
     def __init__(self, proof1: Proof, x: Variable) -> None:
         """proof |=> (forall x, proof)
 
@@ -160,15 +298,16 @@ class Generalization(Proof):
             x (Variable): _description_
         """
         prop = ForallProp(x, proof1.prop)
-        self.input = {"proof1": proof1, "var1": x}
         super().__init__(prop)
-        self.assumption = proof1.assumption
-
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['proof1'].__str__()}, {self.input['var1'].__str__()})"
+        self._input = (proof1, x)
+        self._assumed = proof1._assumed
 
 
 class ModusPonens(Proof):
+    __slots__ = ()
+
+    inputnames = ("proof1", "proof2")
+
     def __init__(self, proof1: Proof, proof2: Proof) -> None:
         """Modus Ponens
 
@@ -188,29 +327,28 @@ class ModusPonens(Proof):
         p: ImplyProp = proof2.prop  # type: ignore
         if proof1.prop != p.left_child:
             raise ValueError("ModusPonens(): proof1.prop != proof2.prop.left_child")
-        self.input = {"proof1": proof1, "proof2": proof2}
-        self.prop = p.right_child
-        self.assumption = proof1.assumption + proof2.assumption
-
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['proof1'].__str__()}, {self.input['proof2'].__str__()})"
+        super().__init__(p.right_child)
+        self._input = (proof1, proof2)
+        self._assumed = proof1._assumed | proof2._assumed
 
 
 class ToEvalAxiom(Proof):
+    __slots__ = ()
+
+    inputnames = ("prop",)
+
     def __init__(self, p: Prop) -> None:
         prop = ImplyProp(p, p.eval())
-        self.input = {"prop": prop}
         super().__init__(prop)
-
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop']})"
+        self._input = (prop,)
 
 
 class FromEvalAxiom(Proof):
+    __slots__ = ()
+
+    inputnames = ("prop",)
+
     def __init__(self, p: Prop) -> None:
         prop = ImplyProp(p.eval(), p)
-        self.input = {"prop": prop}
         super().__init__(prop)
-
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop']})"
+        self._input = (prop,)
@@ -1,183 +1,704 @@
 from __future__ import annotations
 
+import weakref
+from operator import is_
+from typing import Callable, Optional
+
 from variable import Variable
 
 
-class Prop:
+class _UniqueRef(weakref.ref):
+    __slots__ = ("key",)
+
+
+class UniqueMeta(type):
+    """Hash-consing metaclass: structurally equal nodes are the same object.
+
+    Every constructor call is looked up in a unique table keyed by the class and
+    the identities of its arguments. Children and variables are already
+    unique, so two calls with the same key build the same formula and
+    the existing node is returned instead of a fresh one. Proofs use the same
+    table, their arguments being props, variables and proofs. The table only holds
+    weak references, so formulas that are no longer used are still collected.
+    """
+
+    _table: dict[tuple, _UniqueRef] = {}
+
+    def __call__(cls, *args):
+        key = (cls, *map(id, args))
+        ref = UniqueMeta._table.get(key)
+        if ref is not None:
+            node = ref()
+            if node is not None:
+                return node
+        node = super().__call__(*args)
+        ref = _UniqueRef(node, _unique_remove)
+        ref.key = key
+        UniqueMeta._table[key] = ref
+        return node
+
+
+def _unique_remove(ref: _UniqueRef) -> None:
+    if UniqueMeta._table.get(ref.key) is ref:
+        del UniqueMeta._table[ref.key]
+
+
+# Merkle-style hashes: a node hashes its tag with the hashes of its children,
+# so every hash is computed once, bottom-up, when the node is built.
+def _hash_var(x: Variable) -> int:
+    return hash((1, x))
+
+
+def _hash_not(h: int) -> int:
+    return hash((2, h))
+
+
+def _hash_imply(h1: int, h2: int) -> int:
+    return hash((3, h1, h2))
+
+
+def _hash_forall(x: Variable, h: int) -> int:
+    return hash((4, x, h))
+
+
+def _hash_and(h1: int, h2: int) -> int:
+    return _hash_not(_hash_imply(h1, _hash_not(h2)))
+
+
+def _fingerprint(h: int) -> int:
+    """One bit of a 64-bit Bloom filter over the _evalhash of subformulas."""
+    return 1 << (h & 63)
+
+
+# Upper bound for sys.getsizeof() of any single Prop node. Nodes have no
+# __dict__, and their variable sets are int bitmasks over Variable.index that
+# are shared with their children whenever a connective leaves them unchanged,
+# so this is the whole per-node cost apart from the few masks that differ and
+# the shape tuple of nodes it was asked for.
+NODE_BYTES = 144
+
+
+def _rewrite(
+    root: Prop,
+    visit: Callable[[Prop], Optional[Prop]],
+    post: Optional[Callable[[Prop, list], Prop]] = None,
+    done: Optional[dict[int, object]] = None,
+) -> Prop:
+    """Bottom-up rewrite of root driven by an explicit stack.
+
+    visit(node) either returns the result for node, or None to rewrite its
+    arguments first and then combine them with post(node, args), where args is
+    node.args() with every argument replaced by its result. Without post the
+    node is rebuilt from args, or kept if none of them changed. done maps id()
+    of already rewritten nodes, and of variables to rename, to their result.
+
+    Each distinct node is handled once per call, so shared subformulas are not
+    walked twice, and the depth of the formula is not limited by the recursion
+    limit.
+    """
+    if done is None:
+        done = {}
+    if post is None:
+        post = _rebuild
+    result = visit(root)
+    if result is not None:
+        return result
+    get = done.get
+    # The stack only holds nodes that visit() left to be rewritten, and
+    # (node, args) pairs whose arguments are all rewritten by the time
+    # they are popped.
+    stack: list = [root]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        item = pop()
+        if item.__class__ is tuple:
+            node, args = item
+            new = [get(id(a), a) for a in args]
+            done[id(node)] = post(node, new)
+            continue
+        if id(item) in done:
+            continue
+        push((item, item.args()))
+        for child in item.children():
+            if id(child) not in done:
+                result = visit(child)
+                if result is None:
+                    push(child)
+                else:
+                    done[id(child)] = result
+    return done[id(root)]  # type: ignore
+
+
+def _rebuild(node: Prop, new: list) -> Prop:
+    """node with its arguments replaced by new, or node itself if none of them
+    changed: the default post of _rewrite()."""
+    if all(map(is_, new, node.args())):
+        return node
+    return node.__class__(*new)
+
+
+def _shape(root: Prop) -> tuple:
+    """root._shape: (size, depth, quantifier depth, atom mask, eval() size).
+
+    It is computed bottom-up, once per node, for root and every node below it
+    that does not have it yet.
+    """
+    if root._shape is not None:
+        return root._shape
+    stack: list = [root]
+    pop = stack.pop
+    while stack:
+        node = stack[-1]
+        if node._shape is not None:
+            pop()
+            continue
+        children = node.children()
+        missing = [c for c in children if c._shape is None]
+        if missing:
+            stack.extend(missing)
+            continue
+        pop()
+        if not children:
+            node._shape = (1, 1, 0, node._free, 1)
+            continue
+        size = depth = quantifiers = atoms = evalsize = 0
+        for c in children:
+            csize, cdepth, cquantifiers, catoms, cevalsize = c._shape
+            size += csize
+            depth = max(depth, cdepth)
+            quantifiers = max(quantifiers, cquantifiers)
+            atoms |= catoms
+            evalsize += cevalsize
+        if isinstance(node, (ForallProp, ExistProp)):
+            quantifiers += 1
+        growth = node._evalsize
+        if growth is None:
+            evalsize = _shape(node.eval())[0]
+        else:
+            evalsize = growth[0] * evalsize + growth[1]
+        node._shape = (size + 1, depth + 1, quantifiers, atoms, evalsize)
+    return root._shape
+
+
+def _eval_visit(node: Prop) -> Optional[Prop]:
+    if not node._alias:
+        return node
+    return node._eval
+
+
+def _eval_post(node: Prop, args: list) -> Prop:
+    if isinstance(node, AliasProp):
+        result = node.expand(*args)
+        if result._alias:
+            result = result.eval()
+    else:
+        result = node.__class__(*args)
+    node._eval = result
+    return result
+
+
+# Alpha keys are locally nameless: every binder is _BINDER, and a bound
+# occurrence is the index variable #k, k being the number of binders between
+# the occurrence and its own binder (its de Bruijn index). Free variables
+# keep their names. These names cannot be written in the printed syntax.
+_BINDER = Variable("#")
+_CANONICAL = ()
+
+
+def _index(k: int) -> Variable:
+    return Variable(f"#{k}")
+
+
+def _abstract(body: Prop, x: Variable) -> Prop:
+    """body with every free occurrence of x replaced by its de Bruijn index."""
+    bit = 1 << x.index
+    if not body._free & bit:
+        return body
+    done: dict[tuple[int, int], Prop] = {}
+    stack: list = [(body, 0, False)]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node, depth, ready = pop()
+        key = (id(node), depth)
+        inner = depth + 1 if node.__class__ is ForallProp else depth
+        if ready:
+            args = node.args()
+            new = [done.get((id(a), inner), a) for a in args]
+            done[key] = node.__class__(*new)
+        elif key in done:
+            continue
+        elif not node._free & bit:
+            done[key] = node
+        elif node.__class__ is VarProp:
+            done[key] = VarProp(_index(depth))
+        else:
+            push((node, depth, True))
+            for child in node.children():
+                push((child, inner, False))
+    return done[(id(body), 0)]
+
+
+def _alpha_visit(node: Prop) -> Optional[Prop]:
+    if not node._bound:
+        return node
+    if node._alpha is _CANONICAL:
+        return node
+    return node._alpha
+
+
+def _alpha_post(node: Prop, args: list) -> Prop:
+    if node.__class__ is ForallProp:
+        result = ForallProp(_BINDER, _abstract(args[1], node.variable))
+    else:
+        result = node.__class__(*args)
+    # A key that is its own key is marked instead of referring to itself.
+    node._alpha = _CANONICAL if result is node else result
+    return result
+
+
+def _binder(node: Prop, ctx: dict, mask: int) -> tuple[Variable, dict, int]:
+    """For substitutevars(): the binder of the quantifier node, and the mapping
+    and its mask for the child of node, under the mapping ctx of mask."""
+    z = node.variable
+    child = node.child
+    bit = 1 << z.index
+    innerctx = ctx
+    innermask = mask
+    if mask & bit:
+        innerctx = {x: y for x, y in ctx.items() if x is not z}
+        innermask = mask ^ bit
+    targets = 0
+    for x, y in innerctx.items():
+        if child._free >> x.index & 1:
+            targets |= 1 << y.index
+    binder = z
+    if targets & bit:
+        avoid = child._free | child._bound | targets | innermask
+        binder = Variable.fresh(z, avoid)
+        innerctx = {**innerctx, z: binder}
+        innermask |= bit
+    return binder, innerctx, innermask
+
+
+def _substituted(node: Prop, ctx: dict, inner: tuple, done: dict) -> Prop:
+    """For substitutevars(): node under the mapping ctx, its children being
+    done. inner is (binder, mapping of the child) for quantifiers, else ()."""
+    if inner:
+        binder, innerctx = inner
+        child = done[(id(node.child), id(innerctx))]
+        if binder is node.variable and child is node.child:
+            return node
+        return node.__class__(binder, child)
+    args = node.args()
+    new = [done[(id(a), id(ctx))] for a in args]
+    if all(map(is_, new, args)):
+        return node
+    return node.__class__(*new)
+
+
+class Prop(metaclass=UniqueMeta):
+    __slots__ = (
+        "_free",
+        "_bound",
+        "_alias",
+        "_hash",
+        "_evalhash",
+        "_eval",
+        "_fp",
+        "_alpha",
+        "_shape",
+        "__weakref__",
+    )
+
+    # The eval() form of a node of this class has a * n + b nodes, n being the
+    # total eval() size of its children, if _evalsize is (a, b); None means
+    # that it is found by building eval().
+    _evalsize: Optional[tuple[int, int]] = (1, 1)
+
     def __init__(self) -> None:
-        self.freevars = set()
-        self.boundedvars = set()
+        self._free = 0
+        self._bound = 0
+        self._alias = False
+        # _hash is the hash of this exact syntax tree, _evalhash the hash of
+        # its eval() form. Equal props (see __eq__) always share _evalhash.
+        # Subclasses overwrite both with the hashes of their own node.
+        self._hash = 0
+        self._evalhash = 0
+        self._eval: Prop | None = None
+        # Subformula fingerprint: the _fingerprint() bits of every node of
+        # this tree, itself included.
+        self._fp = 0
+        self._alpha: Prop | tuple | None = None
+        self._shape: tuple | None = None
+
+    @property
+    def size(self) -> int:
+        """The number of nodes of this prop as a tree, shared subformulas
+        counted each time they occur.
+
+        This and the other shape properties are computed for every node at
+        most once, the first time one of them is asked for below it, and then
+        cost O(1).
+        """
+        return _shape(self)[0]
+
+    @property
+    def depth(self) -> int:
+        """The number of nodes on the longest path from this node to an atom."""
+        return _shape(self)[1]
+
+    @property
+    def quantifierdepth(self) -> int:
+        """The greatest number of nested ForallProp and ExistProp nodes."""
+        return _shape(self)[2]
+
+    @property
+    def atoms(self) -> frozenset[VarProp]:
+        """The VarProp nodes of this prop, bound or free."""
+        return frozenset(map(VarProp, Variable.frommask(_shape(self)[3])))
+
+    @property
+    def evalsize(self) -> int:
+        """The size of eval(), without building it. Equal props have the
+        same evalsize."""
+        return _shape(self)[4]
+
+    @property
+    def hasalias(self) -> bool:
+        """Whether this prop has alias connectives, so that eval() differs."""
+        return self._alias
+
+    @property
+    def freevars(self) -> frozenset[Variable]:
+        return Variable.frommask(self._free)
+
+    @property
+    def boundedvars(self) -> frozenset[Variable]:
+        return Variable.frommask(self._bound)
 
     def isfree(self, x: Variable) -> bool:
-        return x in self.freevars
+        return self._free >> x.index & 1 == 1
 
     def isbounded(self, x: Variable) -> bool:
-        return x in self.boundedvars
+        return self._bound >> x.index & 1 == 1
+
+    def maycontain(self, p: Prop) -> bool:
+        """False if no subformula of this prop, itself included, equals p.
+
+        This only tests the subformula fingerprint, so True may be a false
+        positive, but False is certain and costs no traversal.
+        """
+        return self._fp & _fingerprint(p._evalhash) != 0
 
     def substitute(self, x: Variable, y: Variable) -> Prop:
-        return self
+        """Rename every occurrence of x, binders included, to y.
+
+        Subtrees without x are kept as they are, so the result shares every
+        unchanged subformula with self, and is self if x does not occur.
+        """
+        bit = 1 << x.index
+
+        def visit(node: Prop) -> Optional[Prop]:
+            if not (node._free | node._bound) & bit:
+                return node
+            if isinstance(node, VarProp):
+                return VarProp(y)
+            return None
+
+        return _rewrite(self, visit, done={id(x): y})
+
+    def substitutevars(self, mapping: dict[Variable, Variable]) -> tuple[Prop, bool]:
+        """Capture-avoiding simultaneous substitution of free variables.
+
+        Every free occurrence of a key of mapping is replaced by its value, all
+        in one pass. Bound occurrences are left alone, and a binder is renamed
+        to a fresh variable (see Variable.fresh) only when it would capture one
+        of the substituted values. Unchanged subtrees are kept as they are.
+
+        Returns:
+            The substituted prop, and whether it differs from self.
+        """
+        top = {x: y for x, y in mapping.items() if x is not y}
+        # The keys are distinct variables, so their bits add up to the mask.
+        topmask = sum(1 << x.index for x in top)
+        if not self._free & topmask:
+            return self, False
+        # Results are memoized per node and mapping; the mappings are kept
+        # alive until the end so that their ids stay unique.
+        contexts = [top]
+        done: dict[tuple[int, int], Prop] = {}
+        stack: list = [(self, top, topmask, None)]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            node, ctx, mask, inner = pop()
+            key = (id(node), id(ctx))
+            if inner is not None:
+                # All children are done: inner is (binder, mapping) for
+                # quantifiers and () for the other connectives.
+                done[key] = _substituted(node, ctx, inner, done)
+            elif key in done:
+                continue
+            elif not node._free & mask:
+                done[key] = node
+            elif isinstance(node, VarProp):
+                done[key] = VarProp(ctx[node.variable])
+            elif not isinstance(node, (ForallProp, ExistProp)):
+                push((node, ctx, mask, ()))
+                for child in node.children():
+                    push((child, ctx, mask, None))
+            else:
+                binder, innerctx, innermask = _binder(node, ctx, mask)
+                if innerctx is not ctx:
+                    contexts.append(innerctx)
+                push((node, ctx, mask, (binder, innerctx)))
+                push((node.child, innerctx, innermask, None))
+        result = done[(id(self), id(top))]
+        return result, result is not self
 
     def replacement(self, p1: Prop, p2: Prop) -> Prop:
-        return self
+        """Replace every outermost subformula equal to p1 by p2."""
+
+        h = p1._evalhash
+        least = p1.evalsize
+
+        def visit(node: Prop) -> Optional[Prop]:
+            if node._evalhash == h and node == p1:
+                return p2
+            # Subtrees that cannot hold p1 are kept without walking them. Every
+            # node has evalsize 1 at least, so an atom needs no size test.
+            if not node.maycontain(p1) or least > 1 and node.evalsize < least:
+                return node
+            return None
+
+        return _rewrite(self, visit)
 
     def getname(self) -> str:
         return self.__class__.__name__
 
     def eval(self) -> Prop:
-        return self
+        """The alias-free form of this prop.
+
+        It is built at most once per node and cached; props without alias
+        connectives below them are already in that form and return themselves.
+        """
+        if not self._alias:
+            return self
+        if self._eval is None:
+            _rewrite(self, _eval_visit, _eval_post)
+        return self._eval  # type: ignore
+
+    def alphakey(self) -> Prop:
+        """The locally nameless form of eval(), interned like any prop.
+
+        Bound variables are replaced by de Bruijn indices and free ones keep
+        their names, so two props have the same key exactly when their eval()
+        forms are equal up to renaming bound variables. The key is computed
+        once per node; after that, comparing or hashing keys is O(1).
+        """
+        if not self._bound and not self._alias:
+            return self
+        alpha = self._alpha
+        if alpha is None:
+            p = self.eval()
+            if p is self:
+                alpha = _rewrite(self, _alpha_visit, _alpha_post)
+            else:
+                alpha = self._alpha = p.alphakey()
+        return self if alpha is _CANONICAL else alpha  # type: ignore
+
+    def alphaeq(self, __o: Prop) -> bool:
+        """Whether self and __o are equal up to renaming bound variables."""
+        return self.alphakey() is __o.alphakey()
+
+    def alphahash(self) -> int:
+        """A hash of alphakey(), shared by alpha-equivalent props."""
+        return self.alphakey()._hash
+
+    def args(self) -> tuple:
+        """Constructor arguments of this node, children and variables alike."""
+        return ()
+
+    def children(self) -> tuple[Prop, ...]:
+        """The props among args(), in the same order."""
+        return ()
+
+    def parts(self) -> tuple:
+        """Printed form of this node, as strings and child props in order."""
+        return (f"{self.getname()}()",)
+
+    def __reduce__(self):
+        return (self.__class__, self.args())
 
     def __eq__(self, __o: Prop) -> bool:
-        return self.getname() == __o.getname()
+        if self is __o:
+            return True
+        # Unique nodes without alias connectives are only equal to themselves,
+        # and props with alias connectives are equal when their eval() forms,
+        # built once per node, are the same node.
+        if self._evalhash != __o._evalhash:
+            return False
+        if not self._alias and not __o._alias:
+            return False
+        return self.eval() is __o.eval()
+
+    def __hash__(self) -> int:
+        return self._evalhash
 
     def __str__(self) -> str:
-        return f"{self.getname()}()"
+        return _join(self)
+
+
+def _join(root) -> str:
+    """The text of root, which is a string or has parts() made of such."""
+    out: list[str] = []
+    stack: list = [root]
+    pop = stack.pop
+    extend = stack.extend
+    append = out.append
+    while stack:
+        item = pop()
+        # Descend the leftmost parts directly, leaving the rest for later.
+        while item.__class__ is not str:
+            parts = item.parts()
+            extend(parts[:0:-1])
+            item = parts[0]
+        append(item)
+    return "".join(out)
 
 
 class VarProp(Prop):
+    __slots__ = ("variable",)
+
     def __init__(self, x: Variable) -> None:
         super().__init__()
         self.variable = x
-        self.freevars.add(x)
-
-    def substitute(self, x: Variable, y: Variable) -> VarProp:
-        if self.variable == x:
-            return VarProp(y)
-        return self
-
-    def replacement(self, p1: Prop, p2: Prop) -> Prop:
-        if self == p1:
-            return p2
-        return self
-
-    def eval(self) -> Prop:
-        return self
+        self._free = 1 << x.index
+        self._hash = self._evalhash = _hash_var(x)
+        self._fp = _fingerprint(self._evalhash)
 
-    def __eq__(self, __o: Prop) -> bool:
-        __o2: VarProp = __o  # type: ignore
-        return super().__eq__(__o) and self.variable == __o2.variable
+    def args(self) -> tuple:
+        return (self.variable,)
 
-    def __str__(self) -> str:
-        return self.variable.__str__()
+    def parts(self) -> tuple:
+        return (self.variable.__str__(),)
 
 
 class NotProp(Prop):
+    __slots__ = ("child",)
+
     def __init__(self, p: Prop) -> None:
         super().__init__()
         self.child = p
-        self.freevars = p.freevars.copy()
-        self.boundedvars = p.boundedvars.copy()
-
-    def substitute(self, x: Variable, y: Variable) -> NotProp:
-        if self.isfree(x) or self.isbounded(x):
-            return NotProp(self.child.substitute(x, y))
-        return self
-
-    def replacement(self, p1: Prop, p2: Prop) -> Prop:
-        if self == p1:
-            return p2
-        return NotProp(self.child.replacement(p1, p2))
+        self._free = p._free
+        self._bound = p._bound
+        self._alias = p._alias
+        self._hash = _hash_not(p._hash)
+        self._evalhash = _hash_not(p._evalhash)
+        self._fp = p._fp | _fingerprint(self._evalhash)
 
-    def eval(self) -> Prop:
-        return NotProp(self.child.eval())
+    def args(self) -> tuple:
+        return (self.child,)
 
-    def __eq__(self, __o: Prop) -> bool:
-        __o2: NotProp = __o  # type: ignore
-        return super().__eq__(__o) and self.child == __o2.child
+    def children(self) -> tuple[Prop, ...]:
+        return (self.child,)
 
-    def __str__(self) -> str:
-        return "!" + self.child.__str__()
+    def parts(self) -> tuple:
+        return ("!", self.child)
 
 
 class ImplyProp(Prop):
+    __slots__ = ("left_child", "right_child")
+
     def __init__(self, p1: Prop, p2: Prop) -> None:
         super().__init__()
         self.left_child = p1
         self.right_child = p2
-        self.freevars = set.union(p1.freevars, p2.freevars)
-        self.boundedvars = set.union(p1.boundedvars, p2.boundedvars)
+        self._free = p1._free | p2._free
+        self._bound = p1._bound | p2._bound
+        self._alias = p1._alias or p2._alias
+        self._hash = _hash_imply(p1._hash, p2._hash)
+        self._evalhash = _hash_imply(p1._evalhash, p2._evalhash)
+        self._fp = p1._fp | p2._fp | _fingerprint(self._evalhash)
 
-    def substitute(self, x: Variable, y: Variable) -> ImplyProp:
-        if self.isfree(x) or self.isbounded(x):
-            return ImplyProp(
-                self.left_child.substitute(x, y), self.right_child.substitute(x, y)
-            )
-        return self
+    def args(self) -> tuple:
+        return (self.left_child, self.right_child)
 
-    def replacement(self, p1: Prop, p2: Prop) -> Prop:
-        if self == p1:
-            return p2
-        return ImplyProp(
-            self.left_child.replacement(p1, p2), self.right_child.replacement(p1, p2)
-        )
-
-    def eval(self) -> Prop:
-        return ImplyProp(self.left_child.eval(), self.right_child.eval())
-
-    def __eq__(self, __o: Prop) -> bool:
-        __o2: ImplyProp = __o  # type: ignore
-        return (
-            super().__eq__(__o)
-            and self.left_child == __o2.left_child
-            and self.right_child == __o2.right_child
-        )
+    def children(self) -> tuple[Prop, ...]:
+        return (self.left_child, self.right_child)
 
-    def __str__(self) -> str:
-        return "(" + self.left_child.__str__() + "=>" + self.right_child.__str__() + ")"
+    def parts(self) -> tuple:
+        return ("(", self.left_child, "=>", self.right_child, ")")
 
 
 class ForallProp(Prop):
+    __slots__ = ("variable", "child")
+
     def __init__(self, x: Variable, p: Prop) -> None:
         super().__init__()
         self.variable = x
         self.child = p
-        self.freevars = p.freevars.copy()
-        self.boundedvars = p.boundedvars.copy()
-        if x in self.freevars:
-            self.freevars.remove(x)
-        self.boundedvars.add(x)
-
-    def substitute(self, x: Variable, y: Variable) -> ForallProp:
-        if self.isfree(x) or self.isbounded(x):
-            if self.variable == x:
-                return ForallProp(y, self.child.substitute(x, y))
-            return ForallProp(self.variable, self.child.substitute(x, y))
-        return self
+        self._free = p._free
+        self._bound = p._bound
+        bit = 1 << x.index
+        if self._free & bit:
+            self._free ^= bit
+        if not self._bound & bit:
+            self._bound |= bit
+        self._alias = p._alias
+        self._hash = _hash_forall(x, p._hash)
+        self._evalhash = _hash_forall(x, p._evalhash)
+        self._fp = p._fp | _fingerprint(self._evalhash)
 
-    def replacement(self, p1: Prop, p2: Prop) -> Prop:
-        if self == p1:
-            return p2
-        return ForallProp(self.variable, self.child.replacement(p1, p2))
-
-    def eval(self) -> Prop:
-        return ForallProp(self.variable, self.child.eval())
+    def args(self) -> tuple:
+        return (self.variable, self.child)
 
-    def __eq__(self, __o: Prop) -> bool:
-        __o2: ForallProp = __o  # type: ignore
-        return (
-            super().__eq__(__o)
-            and self.variable == __o2.variable
-            and self.child == __o2.child
-        )
+    def children(self) -> tuple[Prop, ...]:
+        return (self.child,)
 
-    def __str__(self) -> str:
-        return "(forall " + self.variable.__str__() + "," + self.child.__str__() + ")"
+    def parts(self) -> tuple:
+        return ("(forall ", self.variable.__str__(), ",", self.child, ")")
 
 
 class AliasProp(Prop):
-    def __init__(self, p: Prop) -> None:
+    """A connective that abbreviates a formula over the primitive ones.
+
+    Only the children are stored when the node is built; its variables and
+    hashes are derived from theirs. The primitive expansion (prop) is built by
+    expand() the first time it is asked for, and eval() expands the already
+    evaluated children instead, so neither is allocated unless needed.
+    """
+
+    __slots__ = ("_prop",)
+
+    _evalsize: Optional[tuple[int, int]] = None
+
+    def __init__(self) -> None:
         super().__init__()
-        self.prop = p
-        self.freevars = p.freevars
-        self.boundedvars = p.boundedvars
+        self._alias = True
+        self._prop: Prop | None = None
 
-    def eval(self) -> Prop:
-        return self.prop.eval()
+    @property
+    def prop(self) -> Prop:
+        if self._prop is None:
+            self._prop = self.expand(*self.args())
+        return self._prop
 
-    def __eq__(self, __o: Prop) -> bool:
-        return self.eval() == __o.eval()
+    def expand(self, *args) -> Prop:
+        raise NotImplementedError
+
+    def args(self) -> tuple:
+        return (self.left_child, self.right_child)
+
+    def children(self) -> tuple[Prop, ...]:
+        return (self.left_child, self.right_child)
 
 
 class AndProp(AliasProp):
+    __slots__ = ("left_child", "right_child")
+
     def __init__(self, p1: Prop, p2: Prop) -> None:
         """AndProp
 
@@ -188,104 +709,93 @@ class AndProp(AliasProp):
         Returns:
             !(p1 => !p2)
         """
+        super().__init__()
         self.left_child = p1
         self.right_child = p2
-        p = NotProp(ImplyProp(p1, NotProp(p2)))
-        super().__init__(p)
+        self._free = p1._free | p2._free
+        self._bound = p1._bound | p2._bound
+        self._hash = hash((5, p1._hash, p2._hash))
+        self._evalhash = _hash_and(p1._evalhash, p2._evalhash)
+        self._fp = p1._fp | p2._fp | _fingerprint(self._evalhash)
 
-    def substitute(self, x: Variable, y: Variable) -> AndProp:
-        if self.isfree(x) or self.isbounded(x):
-            return AndProp(
-                self.left_child.substitute(x, y), self.right_child.substitute(x, y)
-            )
-        return self
+    _evalsize = (1, 3)
 
-    def replacement(self, p1: Prop, p2: Prop) -> Prop:
-        if self == p1:
-            return p2
-        return AndProp(
-            self.left_child.replacement(p1, p2), self.right_child.replacement(p1, p2)
-        )
+    def expand(self, p1: Prop, p2: Prop) -> Prop:
+        return NotProp(ImplyProp(p1, NotProp(p2)))
 
-    def __str__(self) -> str:
-        return (
-            "(" + self.left_child.__str__() + "/\\" + self.right_child.__str__() + ")"
-        )
+    def parts(self) -> tuple:
+        return ("(", self.left_child, "/\\", self.right_child, ")")
 
 
 class OrProp(AliasProp):
+    __slots__ = ("left_child", "right_child")
+
     def __init__(self, p1: Prop, p2: Prop) -> None:
+        super().__init__()
         self.left_child = p1
         self.right_child = p2
-        p = ImplyProp(NotProp(p1), p2)
-        super().__init__(p)
+        self._free = p1._free | p2._free
+        self._bound = p1._bound | p2._bound
+        self._hash = hash((6, p1._hash, p2._hash))
+        self._evalhash = _hash_imply(_hash_not(p1._evalhash), p2._evalhash)
+        self._fp = p1._fp | p2._fp | _fingerprint(self._evalhash)
 
-    def substitute(self, x: Variable, y: Variable) -> OrProp:
-        if self.isfree(x) or self.isbounded(x):
-            return OrProp(
-                self.left_child.substitute(x, y), self.right_child.substitute(x, y)
-            )
-        return self
+    _evalsize = (1, 2)
 
-    def replacement(self, p1: Prop, p2: Prop) -> Prop:
-        if self == p1:
-            return p2
-        return OrProp(
-            self.left_child.replacement(p1, p2), self.right_child.replacement(p1, p2)
-        )
+    def expand(self, p1: Prop, p2: Prop) -> Prop:
+        return ImplyProp(NotProp(p1), p2)
 
-    def __str__(self) -> str:
-        return (
-            "(" + self.left_child.__str__() + "\\/" + self.right_child.__str__() + ")"
-        )
+    def parts(self) -> tuple:
+        return ("(", self.left_child, "\\/", self.right_child, ")")
 
 
 class IIFProp(AliasProp):
+    __slots__ = ("left_child", "right_child")
+
     def __init__(self, p1: Prop, p2: Prop) -> None:
+        super().__init__()
         self.left_child = p1
         self.right_child = p2
-        p = NotProp(ImplyProp(p1, NotProp(p2)))
-        p = AndProp(ImplyProp(p1, p2), ImplyProp(p2, p1))
-        super().__init__(p)
+        self._free = p1._free | p2._free
+        self._bound = p1._bound | p2._bound
+        self._hash = hash((7, p1._hash, p2._hash))
+        h1 = p1._evalhash
+        h2 = p2._evalhash
+        self._evalhash = _hash_and(_hash_imply(h1, h2), _hash_imply(h2, h1))
+        self._fp = p1._fp | p2._fp | _fingerprint(self._evalhash)
 
-    def substitute(self, x: Variable, y: Variable) -> IIFProp:
-        if self.isfree(x) or self.isbounded(x):
-            return IIFProp(
-                self.left_child.substitute(x, y), self.right_child.substitute(x, y)
-            )
-        return self
+    _evalsize = (2, 5)
 
-    def replacement(self, p1: Prop, p2: Prop) -> Prop:
-        if self == p1:
-            return p2
-        return IIFProp(
-            self.left_child.replacement(p1, p2), self.right_child.replacement(p1, p2)
-        )
+    def expand(self, p1: Prop, p2: Prop) -> Prop:
+        return AndProp(ImplyProp(p1, p2), ImplyProp(p2, p1))
 
-    def __str__(self) -> str:
-        return (
-            "(" + self.left_child.__str__() + "<=>" + self.right_child.__str__() + ")"
-        )
+    def parts(self) -> tuple:
+        return ("(", self.left_child, "<=>", self.right_child, ")")
 
 
 class ExistProp(AliasProp):
+    __slots__ = ("variable", "child")
+
     def __init__(self, x: Variable, p: Prop) -> None:
+        super().__init__()
         self.variable = x
         self.child = p
-        p = NotProp(ForallProp(x, NotProp(p)))
-        super().__init__(p)
+        self._free = p._free & ~(1 << x.index)
+        self._bound = p._bound | 1 << x.index
+        self._hash = hash((8, x, p._hash))
+        self._evalhash = _hash_not(_hash_forall(x, _hash_not(p._evalhash)))
+        self._fp = p._fp | _fingerprint(self._evalhash)
 
-    def substitute(self, x: Variable, y: Variable) -> ExistProp:
-        if self.isfree(x) or self.isbounded(x):
-            if self.variable == x:
-                return ExistProp(y, self.child.substitute(x, y))
-            return ExistProp(self.variable, self.child.substitute(x, y))
-        return self
+    _evalsize = (1, 3)
 
-    def replacement(self, p1: Prop, p2: Prop) -> Prop:
-        if self == p1:
-            return p2
-        return ExistProp(self.variable, self.child.replacement(p1, p2))
+    def expand(self, x: Variable, p: Prop) -> Prop:
+        return NotProp(ForallProp(x, NotProp(p)))
 
-    def __str__(self) -> str:
-        return "(exists " + self.variable.__str__() + "," + self.child.__str__() + ")"
+    def args(self) -> tuple:
+        return (self.variable, self.child)
+
+    def children(self) -> tuple[Prop, ...]:
+        return (self.child,)
+
+    def parts(self) -> tuple:
+        return ("(exists ", self.variable.__str__(), ",", self.child, ")")
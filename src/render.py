@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import io
+import weakref
+from typing import Optional, Protocol
+
+from prop import Prop, VarProp
+
+# Marks what was cut by maxdepth or maxlen.
+ELLIPSIS = "..."
+
+# Rendered text of recently printed props, keyed by id() and checked through
+# a weak reference, so a cached node can still be collected. Only props that
+# are printed whole as a root or as an input of a proof are stored, and only
+# if their text is at most CACHE_TEXT characters long.
+CACHE_SIZE = 4096
+CACHE_TEXT = 4096
+_cache: dict[int, tuple[weakref.ref, str]] = {}
+
+# Flush the buffered text to the sink once it holds this many pieces.
+_FLUSH = 4096
+
+
+class TextSink(Protocol):
+    def write(self, __s: str) -> object:
+        ...
+
+
+class _Capture:
+    """End marker of a prop whose text is being collected for the cache."""
+
+    __slots__ = ("node", "start", "length")
+
+    def __init__(self, node: Prop, start: int, length: int) -> None:
+        self.node: Optional[Prop] = node
+        self.start = start
+        self.length = length
+
+
+class _Define:
+    """End marker of the definition of a shared node."""
+
+    __slots__ = ("node",)
+
+    def __init__(self, node) -> None:
+        self.node = node
+
+
+class _Stop(Exception):
+    pass
+
+
+def cached(p: Prop) -> Optional[str]:
+    """The cached text of p, if any."""
+    entry = _cache.get(id(p))
+    if entry is not None and entry[0]() is p:
+        return entry[1]
+    return None
+
+
+def _store(p: Prop, text: str) -> None:
+    if len(_cache) >= CACHE_SIZE:
+        # Dicts keep insertion order: drop the oldest entry.
+        del _cache[next(iter(_cache))]
+    _cache[id(p)] = (weakref.ref(p), text)
+
+
+def _shared(root) -> list:
+    """The nodes reachable from root more than once, children first.
+
+    Variables are never listed, as a name is already as short as a reference.
+    """
+    refs: dict[int, int] = {}
+    order: list = []
+    stack: list = [(root, False)]
+    while stack:
+        node, ready = stack.pop()
+        if ready:
+            order.append(node)
+            continue
+        key = id(node)
+        if key in refs:
+            refs[key] += 1
+            continue
+        refs[key] = 1
+        stack.append((node, True))
+        for part in reversed(node.parts()):
+            if part.__class__ is not str:
+                stack.append((part, False))
+    return [n for n in order if refs[id(n)] > 1 and not isinstance(n, VarProp)]
+
+
+class _Writer:
+    """The state of one write() call: the stack of what is left to print, and
+    the buffered text."""
+
+    __slots__ = (
+        "sink",
+        "maxdepth",
+        "maxlen",
+        "share",
+        "names",
+        "stack",
+        "out",
+        "length",
+        "written",
+        "capture",
+    )
+
+    def __init__(
+        self,
+        sink: TextSink,
+        maxdepth: Optional[int],
+        maxlen: Optional[int],
+        share: bool,
+    ) -> None:
+        self.sink = sink
+        self.maxdepth = maxdepth
+        self.maxlen = maxlen
+        self.share = share
+        self.names: dict[int, str] = {}
+        # Stack entries are (item, depth, whole), whole telling whether item
+        # is a prop printed as a root or as an input of a proof or theorem.
+        self.stack: list = []
+        self.out: list[str] = []
+        self.length = 0
+        self.written = 0
+        self.capture: Optional[_Capture] = None
+
+    def run(self, obj) -> int:
+        stack = self.stack
+        stack.append((obj, 0, True))
+        if self.share:
+            for k, node in reversed(list(enumerate(_shared(obj), 1))):
+                stack.append(("\n", 0, False))
+                stack.append((_Define(node), 0, False))
+                stack.append((node, 0, True))
+                stack.append((f"let #{k} = ", 0, False))
+        pop = stack.pop
+        try:
+            while stack:
+                item, depth, whole = pop()
+                cls = item.__class__
+                if cls is str:
+                    self.emit(item)
+                elif cls is _Capture:
+                    if item.node is not None:
+                        _store(item.node, "".join(self.out[item.start :]))
+                    self.capture = None
+                elif cls is _Define:
+                    self.names[id(item.node)] = f"#{len(self.names) + 1}"
+                else:
+                    self.visit(item, depth, whole)
+        except _Stop:
+            pass
+        out = self.out
+        self.sink.write("".join(out))
+        return self.written + sum(map(len, out))
+
+    def visit(self, item, depth: int, whole: bool) -> None:
+        """Print item, a prop, proof or theorem, or push its parts."""
+        name = self.names.get(id(item))
+        if name is not None:
+            self.emit(name)
+            return
+        maxdepth = self.maxdepth
+        if maxdepth is not None and depth > maxdepth:
+            self.emit(ELLIPSIS)
+            return
+        push = self.stack.append
+        isprop = isinstance(item, Prop)
+        if isprop and whole and maxdepth is None and not self.share:
+            text = cached(item)
+            if text is not None:
+                self.emit(text)
+                return
+            self.capture = _Capture(item, len(self.out), self.length)
+            push((self.capture, depth, False))
+        for part in reversed(item.parts()):
+            push((part, depth + 1, not isprop))
+
+    def emit(self, text: str) -> None:
+        out = self.out
+        maxlen = self.maxlen
+        if maxlen is not None and self.length + len(text) > maxlen:
+            out.append(text[: maxlen - self.length])
+            out.append(ELLIPSIS)
+            raise _Stop
+        out.append(text)
+        self.length += len(text)
+        capture = self.capture
+        if capture is not None:
+            if self.length - capture.length <= CACHE_TEXT:
+                return
+            # Too long to cache: stop holding on to its text.
+            capture.node = None
+            self.capture = None
+        if len(out) >= _FLUSH:
+            self.sink.write("".join(out))
+            self.written += sum(map(len, out))
+            out.clear()
+
+
+def write(
+    obj,
+    sink: TextSink,
+    maxdepth: Optional[int] = None,
+    maxlen: Optional[int] = None,
+    share: bool = False,
+) -> int:
+    """Stream the text of a prop, proof or theorem into sink.
+
+    Without options the text is str(obj), written in pieces as it is produced,
+    so nothing the size of the whole text is built.
+
+    Args:
+        obj: a Prop, Proof or Theorem, or anything with a parts() method.
+        sink: any object with a write(str) method, such as an open file.
+        maxdepth: print nodes nested deeper than this as "...".
+        maxlen: stop after this many characters, ending with "...".
+        share: print every node reachable more than once a single time, as
+            "let #k = ..." lines before the text of obj, and refer to it as
+            "#k" elsewhere.
+
+    Returns:
+        The number of characters written.
+    """
+    return _Writer(sink, maxdepth, maxlen, share).run(obj)
+
+
+def render(
+    obj,
+    maxdepth: Optional[int] = None,
+    maxlen: Optional[int] = None,
+    share: bool = False,
+) -> str:
+    """The text write() would stream for obj, as a string."""
+    sink = io.StringIO()
+    write(obj, sink, maxdepth, maxlen, share)
+    return sink.getvalue()
@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+from heapq import heappop, heappush
+from typing import Iterable, Optional
+
+import truthtable
+from prop import ImplyProp, NotProp, Prop, VarProp
+
+# Conflicts between restarts are RESTART_BASE times the Luby sequence
+# 1, 1, 2, 1, 1, 2, 4, ...
+RESTART_BASE = 100
+# Activities of variables decay by this factor per conflict.
+DECAY = 0.95
+# Half of the learned clauses are forgotten when there are REDUCE_BASE of
+# them, and each time after that REDUCE_STEP more are allowed.
+REDUCE_BASE = 2000
+REDUCE_STEP = 300
+
+
+def _luby(i: int) -> int:
+    """The i-th term of the Luby sequence, from i = 1."""
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class Solver:
+    """A CDCL SAT solver: two watched literals, first-UIP clause learning
+    with minimization, VSIDS decisions with phase saving, Luby restarts and
+    periodic forgetting of long learned clauses.
+
+    Variables are numbered from 1 and literals are nonzero ints, -v being
+    the negation of v, as in DIMACS. Clauses, learned ones included, are kept
+    across calls to solve(), which may assume literals for one call only.
+    """
+
+    def __init__(self) -> None:
+        # Literal v is coded 2v, and -v is coded 2v + 1, so that negation is
+        # code ^ 1. _value[code] is 1 if the literal is true, -1 if false and
+        # 0 if unassigned.
+        self._value: list[int] = [0, 0]
+        self._level: list[int] = [0]
+        self._reason: list[Optional[list[int]]] = [None]
+        self._activity: list[float] = [0.0]
+        self._phase: list[int] = [1]
+        self._watches: list[list[list[int]]] = [[], []]
+        self._heap: list[tuple[float, int]] = []
+        self._increment = 1.0
+        self._trail: list[int] = []
+        # Trail length at the start of each decision level.
+        self._limits: list[int] = []
+        self._head = 0
+        self._ok = True
+        self._learned: list[list[int]] = []
+        self.maxlearned = REDUCE_BASE
+        self.model: list[bool] = []
+        self.conflicts = 0
+
+    @property
+    def nvars(self) -> int:
+        return len(self._level) - 1
+
+    def newvar(self) -> int:
+        """A new variable, as its positive literal."""
+        v = len(self._level)
+        self._value += (0, 0)
+        self._level.append(0)
+        self._reason.append(None)
+        self._activity.append(0.0)
+        self._phase.append(1)
+        self._watches += ([], [])
+        heappush(self._heap, (0.0, v))
+        return v
+
+    def _code(self, lit: int) -> int:
+        v = abs(lit)
+        if lit == 0 or v > self.nvars:
+            raise ValueError(f"Solver: unknown literal {lit}")
+        return 2 * v + (lit < 0)
+
+    def addclause(self, lits: Iterable[int]) -> bool:
+        """Add the clause of lits, returning False once the clauses are
+        unsatisfiable whatever is assumed."""
+        if not self._ok:
+            return False
+        value = self._value
+        clause: list[int] = []
+        for code in sorted(set(map(self._code, lits))):
+            if value[code] == 1 or code ^ 1 in clause:
+                # Satisfied at level 0, or a tautology.
+                return True
+            if value[code] == 0:
+                clause.append(code)
+        if not clause:
+            self._ok = False
+        elif len(clause) == 1:
+            self._assign(clause[0], None)
+            self._ok = self._propagate() is None
+        else:
+            self._watches[clause[0]].append(clause)
+            self._watches[clause[1]].append(clause)
+        return self._ok
+
+    def _assign(self, code: int, reason: Optional[list[int]]) -> None:
+        v = code >> 1
+        self._value[code] = 1
+        self._value[code ^ 1] = -1
+        self._level[v] = len(self._limits)
+        self._reason[v] = reason
+        self._trail.append(code)
+
+    def _propagate(self) -> Optional[list[int]]:
+        """Assign the literals implied by the trail, returning a conflicting
+        clause if there is one. A clause watches its first two literals, and
+        the implied literal of a reason clause is its first one."""
+        value = self._value
+        watches = self._watches
+        trail = self._trail
+        while self._head < len(trail):
+            false = trail[self._head] ^ 1
+            self._head += 1
+            watching = watches[false]
+            # Compact the clauses still watching false to the front.
+            i = j = 0
+            n = len(watching)
+            while i < n:
+                clause = watching[i]
+                i += 1
+                first = clause[0]
+                if first == false:
+                    first = clause[0] = clause[1]
+                    clause[1] = false
+                if value[first] != 1:
+                    for k in range(2, len(clause)):
+                        code = clause[k]
+                        if value[code] != -1:
+                            clause[1] = code
+                            clause[k] = false
+                            watches[code].append(clause)
+                            break
+                    else:
+                        if value[first] == -1:
+                            watching[j] = clause
+                            del watching[j + 1 : i]
+                            self._head = len(trail)
+                            return clause
+                        self._assign(first, clause)
+                    if clause[1] != false:
+                        continue
+                watching[j] = clause
+                j += 1
+            del watching[j:]
+        return None
+
+    def _bump(self, v: int) -> None:
+        a = self._activity[v] + self._increment
+        self._activity[v] = a
+        if a > 1e100:
+            # Rescale; the heap order only depends on ratios.
+            self._activity = [x * 1e-100 for x in self._activity]
+            self._increment *= 1e-100
+            self._heap = [(-self._activity[u], u) for _, u in self._heap]
+            self._heap.sort()
+        else:
+            heappush(self._heap, (-a, v))
+
+    def _analyze(self, conflict: list[int]) -> tuple[list[int], int]:
+        """The first-UIP clause learned from conflict, asserting its first
+        literal, and the level to go back to."""
+        level = self._level
+        reason = self._reason
+        current = len(self._limits)
+        seen = set()
+        learned = [0]
+        pending = 0
+        code = -1
+        index = len(self._trail) - 1
+        clause = conflict
+        while True:
+            for q in clause if code < 0 else clause[1:]:
+                v = q >> 1
+                if v not in seen and level[v] > 0:
+                    seen.add(v)
+                    self._bump(v)
+                    if level[v] == current:
+                        pending += 1
+                    else:
+                        learned.append(q)
+            while self._trail[index] >> 1 not in seen:
+                index -= 1
+            code = self._trail[index]
+            index -= 1
+            pending -= 1
+            if not pending:
+                break
+            clause = reason[code >> 1]  # type: ignore
+        learned[0] = code ^ 1
+        # Drop the literals implied by the others.
+        kept = [learned[0]]
+        for q in learned[1:]:
+            r = reason[q >> 1]
+            if r is None or any(
+                c >> 1 not in seen and level[c >> 1] > 0 for c in r[1:]
+            ):
+                kept.append(q)
+        learned = kept
+        back = 0
+        if len(learned) > 1:
+            # Watch a literal of the highest remaining level second.
+            i = max(range(1, len(learned)), key=lambda i: level[learned[i] >> 1])
+            learned[1], learned[i] = learned[i], learned[1]
+            back = level[learned[1] >> 1]
+        return learned, back
+
+    def _reduce(self) -> None:
+        """Forget the less useful half of the learned clauses: the longest
+        ones, keeping binary clauses and the reasons of assignments."""
+        reason = self._reason
+        self._learned.sort(key=len)
+        half = len(self._learned) // 2
+        forgotten = set()
+        kept = self._learned[:half]
+        for clause in self._learned[half:]:
+            if len(clause) > 2 and reason[clause[0] >> 1] is not clause:
+                forgotten.add(id(clause))
+            else:
+                kept.append(clause)
+        self._learned = kept
+        for watching in self._watches:
+            watching[:] = [c for c in watching if id(c) not in forgotten]
+
+    def _cancel(self, target: int) -> None:
+        """Undo the assignments above decision level target."""
+        if len(self._limits) <= target:
+            return
+        value = self._value
+        start = self._limits[target]
+        for code in self._trail[start:]:
+            v = code >> 1
+            value[code] = value[code ^ 1] = 0
+            self._reason[v] = None
+            self._phase[v] = code & 1
+            heappush(self._heap, (-self._activity[v], v))
+        del self._trail[start:]
+        del self._limits[target:]
+        self._head = start
+
+    def _decide(self) -> int:
+        """An unassigned variable of highest activity, as a literal code in
+        its saved phase, or -1 if all are assigned."""
+        value = self._value
+        heap = self._heap
+        while heap:
+            v = heappop(heap)[1]
+            if value[2 * v] == 0:
+                return 2 * v + self._phase[v]
+        return -1
+
+    def _learn(self, conflict: list[int]) -> None:
+        """Learn a clause from conflict and backjump to where it propagates."""
+        learned, back = self._analyze(conflict)
+        self._cancel(back)
+        if len(learned) == 1:
+            self._assign(learned[0], None)
+        else:
+            self._watches[learned[0]].append(learned)
+            self._watches[learned[1]].append(learned)
+            self._learned.append(learned)
+            self._assign(learned[0], learned)
+        self._increment /= DECAY
+        if len(self._learned) >= self.maxlearned:
+            self._reduce()
+            self.maxlearned += REDUCE_STEP
+
+    def solve(self, assumptions: Iterable[int] = ()) -> bool:
+        """Whether the clauses and assumptions are satisfiable. If so,
+        self.model[v] is the value of variable v in a model."""
+        self.model = []
+        if not self._ok:
+            return False
+        assumed = [self._code(lit) for lit in assumptions]
+        restarts = 0
+        budget = RESTART_BASE
+        value = self._value
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                budget -= 1
+                if not self._limits:
+                    self._ok = False
+                    return False
+                self._learn(conflict)
+                continue
+            if budget <= 0:
+                restarts += 1
+                budget = RESTART_BASE * _luby(restarts + 1)
+                self._cancel(0)
+            level = len(self._limits)
+            if level < len(assumed):
+                code = assumed[level]
+                if value[code] == -1:
+                    # The assumptions contradict the clauses.
+                    self._cancel(0)
+                    return False
+                self._limits.append(len(self._trail))
+                if value[code] == 0:
+                    self._assign(code, None)
+                continue
+            code = self._decide()
+            if code < 0:
+                self.model = [value[2 * v] == 1 for v in range(self.nvars + 1)]
+                self._cancel(0)
+                return True
+            self._limits.append(len(self._trail))
+            self._assign(code, None)
+
+
+class Encoder:
+    """Tseitin encoding of props into the clauses of a Solver.
+
+    Each distinct node of the eval() DAG gets one literal, and NotProp nodes
+    just negate the literal of their child, so shared subformulas are encoded
+    once across all props given to the same encoder. Each ImplyProp node x
+    adds the clauses of x <=> (!left \\/ right).
+    """
+
+    def __init__(self, solver: Optional[Solver] = None) -> None:
+        self.solver = solver if solver is not None else Solver()
+        self.atoms: dict[VarProp, int] = {}
+        self._lits: dict[Prop, int] = {}
+
+    def lit(self, p: Prop) -> int:
+        """The literal equivalent to p in every model of the clauses.
+
+        Raise:
+            ValueError: if p has quantifiers.
+        """
+        lits = self._lits
+        root = p.eval()
+        stack: list = [root]
+        while stack:
+            node = stack.pop()
+            if node in lits:
+                continue
+            cls = node.__class__
+            if cls is VarProp:
+                lits[node] = self.atoms[node] = self.solver.newvar()  # type: ignore
+                continue
+            missing = [c for c in node.children() if c not in lits]
+            if missing:
+                stack.append(node)
+                stack.extend(missing)
+            elif cls is NotProp:
+                lits[node] = -lits[node.child]
+            elif cls is ImplyProp:
+                a = lits[node.left_child]
+                b = lits[node.right_child]
+                x = self.solver.newvar()
+                self.solver.addclause((-x, -a, b))
+                self.solver.addclause((a, x))
+                self.solver.addclause((-b, x))
+                lits[node] = x
+            else:
+                name = node.getname()
+                raise ValueError(f"Encoder.lit(): {name} is not propositional")
+        return lits[root]
+
+    def countermodel(self, p: Prop) -> Optional[dict[VarProp, bool]]:
+        """An assignment of the atoms of p making it false, or None if p is
+        valid. The clauses of other props encoded before stay satisfiable, as
+        they only define fresh variables."""
+        if not self.solver.solve([-self.lit(p)]):
+            return None
+        model = self.solver.model
+        atoms = {id(atom) for atom in truthtable.atoms(p)}
+        return {a: model[v] for a, v in self.atoms.items() if id(a) in atoms}
+
+    def isvalid(self, p: Prop) -> bool:
+        """Whether p is true under every assignment of its atoms."""
+        return not self.solver.solve([-self.lit(p)])
+
+
+def isvalid(p: Prop) -> bool:
+    """Whether p is true under every assignment of its atoms."""
+    return Encoder().isvalid(p)
+
+
+def countermodel(p: Prop) -> Optional[dict[VarProp, bool]]:
+    """An assignment of the atoms of p making it false, or None if p is
+    valid."""
+    return Encoder().countermodel(p)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import mmap
+from typing import Iterable, Union
+
+from prop import (
+    AndProp,
+    ExistProp,
+    ForallProp,
+    IIFProp,
+    ImplyProp,
+    NotProp,
+    OrProp,
+    Prop,
+    VarProp,
+)
+from variable import Variable
+
+# Binary format, all integers unsigned LEB128 varints:
+#
+#   file     := MAGIC node*
+#   node     := tag var? node*     a new node: its arguments in order
+#             | BACKREF index      a node already written, by preorder number
+#   var      := 0 length utf8      a new variable, numbered in order of
+#             | number + 1         appearance, or a known one
+#
+# Every new node gets the next preorder number when its tag is written, so a
+# subformula shared anywhere in the DAG, across formulas too, is written once.
+MAGIC = b"FOL\x01"
+
+_CLASSES: tuple[type, ...] = (
+    VarProp,
+    NotProp,
+    ImplyProp,
+    ForallProp,
+    AndProp,
+    OrProp,
+    IIFProp,
+    ExistProp,
+)
+_TAGS = {cls: tag for tag, cls in enumerate(_CLASSES)}
+BACKREF = len(_CLASSES)
+# Number of node arguments after the optional variable, per tag.
+_CHILDREN = (0, 1, 2, 1, 2, 2, 2, 1)
+_BINDS = (True, False, False, True, False, False, False, True)
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def _varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def dumps(props: Iterable[Prop]) -> bytes:
+    """Encode props, sharing every repeated subformula."""
+    out = bytearray(MAGIC)
+    append = out.append
+    numbers: dict[int, int] = {}
+    # Numbered nodes by number: props may be built on the fly and dropped, and
+    # keeping them alive keeps their ids from being reused by later nodes.
+    nodes: list[Prop] = []
+    variables: dict[Variable, int] = {}
+    for root in props:
+        stack: list = [root]
+        pop = stack.pop
+        extend = stack.extend
+        while stack:
+            item = pop()
+            if item.__class__ is Variable:
+                number = variables.get(item)
+                if number is None:
+                    variables[item] = len(variables)
+                    name = item.content.encode()
+                    append(0)
+                    _varint(out, len(name))
+                    out += name
+                else:
+                    _varint(out, number + 1)
+                continue
+            number = numbers.get(id(item))
+            if number is not None:
+                append(BACKREF)
+                _varint(out, number)
+                continue
+            tag = _TAGS.get(item.__class__)
+            if tag is None:
+                raise ValueError(f"dumps(): cannot encode {item.getname()}")
+            numbers[id(item)] = len(nodes)
+            nodes.append(item)
+            append(tag)
+            args = item.args()
+            extend(args[::-1])
+    return bytes(out)
+
+
+def loads(data: Buffer) -> list[Prop]:
+    """Decode the props encoded by dumps().
+
+    data may be any buffer, including an mmap; it is read in place through a
+    memoryview, and only variable names are copied out of it.
+
+    Raise:
+        ValueError: if data is not a complete encoding.
+    """
+    with memoryview(data) as base, base.cast("B") as view:
+        return _decode(view)
+
+
+def _readvarint(view: memoryview, pos: int) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        byte = view[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _readvariable(
+    view: memoryview, pos: int, variables: list[Variable]
+) -> tuple[Variable, int]:
+    """The variable at pos, a new one being added to variables, and the
+    position after it."""
+    number, pos = _readvarint(view, pos)
+    if number:
+        return variables[number - 1], pos
+    length, pos = _readvarint(view, pos)
+    if pos + length > len(view):
+        raise IndexError
+    x = Variable(str(view[pos : pos + length], "utf-8"))
+    variables.append(x)
+    return x, pos + length
+
+
+def _finish(p: Prop, stack: list[list], nodes: list, roots: list[Prop]) -> None:
+    """Hand the finished p to the innermost unfinished node, finishing that
+    one too if it was its last argument, or to roots if there is none."""
+    while stack:
+        frame = stack[-1]
+        args = frame[2]
+        args.append(p)
+        if len(args) < frame[3]:
+            return
+        stack.pop()
+        p = nodes[frame[1]] = _CLASSES[frame[0]](*args)
+    roots.append(p)
+
+
+def _decode(view: memoryview) -> list[Prop]:
+    end = len(view)
+    if view[: len(MAGIC)] != MAGIC:
+        raise ValueError("loads(): not a serialized prop")
+    pos = len(MAGIC)
+    nodes: list = []
+    variables: list[Variable] = []
+    roots: list[Prop] = []
+    # Frames of the nodes being decoded: [tag, number, args, arity].
+    stack: list[list] = []
+    try:
+        while pos < end or stack:
+            tag = view[pos]
+            pos += 1
+            if tag == BACKREF:
+                number, pos = _readvarint(view, pos)
+                if number >= len(nodes) or nodes[number] is None:
+                    raise ValueError(f"loads(): bad reference at offset {pos}")
+                p = nodes[number]
+            elif tag < BACKREF:
+                args: list = []
+                if _BINDS[tag]:
+                    x, pos = _readvariable(view, pos, variables)
+                    args.append(x)
+                number = len(nodes)
+                nodes.append(None)
+                arity = _CHILDREN[tag] + len(args)
+                if len(args) < arity:
+                    stack.append([tag, number, args, arity])
+                    continue
+                p = nodes[number] = _CLASSES[tag](*args)
+            else:
+                raise ValueError(f"loads(): bad tag {tag} at offset {pos - 1}")
+            _finish(p, stack, nodes, roots)
+    except IndexError:
+        raise ValueError("loads(): truncated data") from None
+    return roots
+
+
+def dump(props: Iterable[Prop], path: str) -> None:
+    """Write dumps(props) to the file at path."""
+    with open(path, "wb") as f:
+        f.write(dumps(props))
+
+
+def load(path: str) -> list[Prop]:
+    """Decode the file at path written by dump(), reading it through mmap."""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return loads(m)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable, Iterator
+
+from prop import (
+    AndProp,
+    ExistProp,
+    ForallProp,
+    IIFProp,
+    ImplyProp,
+    NotProp,
+    OrProp,
+    Prop,
+    VarProp,
+)
+from variable import Variable
+
+# A variable name is anything up to the next delimiter of the syntax, except
+# "#", which Prop.alphakey() reserves for its index variables.
+_NAME = r"[^\s()!,=<>/\\#]+"
+
+# One token per match, after optional whitespace: a quantifier head
+# "(forall x," or "(exists x,", an operator or parenthesis, a variable, or
+# (last) any other character, which is an error.
+_TOKEN = re.compile(
+    rf"\s*(?:\((forall|exists) +({_NAME}) *,|(<=>|=>|/\\|\\/|[!()])|({_NAME})|(\S))"
+)
+
+_BINARY = {"=>": ImplyProp, "/\\": AndProp, "\\/": OrProp, "<=>": IIFProp}
+_QUANTIFIER = {"forall": ForallProp, "exists": ExistProp}
+
+# Markers on the parser stack besides finished props.
+_NOT = "!"
+_OPEN = "("
+
+
+class _Parser:
+    """Shift-reduce parser for the syntax printed by Prop.__str__.
+
+    The syntax is fully parenthesized, so every token is either shifted onto
+    an explicit stack or closes the innermost open construct. Each token is
+    handled in O(1), there is no recursion, and the stack carries over from
+    one chunk of text to the next.
+    """
+
+    __slots__ = ("stack", "offset", "varprops")
+
+    def __init__(self) -> None:
+        self.stack: list = []
+        self.offset = 0
+        self.varprops: dict[str, Prop] = {}
+
+    def error(self, message: str, text: str, index: int) -> ValueError:
+        # Tokens are scanned in bulk, so locate the bad one only now.
+        for i, m in enumerate(_TOKEN.finditer(text)):
+            if i == index:
+                pos = self.offset + m.start(m.lastindex)  # type: ignore
+                return ValueError(f"parse(): {message} at offset {pos}")
+        return ValueError(f"parse(): {message} at offset {self.offset + len(text)}")
+
+    def feed(self, text: str) -> list[Prop]:
+        """Parse text, returning the formulas completed in it, in order."""
+        push = self.stack.append
+        varprops = self.varprops
+        done: list[Prop] = []
+        for index, (quantifier, name, op, var, bad) in enumerate(_TOKEN.findall(text)):
+            if var:
+                p = varprops.get(var)
+                if p is None:
+                    p = varprops[var] = VarProp(Variable(var))
+                self.finish(p, done, text, index)
+            elif quantifier:
+                push((_QUANTIFIER[quantifier], Variable(name)))
+            elif op == "!":
+                push(_NOT)
+            elif op == "(":
+                push(_OPEN)
+            elif op == ")":
+                self.finish(self.reduce(text, index), done, text, index)
+            elif op:
+                self.shift(op, text, index)
+            else:
+                raise self.error(f"unexpected {bad!r}", text, index)
+        self.offset += len(text)
+        return done
+
+    def reduce(self, text: str, index: int) -> Prop:
+        """Close the innermost open construct at a ')' token."""
+        stack = self.stack
+        pop = stack.pop
+        if len(stack) < 2 or not isinstance(stack[-1], Prop):
+            raise self.error("unexpected ')'", text, index)
+        p = pop()
+        head = pop()
+        if head.__class__ is tuple:
+            return head[0](head[1], p)
+        if isinstance(head, type):
+            # (left op p), checked when op was shifted.
+            left = pop()
+            pop()
+            return head(left, p)
+        raise self.error("unexpected ')'", text, index)
+
+    def shift(self, op: str, text: str, index: int) -> None:
+        """Shift a binary operator, which must follow "(" and a prop."""
+        stack = self.stack
+        if len(stack) < 2 or not isinstance(stack[-1], Prop) or stack[-2] is not _OPEN:
+            raise self.error(f"unexpected {op!r}", text, index)
+        stack.append(_BINARY[op])
+
+    def finish(self, p: Prop, done: list[Prop], text: str, index: int) -> None:
+        """A finished prop: apply pending negations, then either complete a
+        formula or wait for whatever encloses it."""
+        stack = self.stack
+        while stack and stack[-1] is _NOT:
+            stack.pop()
+            p = NotProp(p)
+        if not stack:
+            done.append(p)
+        elif isinstance(stack[-1], Prop):
+            raise self.error("missing operator", text, index)
+        else:
+            stack.append(p)
+
+    def close(self) -> None:
+        if self.stack:
+            message = f"parse(): unexpected end of input at offset {self.offset}"
+            raise ValueError(message)
+
+
+def parse(text: str) -> Prop:
+    """The prop printed as text, so that parse(str(p)) is p.
+
+    Raise:
+        ValueError: if text is not exactly one formula of the printed syntax.
+    """
+    parser = _Parser()
+    props = parser.feed(text)
+    parser.close()
+    if len(props) != 1:
+        raise ValueError(f"parse(): expected one formula, found {len(props)}")
+    return props[0]
+
+
+def iterparse(chunks: Iterable[str]) -> Iterator[Prop]:
+    """Parse a stream of formulas, yielding each as soon as it is complete.
+
+    chunks is any iterable of text, such as an open file; formulas may span
+    chunks as long as no token is split between two of them, which holds for
+    the lines of a file. Formulas are separated by whitespace or follow each
+    other directly.
+
+    Raise:
+        ValueError: on the first syntax error, or if the input ends in the
+            middle of a formula.
+    """
+    parser = _Parser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
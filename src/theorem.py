@@ -22,6 +22,7 @@ from prop import (
     NotProp,
     OrProp,
     Prop,
+    _join,
 )
 from variable import Variable
 
@@ -33,6 +34,21 @@ class Theorem:
     def getname(self) -> str:
         return self.__class__.__name__
 
+    def parts(self) -> tuple:
+        """Printed form of this theorem as Name(input1, input2, ...), where the
+        inputs are left as props and proofs."""
+        parts: list = [self.getname(), "("]
+        for a in self.input.values():
+            parts.append(a.__str__() if isinstance(a, Variable) else a)
+            parts.append(", ")
+        if len(parts) > 2:
+            parts.pop()
+        parts.append(")")
+        return tuple(parts)
+
+    def __str__(self) -> str:
+        return _join(self)
+
 
 class Reflexive(Theorem):
     def __init__(self, p: Prop) -> None:
@@ -54,9 +70,6 @@ class Reflexive(Theorem):
         self.input = {"prop1": p}
         super().__init__(proof5)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}[{self.input['prop1']}]"
-
 
 class Transitive(Theorem):
     def __init__(self, proof1: Proof, proof2: Proof) -> None:
@@ -96,9 +109,6 @@ class Transitive(Theorem):
         }
         super().__init__(proof7)
 
-    def __str__(self) -> str:
-        return f"{self.getname()} ({self.input['proof1'].__str__()}, {self.input['proof2'].__str__()})"
-
 
 class TransitionWithEval(Theorem):
     def __init__(self, proof1: Proof, proof2: Proof) -> None:
@@ -137,80 +147,466 @@ class TransitionWithEval(Theorem):
         }
         super().__init__(proof7)
 
-    def __str__(self) -> str:
-        return f"{self.getname()} ({self.input['proof1'].__str__()}, {self.input['proof2'].__str__()})"
-
 
 class Deduction(Theorem):
-    def __init__(self, assume: Assumption, proof: Proof) -> None:
+    def __init__(self, assume: Assumption, proof: Proof, compact: bool = False) -> None:
         """Deduction: remove assumption (Not in Generalization)
 
         Assumption[a] |=> b ===> |=> h_imply(a, b)
 
+        The proof DAG is walked once, with an explicit stack, and each
+        distinct subproof is discharged once however many steps use it, so
+        the result is linear in the number of distinct subproofs and the
+        depth of the proof is not limited by the recursion limit.
+
+        Each subproof b' is discharged like a combinator is abstracted: by
+        Reflexive if it is the assumption, Axiom1 (K) if it is not based on
+        it, Axiom2 (S) for ModusPonens. With compact, a subproof based on the
+        assumption first gets shorter translations when it has one:
+            - Reflexive(a) if b' proves a itself, however it does;
+            - the proof of a subproof not based on the assumption with Axiom1,
+              if one proves the same prop;
+            - the result of a subproof of the same prop already discharged;
+            - for ModusPonens(c, d) with c proving a, and d: a => b' not based
+              on the assumption, d itself (eta reduction).
+        They yield the same prop, and each is no longer than the plain one.
+
         Raise:
             "Deduction(): x which in Gen(..., x) should not be free in assume."
 
         Args:
             assumption (Assumption): any assumption a
             proof (Proof): any proof b
+            compact (bool): use the shorter translations
 
         Returns:
             Proof: a => b
         """
-        output = proof
-        if proof.getname() == "Assumption" and assume == proof:
-            output = Reflexive(proof.prop).proof
-        elif (
-            proof.getname()
-            in [
-                "Axiom1",
-                "Axiom2",
-                "Axiom3",
-                "ForallElimAxiom",
-                "ForallImplyExchangeAxiom",
-                "Assumption",
-                "ToEvalAxiom",
-                "FromEvalAxiom",
-            ]
-            or assume not in proof.assumption
-        ):
-            """proof is not based on assumption x"""
-            output = ModusPonens(proof, Axiom1(proof.prop, assume.prop))
-        elif proof.getname() == "Generalization":
-            g_proof1: Generalization = proof  # type: ignore
-            g_proof2 = g_proof1.input["proof1"]
-            g_x = g_proof1.input["var1"]
-            if assume.prop.isfree(g_x):
-                raise ValueError(
-                    "Deduction(): x which in Gen(..., x) should not be free in assume."
-                )
-            g_proof4 = Deduction(assume, g_proof2).proof  # assume.prop => g_proof2.prop
-            g_proof5 = Axiom5(
-                assume.prop, g_proof2.prop, g_x
-            )  # (forall x, assume.prop => g_proof2.prop) => (assume.prop => (forall x, g_proof2.prop))
-            g_proof6 = Generalization(
-                g_proof4, g_x
-            )  # (forall x, assume.prop => g_proof2.prop)
-            g_proof7 = ModusPonens(
-                g_proof6, g_proof5
-            )  # (assume.prop => (forall x, g_proof2.prop))
-            output = g_proof7
-        elif proof.getname() == "ModusPonens":
-            proof2: ModusPonens = proof  # type: ignore
-            proof3 = Deduction(assume, proof2.input["proof1"]).proof
-            proof4 = Deduction(assume, proof2.input["proof2"]).proof
-            proof5 = Axiom2(assume.prop, proof2.input["proof1"].prop, proof2.prop)
-            proof6 = ModusPonens(proof4, proof5)
-            proof7 = ModusPonens(proof3, proof6)
-            output = proof7
+        self.input = {"proof1": assume, "proof2": proof}
+        super().__init__(_deduce(assume, proof, compact))
+
+
+def _deduce(assume: Assumption, proof: Proof, compact: bool) -> Proof:
+    """The proof of assume.prop => proof.prop of Deduction()."""
+    a = assume.prop
+    # Discharged subproofs, by id(): the nodes of proof are kept alive by
+    # proof itself while the walk lasts. With compact, they are also kept by
+    # id() of their prop, as are the subproofs not based on assume.
+    done: dict[int, Proof] = {}
+    byprop: dict[int, Proof] = {}
+    known = _known(assume._assumed, proof) if compact else {}
+    stack: list[Proof] = [proof]
+    while stack:
+        node = stack[-1]
+        if id(node) in done:
+            stack.pop()
+            continue
+        output = _shortcut(a, node, byprop, known) if compact else None
+        if output is None:
+            missing = [p for p in _premises(a, node) if id(p) not in done]
+            if missing:
+                stack.extend(missing)
+                continue
+            output = _discharge(assume, node, done)
+        done[id(node)] = output
+        if compact:
+            byprop[id(node.prop)] = output
+        stack.pop()
+    return done[id(proof)]
+
+
+def _known(assumed: int, proof: Proof) -> dict[int, Proof]:
+    """The subproofs of proof based on none of the assumptions in the mask
+    assumed, by id() of their prop."""
+    known: dict[int, Proof] = {}
+    seen = set()
+    stack = [proof]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if node._assumed & assumed:
+            stack.extend(p for p in node._input if isinstance(p, Proof))
         else:
-            raise ValueError("Deduction(): Unknown kinds of proof.")
+            known.setdefault(id(node.prop), node)
+    return known
+
+
+def _within(node: Proof, other: Proof | None) -> Proof | None:
+    """other, if it is based on no assumption node is not based on."""
+    if other is not None and other._assumed & ~node._assumed:
+        return None
+    return other
+
+
+def _shortcut(
+    a: Prop, node: Proof, byprop: dict[int, Proof], known: dict[int, Proof]
+) -> Proof | None:
+    """A compact proof of a => node.prop, see Deduction(), or None."""
+    if not node.isassumed(a):
+        return None
+    output = _within(node, byprop.get(id(node.prop)))
+    if output is not None:
+        return output
+    if node.prop is a:
+        return Reflexive(a).proof
+    other = _within(node, known.get(id(node.prop)))
+    if other is not None:
+        return ModusPonens(other, Axiom1(other.prop, a))
+    if node.__class__ is ModusPonens:
+        proof1, proof2 = node._input
+        if proof1.prop is a and not proof2.isassumed(a):
+            return proof2
+    return None
+
+
+def _premises(a: Prop, node: Proof) -> list[Proof]:
+    """The subproofs whose discharge that of node is built from."""
+    if node.__class__ is Assumption or not node.isassumed(a):
+        return []
+    return [p for p in node._input if isinstance(p, Proof)]
+
+
+def _discharge(assume: Assumption, node: Proof, done: dict[int, Proof]) -> Proof:
+    """The proof of a => node.prop from those of its premises in done."""
+    a = assume.prop
+    cls = node.__class__
+    if cls is Assumption and assume == node:
+        return Reflexive(node.prop).proof
+    if not node.isassumed(a):
+        # node is not based on assume
+        return ModusPonens(node, Axiom1(node.prop, a))
+    if cls is Generalization:
+        g_proof2, g_x = node._input
+        if a.isfree(g_x):
+            raise ValueError(
+                "Deduction(): x which in Gen(..., x) should not be free in assume."
+            )
+        g_proof4 = done[id(g_proof2)]  # a => g_proof2.prop
+        # (forall x, a => g_proof2.prop) => (a => (forall x, g_proof2.prop))
+        g_proof5 = Axiom5(a, g_proof2.prop, g_x)
+        # (forall x, a => g_proof2.prop)
+        g_proof6 = Generalization(g_proof4, g_x)
+        # (a => (forall x, g_proof2.prop))
+        return ModusPonens(g_proof6, g_proof5)
+    if cls is ModusPonens:
+        proof1, proof2 = node._input
+        proof3 = done[id(proof1)]  # a => proof1.prop
+        proof4 = done[id(proof2)]  # a => (proof1.prop => node.prop)
+        proof5 = Axiom2(a, proof1.prop, node.prop)
+        proof6 = ModusPonens(proof4, proof5)
+        return ModusPonens(proof3, proof6)
+    raise ValueError("Deduction(): Unknown kinds of proof.")
+
+
+class MultiDeduction(Theorem):
+    def __init__(
+        self, assumes: list[Assumption], proof: Proof, compact: bool = False
+    ) -> None:
+        """Deduction of several assumptions at once
+
+        Assumption[a1], ..., Assumption[ak] |=> b ===> |=> a1 => (... => (ak => b))
+
+        The same prop as Deduction(assumes[0], Deduction(..., Deduction(
+        assumes[-1], proof).proof).proof), but the proof DAG is walked once
+        rather than k times, each pass walking the output of the one before.
+
+        A subproof b' based on the assumptions ai, ..., aj in that order
+        becomes a proof of ai => (... => (aj => b')), widened where a step
+        combines it with a subproof based on other assumptions: by Axiom1 for
+        the ones before ai, and by a lemma b' => (... => b') under the ones
+        before for the others. The lemmas of ModusPonens and Generalization
+        over several assumptions are built once per props. An assumption given
+        twice is discharged by its last occurrence, as with nested Deduction.
+        With compact, the shortcuts of Deduction() are taken in the same walk:
+        an output already built for the same prop, Reflexive for a subproof
+        proving one of the assumptions, a subproof based on none of them that
+        proves the same prop, and eta for ModusPonens(c, d) with c proving an
+        assumption and d based on none.
 
-        self.input = {"proof1": assume, "proof2": proof}
-        super().__init__(output)
+        Raise:
+            "Deduction(): x which in Gen(..., x) should not be free in assume."
+                if x is free in one of the assumptions the subproof of
+                Gen(..., x) is based on.
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['proof1'].__str__()}, {self.input['proof2'].__str__()})"
+        Args:
+            assumes (list[Assumption]): assumptions a1, ..., ak
+            proof (Proof): any proof b
+            compact (bool): use the shorter translations
+
+        Returns:
+            Proof: a1 => (... => (ak => b))
+        """
+        self.input = {"proof1": tuple(assumes), "proof2": proof}
+        super().__init__(_MultiDischarge(assumes, compact).run(proof))
+
+    def parts(self) -> tuple:
+        """Printed form as Name([assume1, assume2, ...], proof)."""
+        parts: list = [self.getname(), "(["]
+        for a in self.input["proof1"]:
+            parts.append(a)
+            parts.append(", ")
+        if len(parts) > 2:
+            parts.pop()
+        parts.extend(("], ", self.input["proof2"], ")"))
+        return tuple(parts)
+
+
+def _positions(mask: int) -> list[int]:
+    """The positions of the bits set in mask, from the lowest."""
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+
+def _under(a: Prop, lemma: Proof) -> Proof:
+    """From lemma: c => d to (a => c) => (a => d)."""
+    imply: ImplyProp = lemma.prop  # type: ignore
+    step = ModusPonens(lemma, Axiom1(imply, a))
+    return ModusPonens(step, Axiom2(a, imply.left_child, imply.right_child))
+
+
+class _MultiDischarge:
+    """The walk of MultiDeduction() over props a1, ..., ak.
+
+    Sets of assumptions are bitmasks over their positions in props, and
+    chain(m, p) is the prop aj => (... => p) over the positions of m.
+    """
+
+    __slots__ = ("props", "levels", "lemmas", "compact", "position", "byprop", "known")
+
+    def __init__(self, assumes: list[Assumption], compact: bool) -> None:
+        self.props = props = [a.prop for a in assumes]
+        last = {a: j for j, a in enumerate(props)}
+        self.levels = [j for j, a in enumerate(props) if last[a] == j]
+        # Closed lemmas, by masks and id() of their props and variables,
+        # which the proof keeps alive.
+        self.lemmas: dict[tuple, Proof] = {}
+        self.compact = compact
+        # With compact, the position of each assumption by id() of its prop,
+        # the outputs by id() of the prop they discharge, and the subproofs
+        # based on none of the assumptions by id() of their prop.
+        self.position = {id(props[j]): j for j in self.levels}
+        self.byprop: dict[int, tuple[int, Proof]] = {}
+        self.known: dict[int, Proof] = {}
+
+    def run(self, proof: Proof) -> Proof:
+        """The proof of chain(all, proof.prop)."""
+        # Discharged subproofs, by id(), as (m, proof of chain(m, ...)) with
+        # m within the assumptions they are based on.
+        done: dict[int, tuple[int, Proof]] = {}
+        if self.compact:
+            assumed = 0
+            for j in self.levels:
+                assumed |= 1 << Assumption._index[self.props[j]]
+            self.known = _known(assumed, proof)
+        stack: list[Proof] = [proof]
+        while stack:
+            node = stack[-1]
+            if id(node) in done:
+                stack.pop()
+                continue
+            mask = self.based(node)
+            entry = self.shortcut(node, mask) if self.compact else None
+            if entry is None:
+                missing = [p for p in self.premises(node, mask) if id(p) not in done]
+                if missing:
+                    stack.extend(missing)
+                    continue
+                entry = self.discharge(node, mask, done)
+            done[id(node)] = entry
+            if self.compact:
+                self.byprop[id(node.prop)] = entry
+            stack.pop()
+        full = (1 << len(self.props)) - 1
+        return self.widen(done[id(proof)], proof.prop, full)
+
+    def based(self, node: Proof) -> int:
+        props = self.props
+        return sum(1 << j for j in self.levels if node.isassumed(props[j]))
+
+    def premises(self, node: Proof, mask: int) -> list[Proof]:
+        """The subproofs whose discharge that of node is built from."""
+        if not mask or node.__class__ is Assumption:
+            return []
+        return [p for p in node._input if isinstance(p, Proof)]
+
+    def chain(self, mask: int, p: Prop) -> Prop:
+        for j in reversed(_positions(mask)):
+            p = ImplyProp(self.props[j], p)
+        return p
+
+    def shortcut(self, node: Proof, mask: int) -> tuple[int, Proof] | None:
+        """A compact entry of node, see MultiDeduction(), or None."""
+        if not mask:
+            return None
+        entry = self.byprop.get(id(node.prop))
+        if (
+            entry is not None
+            and not entry[0] & ~mask
+            and _within(node, entry[1]) is not None
+        ):
+            return entry
+        j = self.position.get(id(node.prop))
+        if j is not None and mask >> j & 1:
+            return 1 << j, Reflexive(node.prop).proof
+        other = _within(node, self.known.get(id(node.prop)))
+        if other is not None:
+            return 0, other
+        if node.__class__ is ModusPonens:
+            proof1, proof2 = node._input
+            j = self.position.get(id(proof1.prop))
+            if j is not None and mask >> j & 1 and not self.based(proof2):
+                return 1 << j, proof2
+        return None
+
+    def discharge(self, node: Proof, mask: int, done: dict) -> tuple[int, Proof]:
+        """The entry of node from those of its premises."""
+        cls = node.__class__
+        if not mask:
+            # node is not based on assumes
+            return 0, node
+        if cls is Assumption:
+            return mask, Reflexive(node.prop).proof
+        if cls is Generalization:
+            g_proof2, g_x = node._input
+            return self.generalization(done[id(g_proof2)], g_proof2.prop, g_x)
+        if cls is ModusPonens:
+            proof1, proof2 = node._input
+            return self.modusponens(done[id(proof1)], done[id(proof2)], proof2.prop)
+        raise ValueError("Deduction(): Unknown kinds of proof.")
+
+    def generalization(
+        self, entry: tuple[int, Proof], g: Prop, x: Variable
+    ) -> tuple[int, Proof]:
+        """From entry (m, proof of chain(m, g)) to chain(m, forall x, g)."""
+        mask, g_proof4 = entry
+        if not mask:
+            return 0, Generalization(g_proof4, x)
+        positions = _positions(mask)
+        if any(self.props[j].isfree(x) for j in positions):
+            raise ValueError(
+                "Deduction(): x which in Gen(..., x) should not be free in assume."
+            )
+        a = self.props[positions[0]]
+        rest = mask & mask - 1
+        g_proof5 = Axiom5(a, g_proof4.prop.right_child, x)
+        g_proof6 = Generalization(g_proof4, x)
+        # a => (forall x, chain(rest, g))
+        output = ModusPonens(g_proof6, g_proof5)
+        if rest:
+            output = ModusPonens(output, _under(a, self.forallemma(rest, g, x)))
+        return mask, output
+
+    def modusponens(
+        self, entry1: tuple[int, Proof], entry: tuple[int, Proof], imply: Prop
+    ) -> tuple[int, Proof]:
+        """From entry1 (m1, proof of chain(m1, p)) and entry (m, proof of
+        chain(m, p => q)) to chain(m1 | m, q)."""
+        p = imply.left_child  # type: ignore
+        q = imply.right_child  # type: ignore
+        based = entry[0]
+        mask = entry1[0] | based
+        if not mask:
+            return 0, ModusPonens(entry1[1], entry[1])
+        proof3 = self.widen(entry1, p, mask)
+        if based & -based != mask & -mask:
+            # proof2 is based on none of the first assumptions of mask: turn
+            # it into chain(m, p) => chain(m, q) for the others m, then put
+            # it under the first ones, rather than widen it to mask.
+            after = mask & -(based & -based) if based else 0
+            proof4 = self.widen(entry, imply, after)
+            if after:
+                proof4 = ModusPonens(proof4, self.applylemma(after, p, q))
+            for j in reversed(_positions(mask & ~after)):
+                proof4 = _under(self.props[j], proof4)
+            return mask, ModusPonens(proof3, proof4)
+        proof4 = self.widen(entry, imply, mask)
+        a = self.props[(mask & -mask).bit_length() - 1]
+        rest = mask & mask - 1
+        if rest:
+            # a => (chain(rest, p) => chain(rest, q))
+            proof4 = ModusPonens(proof4, _under(a, self.applylemma(rest, p, q)))
+        imply = proof4.prop.right_child  # type: ignore
+        proof5 = Axiom2(a, imply.left_child, imply.right_child)  # type: ignore
+        return mask, ModusPonens(proof3, ModusPonens(proof4, proof5))
+
+    def widen(self, entry: tuple[int, Proof], p: Prop, mask: int) -> Proof:
+        """From entry (m, proof of chain(m, p)) to chain(mask, p), for m
+        within mask."""
+        based, output = entry
+        before = mask
+        if based:
+            before = mask & (based & -based) - 1
+            if mask & ~before != based:
+                output = ModusPonens(output, self.insertlemma(based, mask & ~before, p))
+        for j in reversed(_positions(before)):
+            output = ModusPonens(output, Axiom1(output.prop, self.props[j]))
+        return output
+
+    def insertlemma(self, based: int, mask: int, p: Prop) -> Proof:
+        # chain(based, p) => chain(mask, p), for based within mask and with
+        # the same first assumption.
+        lemma = None
+        for j in reversed(_positions(mask)):
+            after = mask & -(1 << j)
+            inner = based & after
+            if lemma is None and inner == after:
+                continue
+            key = ("widen", inner, after, id(p))
+            if key in self.lemmas:
+                lemma = self.lemmas[key]
+                continue
+            a = self.props[j]
+            if inner >> j & 1:
+                lemma = _under(a, lemma)  # type: ignore
+            elif lemma is None:
+                lemma = Axiom1(self.chain(inner, p), a)
+            else:
+                imply: ImplyProp = lemma.prop  # type: ignore
+                lemma = Transitive(lemma, Axiom1(imply.right_child, a)).proof
+            self.lemmas[key] = lemma
+        return lemma  # type: ignore
+
+    def applylemma(self, mask: int, p: Prop, q: Prop) -> Proof:
+        # chain(mask, p => q) => (chain(mask, p) => chain(mask, q))
+        lemma = None
+        for j in reversed(_positions(mask)):
+            key = ("apply", mask & -(1 << j), id(p), id(q))
+            if key in self.lemmas:
+                lemma = self.lemmas[key]
+                continue
+            a = self.props[j]
+            if lemma is None:
+                lemma = Axiom2(a, p, q)
+            else:
+                step = _under(a, lemma)
+                imply: ImplyProp = step.prop.right_child.right_child  # type: ignore
+                middle = Axiom2(a, imply.left_child, imply.right_child)
+                lemma = Transitive(step, middle).proof
+            self.lemmas[key] = lemma
+        return lemma  # type: ignore
+
+    def forallemma(self, mask: int, p: Prop, x: Variable) -> Proof:
+        # (forall x, chain(mask, p)) => chain(mask, forall x, p)
+        lemma = None
+        for j in reversed(_positions(mask)):
+            after = mask & -(1 << j)
+            key = ("forall", after, id(p), id(x))
+            if key in self.lemmas:
+                lemma = self.lemmas[key]
+                continue
+            a = self.props[j]
+            first = Axiom5(a, self.chain(after & ~(1 << j), p), x)
+            lemma = (
+                first if lemma is None else Transitive(first, _under(a, lemma)).proof
+            )
+            self.lemmas[key] = lemma
+        return lemma  # type: ignore
 
 
 class ImplyExchange(Theorem):
@@ -241,9 +637,6 @@ class ImplyExchange(Theorem):
         self.input = {"proof1": proof}
         super().__init__(s4.proof)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['proof1'].__str__()})"
-
 
 class DoubleNotElim(Theorem):
     def __init__(self, p: Prop) -> None:
@@ -262,9 +655,6 @@ class DoubleNotElim(Theorem):
         self.input = {"prop1": p}
         super().__init__(theorem4.proof)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()})"
-
 
 class DoubleNotIntro(Theorem):
     def __init__(self, p: Prop) -> None:
@@ -282,9 +672,6 @@ class DoubleNotIntro(Theorem):
         self.input = {"prop1": p}
         super().__init__(theorem2.proof)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()})"
-
 
 class NotToNotElim(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -302,9 +689,6 @@ class NotToNotElim(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(theorem3.proof)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class NotToNotIntro(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -328,9 +712,6 @@ class NotToNotIntro(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(theorem6.proof)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class Contradiction(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -354,9 +735,6 @@ class Contradiction(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(theorem5.proof)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class ImplyNotExchange(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -376,9 +754,6 @@ class ImplyNotExchange(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof5)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class NotImplyExchange(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -398,9 +773,6 @@ class NotImplyExchange(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof5)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class NotImplyToLeft(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -420,9 +792,6 @@ class NotImplyToLeft(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof5)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class NotImplyToNotRight(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -440,9 +809,6 @@ class NotImplyToNotRight(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof3)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class NotImplyIntro(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -462,9 +828,6 @@ class NotImplyIntro(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof4)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class AndElim(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -490,9 +853,6 @@ class AndElim(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof7)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class AndIntro(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -523,9 +883,6 @@ class AndIntro(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof9)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class AndExchange(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -562,9 +919,6 @@ class AndExchange(Theorem):
         }
         super().__init__(proof11)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class OrElim(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -583,9 +937,6 @@ class OrElim(Theorem):
         }
         super().__init__(proof4)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class OrIntro(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -603,9 +954,6 @@ class OrIntro(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof3)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class OrExchange(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -627,9 +975,6 @@ class OrExchange(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof9)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class NotAndToOrNot(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -663,9 +1008,6 @@ class NotAndToOrNot(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof11)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class NotOrToAndNot(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -697,9 +1039,6 @@ class NotOrToAndNot(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof9)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class IIFElim(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -725,9 +1064,6 @@ class IIFElim(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof7)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class IIFIntro(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -754,9 +1090,6 @@ class IIFIntro(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof7)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class IIFReflexive(Theorem):
     def __init__(self, p1: Prop) -> None:
@@ -766,9 +1099,6 @@ class IIFReflexive(Theorem):
         self.input = {"prop1": p1}
         super().__init__(proof3)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()})"
-
 
 class IIFExchange(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -801,9 +1131,6 @@ class IIFExchange(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof9)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class IIFToNotIIF(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -835,9 +1162,6 @@ class IIFToNotIIF(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof14)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class NotIIFToIIF(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -875,9 +1199,6 @@ class NotIIFToIIF(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof14)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class IIFTransition(Theorem):
     def __init__(self, p1: Prop, p2: Prop, p3: Prop) -> None:
@@ -906,16 +1227,13 @@ class IIFTransition(Theorem):
         proof9 = IIFIntro(p1, p3).proof
         proof10 = ModusPonens(proof8, ModusPonens(proof7, proof9))  # p1 <=> p3
 
-        proof11 = Deduction(
-            assume1, Deduction(assume2, proof10).proof
+        proof11 = MultiDeduction(
+            [assume1, assume2], proof10
         ).proof  # p1 <=> p2 => p2 <=> p3 => p1 <=> p3
 
         self.input = {"prop1": p1, "prop2": p2, "prop3": p3}
         super().__init__(proof11)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input['prop3'].__str__()})"
-
 
 class ForallExchange(Theorem):
     def __init__(self, p1: Prop, x1: Variable, x2: Variable) -> None:
@@ -945,9 +1263,6 @@ class ForallExchange(Theorem):
         self.input = {"prop1": p1, "var1": x2, "var2": x2}
         super().__init__(proof9)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['var1'].__str__()}, {self.input['var2'].__str__()})"
-
 
 class ExistIntro(Theorem):
     def __init__(self, prop: Prop, x: Variable, y: Variable) -> None:
@@ -975,9 +1290,6 @@ class ExistIntro(Theorem):
         self.input = {"prop1": prop, "var1": x, "var2": y}
         super().__init__(proof7)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['var1'].__str__()}, {self.input['var2'].__str__()})"
-
 
 class ForallXYToForallX(Theorem):
     def __init__(self, prop: Prop, x: Variable, y: Variable) -> None:
@@ -999,9 +1311,6 @@ class ForallXYToForallX(Theorem):
         self.input = {"prop1": prop, "var1": x, "var2": y}
         super().__init__(proof6)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['var1'].__str__()}, {self.input['var2'].__str__()})"
-
 
 class ForallImplyToImplyForall(Theorem):
     def __init__(self, prop1: Prop, prop2: Prop, x: Variable) -> None:
@@ -1029,9 +1338,6 @@ class ForallImplyToImplyForall(Theorem):
         self.input = {"prop1": prop1, "prop2": prop2, "var1": x}
         super().__init__(proof8)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input['var1'].__str__()})"
-
 
 class ForallImplyToImplyExist(Theorem):
     def __init__(self, prop1: Prop, prop2: Prop, x: Variable) -> None:
@@ -1087,9 +1393,6 @@ class ForallImplyToImplyExist(Theorem):
         self.input = {"prop1": prop1, "prop2": prop2, "var1": x}
         super().__init__(proof16)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input['var1'].__str__()})"
-
 
 class ForallAndToAndForall(Theorem):
     def __init__(self, prop1: Prop, prop2: Prop, x: Variable) -> None:
@@ -1125,9 +1428,6 @@ class ForallAndToAndForall(Theorem):
         self.input = {"prop1": prop1, "prop2": prop2, "var1": x}
         super().__init__(proof14)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input['var1'].__str__()})"
-
 
 class NotForallToExistNot(Theorem):
     def __init__(self, prop1: Prop, x: Variable) -> None:
@@ -1161,9 +1461,6 @@ class NotForallToExistNot(Theorem):
         self.input = {"prop1": prop1, "var1": x}
         super().__init__(proof10)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['var1'].__str__()})"
-
 
 class OrForallToForallOr(Theorem):
     def __init__(self, prop1: Prop, prop2: Prop, x: Variable) -> None:
@@ -1201,9 +1498,6 @@ class OrForallToForallOr(Theorem):
         self.input = {"prop1": prop1, "prop2": prop2, "var1": x}
         super().__init__(proof14)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input['var1'].__str__()})"
-
 
 class ForallOrToOrForallExist(Theorem):
     def __init__(self, p1: Prop, p2: Prop, x: Variable) -> None:
@@ -1245,9 +1539,6 @@ class ForallOrToOrForallExist(Theorem):
         self.input = {"prop1": p1, "prop2": p2, "var1": x}
         super().__init__(proof16)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input['var1'].__str__()})"
-
 
 class ForallNotToForallNotIntro(Theorem):
     def __init__(self, p1: Prop, p2: Prop, x: Variable) -> None:
@@ -1273,9 +1564,6 @@ class ForallNotToForallNotIntro(Theorem):
         self.input = {"prop1": p1, "prop2": p2, "var1": x}
         super().__init__(proof10)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input['var1'].__str__()})"
-
 
 class ForallImplyExist(Theorem):
     def __init__(self, p1: Prop, x: Variable, y: Variable):
@@ -1299,9 +1587,6 @@ class ForallImplyExist(Theorem):
         self.input = {"prop1": p1, "var1": x, "var2": y}
         super().__init__(proof6)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['var1'].__str__()}, {self.input['var2'].__str__()})"
-
 
 class NotExistToForallNot(Theorem):
     def __init__(self, p1: Prop, x: Variable) -> None:
@@ -1318,9 +1603,6 @@ class NotExistToForallNot(Theorem):
         self.input = {"prop1": p1, "var1": x}
         super().__init__(proof3)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['var1'].__str__()}"
-
 
 class ExistToExistExist(Theorem):
     def __init__(self, p1: Prop, x: Variable, y: Variable) -> None:
@@ -1349,9 +1631,6 @@ class ExistToExistExist(Theorem):
         self.input = {"prop1": p1, "var1": x, "var2": y}
         super().__init__(proof8)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['var1'].__str__()}, {self.input['var2'].__str__()})"
-
 
 class NotFreeVarForallIntro(Theorem):
     def __init__(self, p1: Prop, x: Variable) -> None:
@@ -1371,9 +1650,6 @@ class NotFreeVarForallIntro(Theorem):
         self.input = {"prop1": p1, "var1": x}
         super().__init__(proof4)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['var1'].__str__()})"
-
 
 class NotFreeVarExistElim(Theorem):
     def __init__(self, p1: Prop, x: Variable) -> None:
@@ -1392,9 +1668,6 @@ class NotFreeVarExistElim(Theorem):
         self.input = {"prop1": p1, "var1": x}
         super().__init__(proof5)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['var1'].__str__()})"
-
 
 class NotFreeVarImplyForallIIFForall(Theorem):
     def __init__(self, p1: Prop, p2: Prop, x: Variable) -> None:
@@ -1425,9 +1698,6 @@ class NotFreeVarImplyForallIIFForall(Theorem):
         self.input = {"prop1": p1, "prop2": p2, "var1": x}
         super().__init__(proof9)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input['var1'].__str__()})"
-
 
 class NotFreeVarImplyExistIIFForall(Theorem):
     def __init__(self, p1: Prop, p2: Prop, x: Variable) -> None:
@@ -1470,9 +1740,6 @@ class NotFreeVarImplyExistIIFForall(Theorem):
         self.input = {"prop1": p1, "prop2": p2, "var1": x}
         super().__init__(proof18)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input['var1'].__str__()})"
-
 
 class ForallIIFExchange(Theorem):
     def __init__(self, p1: Prop, p2: Prop, x: Variable) -> None:
@@ -1516,9 +1783,6 @@ class ForallIIFExchange(Theorem):
         self.input = {"prop1": p1, "prop2": p2, "var1": x}
         super().__init__(proof21)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input['var1'].__str__()})"
-
 
 class ImplyIIFExchange(Theorem):
     def __init__(self, p1: Prop, p2: Prop, p3: Prop, p4: Prop) -> None:
@@ -1553,8 +1817,7 @@ class ImplyIIFExchange(Theorem):
         proof14 = ModusPonens(proof6, proof13)
         proof15 = ModusPonens(proof12, proof14)  # (p1 => p3) <=> (p2 => p4)
 
-        proof16 = Deduction(assume2, proof15).proof
-        proof17 = Deduction(assume1, proof16).proof
+        proof17 = MultiDeduction([assume1, assume2], proof15).proof
 
         self.input = {
             "prop1": p1,
@@ -1564,9 +1827,6 @@ class ImplyIIFExchange(Theorem):
         }
         super().__init__(proof17)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input['prop3'].__str__()}, {self.input['prop4'].__str__()})"
-
 
 class Replacement(Theorem):
     def __init__(self, p1: Prop, p2: Prop, p3: Prop) -> None:
@@ -1673,9 +1933,6 @@ class Replacement(Theorem):
         self.input = {"prop1": p1, "prop2": p2, "prop3": p3}
         super().__init__(output)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()}, {self.input['prop3'].__str__()})"
-
 
 class ReplacementFromProof(Theorem):
     def __init__(self, proof1: Proof, p3: Prop) -> None:
@@ -1707,9 +1964,6 @@ class ReplacementFromProof(Theorem):
         self.input = {"proof1": proof1, "prop3": p3}
         super().__init__(proof4)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['proof1'].__str__()}, {self.input['prop3'].__str__()})"
-
 
 class IIFToEval(Theorem):
     def __init__(self, p1: Prop) -> None:
@@ -1725,9 +1979,6 @@ class IIFToEval(Theorem):
         self.input = {"prop1": p1}
         super().__init__(proof4)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()})"
-
 
 class IIFFromEval(Theorem):
     def __init__(self, p1: Prop) -> None:
@@ -1743,9 +1994,6 @@ class IIFFromEval(Theorem):
         self.input = {"prop1": p1}
         super().__init__(proof4)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()})"
-
 
 class IIFElimReverse(Theorem):
     def __init__(self, p1: Prop, p2: Prop) -> None:
@@ -1761,9 +2009,6 @@ class IIFElimReverse(Theorem):
         self.input = {"prop1": p1, "prop2": p2}
         super().__init__(proof3)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['prop2'].__str__()})"
-
 
 class IIFIntroFromProof(Theorem):
     def __init__(self, proof1: Proof, proof2: Proof) -> None:
@@ -1796,9 +2041,6 @@ class IIFIntroFromProof(Theorem):
         self.input = {"proof1": proof1, "proof2": proof2}
         super().__init__(proof4)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['proof1'].__str__()}, {self.input['proof2'].__str__()})"
-
 
 class IIFTransitionFromProof(Theorem):
     def __init__(self, proof1: Proof, proof2: Proof) -> None:
@@ -1827,9 +2069,6 @@ class IIFTransitionFromProof(Theorem):
         self.input = {"proof1": proof1, "proof2": proof2}
         super().__init__(proof4)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['proof1'].__str__()}, {self.input['proof2'].__str__()})"
-
 
 class IIFDoubleNotElim(Theorem):
     def __init__(self, p1: Prop) -> None:
@@ -1844,9 +2083,6 @@ class IIFDoubleNotElim(Theorem):
         self.input = {"prop1": p1}
         super().__init__(proof3)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()})"
-
 
 class IIFDoubleNotIntro(Theorem):
     def __init__(self, p1: Prop) -> None:
@@ -1861,9 +2097,6 @@ class IIFDoubleNotIntro(Theorem):
         self.input = {"prop1": p1}
         super().__init__(proof3)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()})"
-
 
 class IIFExistNotToNotForall(Theorem):
     def __init__(self, p1: Prop, x: Variable) -> None:
@@ -1887,11 +2120,6 @@ class IIFExistNotToNotForall(Theorem):
         self.input = {"prop1": p1, "var1": x}
         super().__init__(proof5)
 
-    def __str__(self) -> str:
-        return (
-            f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['var1']})"
-        )
-
 
 class ExistRenameVar(Theorem):
     def __init__(self, p1: Prop, x: Variable, y: Variable):
@@ -1924,9 +2152,6 @@ class ExistRenameVar(Theorem):
 
         super().__init__(proof9)
 
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['prop1'].__str__()}, {self.input['var1']}, {self.input['var2']})"
-
 
 class ChoiceToExist(Theorem):
     def __init__(self, proof1: Proof, p1: Prop, x: Variable) -> None:
@@ -1946,7 +2171,8 @@ class ChoiceToExist(Theorem):
         proof3 = Deduction(assume1, proof1).proof  # p1 => proof1.prop
 
         tmpvar = Variable("choicevar")
-        proof4 = ExistIntro(proof1.prop.substitute(x, tmpvar), tmpvar, x).proof
+        prop0, _ = proof1.prop.substitutevars({x: tmpvar})
+        proof4 = ExistIntro(prop0, tmpvar, x).proof
         proof6 = Transitive(proof3, proof4).proof  # p1 => (exists tmp, proof1[x->tmp])
         proof7 = Generalization(
             proof6, x
@@ -1972,6 +2198,3 @@ class ChoiceToExist(Theorem):
 
         self.input = {"proof1": proof1, "prop1": p1, "var1": x}
         super().__init__(proof11)
-
-    def __str__(self) -> str:
-        return f"{self.getname()}({self.input['proof1'].__str__()}, {self.input['prop1']}, {self.input['var1']})"
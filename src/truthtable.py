@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional, Sequence
+
+from prop import ImplyProp, NotProp, Prop, VarProp
+
+# A truth table over n atoms is an int of 2^n bits: bit r is the value of the
+# formula under assignment r, in which atom i is true exactly when bit i of r
+# is set. Every connective is then one big int operation over all rows at
+# once. The table of n atoms takes 2^n / 8 bytes, so n is bounded.
+MAX_ATOMS = 26
+
+
+def atoms(p: Prop) -> list[VarProp]:
+    """The atoms of p.eval(), in order of first appearance."""
+    seen: set[int] = set()
+    found: list[VarProp] = []
+    stack = [p.eval()]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if node.__class__ is VarProp:
+            found.append(node)  # type: ignore
+        else:
+            stack.extend(reversed(node.children()))
+    return found
+
+
+def column(i: int, n: int) -> int:
+    """The table of atom i over n atoms: blocks of 2^i zeros then 2^i ones."""
+    if not 0 <= i < n:
+        raise ValueError(f"column(): atom {i} out of range for {n} atoms")
+    width = 1 << i
+    bits = ((1 << width) - 1) << width
+    width <<= 1
+    size = 1 << n
+    # Doubling the pattern takes log(2^n / 2^i) shifts.
+    while width < size:
+        bits |= bits << width
+        width <<= 1
+    return bits
+
+
+def table(p: Prop, order: Optional[Sequence[VarProp]] = None) -> int:
+    """The truth table of p over order, by default atoms(p).
+
+    Aliases are evaluated through p.eval(), and each distinct node of the
+    resulting DAG costs one big int operation.
+
+    Raise:
+        ValueError: if p has quantifiers, if an atom of p is missing from
+            order, or if there are more than MAX_ATOMS atoms.
+    """
+    return tables([p], order)[0]
+
+
+def tables(
+    props: Iterable[Prop], order: Optional[Sequence[VarProp]] = None
+) -> list[int]:
+    """The truth tables of props over the same atoms, sharing common nodes.
+
+    order defaults to the atoms of all props, in order of first appearance.
+    """
+    roots = [p.eval() for p in props]
+    if order is None:
+        order = _allatoms(roots)
+    n = len(order)
+    if n > MAX_ATOMS:
+        raise ValueError(f"tables(): {n} atoms, at most {MAX_ATOMS} supported")
+    full = (1 << (1 << n)) - 1
+    done: dict[int, int] = {id(atom): column(i, n) for i, atom in enumerate(order)}
+    return [_evaluate(root, done, full) for root in roots]
+
+
+def _allatoms(roots: list[Prop]) -> list[VarProp]:
+    """The atoms of all roots, in order of first appearance."""
+    found: list[VarProp] = []
+    known: set[int] = set()
+    for p in roots:
+        for atom in atoms(p):
+            if id(atom) not in known:
+                known.add(id(atom))
+                found.append(atom)
+    return found
+
+
+def _evaluate(root: Prop, done: dict[int, int], full: int) -> int:
+    """The table of root, done holding the tables of the atoms and of the
+    nodes already evaluated, by id(), and full the table of all rows."""
+    stack: list = [root]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node = pop()
+        if id(node) in done:
+            continue
+        cls = node.__class__
+        if cls is ImplyProp:
+            left = done.get(id(node.left_child))
+            right = done.get(id(node.right_child))
+            if left is None or right is None:
+                push(node)
+                push(node.right_child)
+                push(node.left_child)
+                continue
+            done[id(node)] = (full ^ left) | right
+        elif cls is NotProp:
+            child = done.get(id(node.child))
+            if child is None:
+                push(node)
+                push(node.child)
+                continue
+            done[id(node)] = full ^ child
+        elif cls is VarProp:
+            raise ValueError(f"tables(): atom {node} is not in order")
+        else:
+            raise ValueError(f"tables(): {node.getname()} is not propositional")
+    return done[id(root)]
+
+
+def countermodel(p: Prop) -> Optional[dict[VarProp, bool]]:
+    """An assignment of the atoms of p making it false, or None if there is none."""
+    order = atoms(p)
+    rows = ~table(p, order) & ((1 << (1 << len(order))) - 1)
+    if not rows:
+        return None
+    r = (rows & -rows).bit_length() - 1
+    return {atom: bool(r >> i & 1) for i, atom in enumerate(order)}
+
+
+def istautology(p: Prop) -> bool:
+    """Whether p is true under every assignment of its atoms."""
+    order = atoms(p)
+    return table(p, order) == (1 << (1 << len(order))) - 1
+
+
+def issatisfiable(p: Prop) -> bool:
+    """Whether p is true under some assignment of its atoms."""
+    return table(p) != 0
+
+
+def equivalent(p1: Prop, p2: Prop) -> bool:
+    """Whether p1 and p2 have the same truth value under every assignment."""
+    t1, t2 = tables([p1, p2])
+    return t1 == t2
@@ -1,15 +1,86 @@
 from __future__ import annotations
 
+import heapq
+import weakref
+from typing import Optional
+
+
+class _VariableRef(weakref.ref):
+    __slots__ = ("content", "index")
+
 
 class Variable:
-    def __init__(self, content: str) -> None:
-        self.content = content
+    """Interned variable: Variable("x") always returns the same object.
+
+    Each variable in use gets a small integer index, which Prop uses as the
+    bit position of the variable in its free and bound variable masks.
+    Variables are compared by identity. The table only holds weak references:
+    once no prop or proof uses a variable it is collected, and its index is
+    given to the next new variable, the smallest free index first. Masks are
+    therefore as wide as the number of variables in use, not the number ever
+    created.
+    """
+
+    __slots__ = ("content", "index", "__weakref__")
+
+    _table: dict[str, _VariableRef] = {}
+    _variables: list[Optional[_VariableRef]] = []
+    # Indices of collected variables, as a heap.
+    _unused: list[int] = []
 
-    def __eq__(self, __o: Variable) -> bool:
-        return self.content == __o.content
+    def __new__(cls, content: str) -> Variable:
+        ref = Variable._table.get(content)
+        if ref is not None:
+            x = ref()
+            if x is not None:
+                return x
+        x = super().__new__(cls)
+        x.content = content
+        if Variable._unused:
+            x.index = heapq.heappop(Variable._unused)
+        else:
+            x.index = len(Variable._variables)
+            Variable._variables.append(None)
+        ref = _VariableRef(x, _variable_remove)
+        ref.content = content
+        ref.index = x.index
+        Variable._table[content] = ref
+        Variable._variables[x.index] = ref
+        return x
+
+    @staticmethod
+    def frommask(mask: int) -> frozenset[Variable]:
+        """The variables whose index bits are set in mask."""
+        variables = []
+        while mask:
+            low = mask & -mask
+            variables.append(Variable._variables[low.bit_length() - 1]())
+            mask ^= low
+        return frozenset(variables)
+
+    @staticmethod
+    def fresh(x: Variable, avoid: int) -> Variable:
+        """A variable named after x whose index bit is not set in avoid."""
+        n = 1
+        while True:
+            y = Variable(f"{x.content}_{n}")
+            if not avoid >> y.index & 1:
+                return y
+            n += 1
+
+    def __reduce__(self):
+        return (Variable, (self.content,))
 
     def __hash__(self) -> int:
         return self.content.__hash__()
 
     def __str__(self) -> str:
         return self.content.__str__()
+
+
+def _variable_remove(ref: _VariableRef) -> None:
+    if Variable._table.get(ref.content) is ref:
+        del Variable._table[ref.content]
+    if Variable._variables[ref.index] is ref:
+        Variable._variables[ref.index] = None
+        heapq.heappush(Variable._unused, ref.index)
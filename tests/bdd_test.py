@@ -0,0 +1,117 @@
+import sys
+
+sys.path.append(".")
+sys.path.append("./src")
+
+import random
+import unittest
+
+import truthtable
+from bdd import BDD, FALSE, TRUE, countermodel, equivalent, istautology
+from proof import Axiom1, Axiom2, Axiom3
+from prop import AndProp, ForallProp, IIFProp, ImplyProp, NotProp, OrProp, VarProp
+from variable import Variable
+
+
+def random_prop(rng, depth, vps):
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(vps)
+    r = rng.random()
+    if r < 0.2:
+        return NotProp(random_prop(rng, depth - 1, vps))
+    cls = ImplyProp if r < 0.6 else AndProp if r < 0.8 else IIFProp
+    return cls(random_prop(rng, depth - 1, vps), random_prop(rng, depth - 1, vps))
+
+
+class BDDTest(unittest.TestCase):
+    def test_build(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        vpc = VarProp(Variable("c"))
+        bdd = BDD()
+        a = bdd.build(vpa)
+        self.assertIs(bdd.var(vpa), a)
+        self.assertEqual(bdd.build(NotProp(NotProp(vpa))), a)
+        self.assertEqual(bdd.build(AndProp(vpa, NotProp(vpa))), FALSE)
+        for proof in [
+            Axiom1(vpa, vpb),
+            Axiom2(vpa, vpb, vpc),
+            Axiom3(vpa, NotProp(vpb)),
+        ]:
+            self.assertEqual(bdd.build(proof.prop), TRUE)
+        self.assertEqual(
+            bdd.build(ImplyProp(vpa, vpb)), bdd.build(OrProp(NotProp(vpa), vpb))
+        )
+        self.assertEqual(bdd.order(), [vpa, vpb, vpc])
+        with self.assertRaises(ValueError):
+            bdd.build(ForallProp(Variable("x"), vpa))
+
+    def test_countermodel(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        p = ImplyProp(ImplyProp(vpa, vpb), vpa)
+        self.assertEqual(countermodel(p), {vpa: False, vpb: False})
+        self.assertIsNone(countermodel(ImplyProp(vpa, vpa)))
+        bdd = BDD()
+        self.assertEqual(bdd.countermodel(bdd.build(ImplyProp(vpa, vpb))), {vpa: True, vpb: False})
+        self.assertIsNone(bdd.countermodel(TRUE))
+
+    def test_random(self):
+        rng = random.Random(0)
+        vps = [VarProp(Variable(f"v{i}")) for i in range(6)]
+        for _ in range(100):
+            p = random_prop(rng, 6, vps)
+            q = random_prop(rng, 6, vps)
+            self.assertEqual(equivalent(p, q), truthtable.equivalent(p, q))
+            self.assertEqual(istautology(p), truthtable.istautology(p))
+            model = countermodel(p)
+            if model is not None:
+                row = sum(1 << i for i, value in enumerate(model.values()) if value)
+                self.assertFalse(truthtable.table(p, list(model)) >> row & 1)
+
+    def test_reorder(self):
+        n = 10
+        xs = [VarProp(Variable(f"x{i}")) for i in range(n)]
+        ys = [VarProp(Variable(f"y{i}")) for i in range(n)]
+        p = IIFProp(xs[0], ys[0])
+        for i in range(1, n):
+            p = AndProp(p, IIFProp(xs[i], ys[i]))
+        q = ImplyProp(xs[0], OrProp(ys[-1], xs[1]))
+        bdd = BDD(xs + ys)
+        u = bdd.build(p)
+        v = bdd.build(q)
+        tables = truthtable.tables([p, q], bdd.atoms)
+        self.assertGreater(bdd.size([u]), 1000)
+        bdd.reorder([u, v])
+        # x_i and y_i end up next to each other.
+        self.assertEqual(bdd.size([u]), 3 * n)
+        self.assertEqual(bdd.build(p), u)
+        self.assertEqual(bdd.build(q), v)
+        order = [z for pair in zip(xs, ys) for z in pair][::-1]
+        bdd.reorder([u, v], order)
+        self.assertEqual(bdd.order(), order)
+        self.assertEqual(bdd.build(p), u)
+        self.assertEqual(bdd.build(q), v)
+        self.assertEqual(truthtable.tables([p, q], bdd.atoms), tables)
+        with self.assertRaises(ValueError):
+            bdd.reorder([u], xs)
+
+    def test_many_atoms(self):
+        # Beyond truth tables: 64 atoms.
+        vps = [VarProp(Variable(f"a{i}")) for i in range(64)]
+        conj = vps[0]
+        for vp in vps[1:]:
+            conj = AndProp(conj, vp)
+        disj = vps[-1]
+        for vp in vps[-2::-1]:
+            disj = OrProp(vp, disj)
+        self.assertTrue(istautology(ImplyProp(conj, disj)))
+        self.assertFalse(istautology(ImplyProp(disj, conj)))
+        model = countermodel(ImplyProp(disj, conj))
+        self.assertEqual(len(model), 64)
+        self.assertTrue(any(model.values()))
+        self.assertFalse(all(model.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import sys
+
+sys.path.append(".")
+sys.path.append("./src")
+
+import unittest
+
+from completeness import Kalmar, prove
+from proof import Assumption, Axiom1, Axiom2, Axiom3, FromEvalAxiom, ModusPonens
+from prop import AndProp, ForallProp, IIFProp, ImplyProp, NotProp, OrProp, VarProp
+from theorem import Contradiction, DoubleNotElim, NotImplyIntro
+from variable import Variable
+
+
+def rules(proof):
+    """The classes of the distinct nodes of proof."""
+    seen = set()
+    found = set()
+    stack = [proof]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        found.add(node.__class__)
+        if node.__class__ is ModusPonens:
+            stack.extend(node._input)
+    return found
+
+
+class KalmarTest(unittest.TestCase):
+    def test_prove(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        vpc = VarProp(Variable("c"))
+        goals = [
+            ImplyProp(vpa, vpa),
+            Axiom1(vpa, vpb).prop,
+            Axiom2(vpa, vpb, vpc).prop,
+            Axiom3(vpa, vpb).prop,
+            DoubleNotElim(vpa).proof.prop,
+            Contradiction(vpa, vpb).proof.prop,
+            NotImplyIntro(vpa, vpb).proof.prop,
+            ImplyProp(ImplyProp(ImplyProp(vpa, vpb), vpa), vpa),
+        ]
+        allowed = {Axiom1, Axiom2, Axiom3, ModusPonens}
+        for goal in goals:
+            proof = prove(goal)
+            self.assertIs(proof.prop, goal)
+            self.assertFalse(proof.assumption)
+            self.assertLessEqual(rules(proof), allowed)
+
+    def test_alias(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        goal = IIFProp(AndProp(vpa, vpb), AndProp(vpb, vpa))
+        proof = prove(goal)
+        self.assertIs(proof.prop, goal)
+        self.assertFalse(proof.assumption)
+        self.assertIs(proof._input[1].__class__, FromEvalAxiom)
+        proof = prove(OrProp(vpa, NotProp(vpa)))
+        self.assertFalse(proof.assumption)
+
+    def test_invalid(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        with self.assertRaises(ValueError):
+            prove(ImplyProp(vpa, vpb))
+        with self.assertRaises(ValueError):
+            prove(ForallProp(Variable("x"), ImplyProp(vpa, vpa)))
+
+    def test_cache(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        kalmar = Kalmar()
+        first = kalmar.prove(Contradiction(vpa, vpb).proof.prop)
+        again = kalmar.prove(Contradiction(vpa, vpb).proof.prop)
+        self.assertIs(first, again)
+        # A shared subformula is proved once per assignment of its atoms.
+        inner = ImplyProp(vpa, vpb)
+        proof = kalmar.prove(ImplyProp(inner, inner))
+        self.assertIs(proof.prop, ImplyProp(inner, inner))
+        self.assertNotIn(Assumption, rules(proof))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import sys
+
+sys.path.append(".")
+sys.path.append("./src")
+
+import unittest
+
+from finite import Model, countermodel, isvalid, table, variables
+from proof import Axiom4, Axiom5
+from prop import ExistProp, ForallProp, ImplyProp, NotProp, OrProp, VarProp
+from theorem import (
+    ExistIntro,
+    ForallImplyToImplyExist,
+    ForallOrToOrForallExist,
+    NotForallToExistNot,
+    OrForallToForallOr,
+)
+from variable import Variable
+
+
+class FiniteTest(unittest.TestCase):
+    def test_table(self):
+        x = Variable("x")
+        y = Variable("y")
+        vpx = VarProp(x)
+        vpy = VarProp(y)
+        self.assertEqual(variables(ImplyProp(vpy, ForallProp(x, vpx))), [x, y])
+        # Rows over (x, y) in a domain of 3 elements, P = {0}.
+        self.assertEqual(table(vpx, 3, 1, [x, y]), 0b001001001)
+        self.assertEqual(table(vpy, 3, 1, [x, y]), 0b000000111)
+        self.assertEqual(table(ForallProp(x, vpx), 3, 1, [x, y]), 0)
+        self.assertEqual(table(ForallProp(x, vpx), 3, 3, [x, y]), 0b111111111)
+        exist = ExistProp(x, ImplyProp(vpy, vpx))
+        self.assertEqual(table(exist, 3, 1, [x, y]), 0b111111111)
+        forall = ForallProp(y, vpx)
+        self.assertEqual(table(forall, 3, 2, [x, y]), table(vpx, 3, 2, [x, y]))
+        with self.assertRaises(ValueError):
+            table(vpx, 2, 1, [y])
+
+    def test_countermodel(self):
+        x = Variable("x")
+        y = Variable("y")
+        vpx = VarProp(x)
+        vpy = VarProp(y)
+        p = ImplyProp(vpy, ForallProp(x, vpx))
+        model = countermodel(p)
+        self.assertEqual(repr(model), "Model(2, 1, {y=0})")
+        self.assertFalse(model.satisfies(p))
+        self.assertTrue(model.satisfies(vpy))
+        p = ImplyProp(ExistProp(x, vpx), ForallProp(x, vpx))
+        self.assertFalse(countermodel(p).satisfies(p))
+        self.assertIsNone(countermodel(p, 1))
+        self.assertEqual(repr(countermodel(ForallProp(x, vpx))), "Model(1, 0, {})")
+        # Domains are not empty.
+        p = ImplyProp(ForallProp(x, NotProp(vpx)), NotProp(ForallProp(x, vpx)))
+        self.assertTrue(isvalid(p))
+        with self.assertRaises(ValueError):
+            Model(2, 1, {x: 0}).satisfies(vpy)
+        with self.assertRaises(ValueError):
+            countermodel(vpx, 0)
+
+    def test_valid(self):
+        x = Variable("x")
+        y = Variable("y")
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        vpx = VarProp(x)
+        vpy = VarProp(y)
+        valid = [
+            Axiom4(ImplyProp(vpx, vpy), x, y).prop,
+            Axiom5(vpa, vpx, x).prop,
+            ForallImplyToImplyExist(vpx, vpb, x).proof.prop,
+            ForallOrToOrForallExist(vpx, vpy, x).proof.prop,
+            NotForallToExistNot(vpx, x).proof.prop,
+            OrForallToForallOr(vpx, vpa, x).proof.prop,
+            ExistIntro(vpx, x, y).proof.prop,
+            ImplyProp(
+                ExistProp(y, ForallProp(x, ImplyProp(vpx, vpy))),
+                ForallProp(x, ExistProp(y, ImplyProp(vpx, vpy))),
+            ),
+        ]
+        for p in valid:
+            self.assertTrue(isvalid(p))
+            self.assertTrue(isvalid(p, 4))
+        invalid = [
+            ImplyProp(vpa, vpb),
+            OrProp(ForallProp(x, vpx), ForallProp(x, NotProp(vpx))),
+            ImplyProp(ForallProp(x, OrProp(vpx, vpy)), ForallProp(x, vpx)),
+        ]
+        for p in invalid:
+            self.assertFalse(isvalid(p))
+            self.assertFalse(countermodel(p).satisfies(p))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import sys
+
+sys.path.append(".")
+sys.path.append("./src")
+
+import unittest
+
+from matrix import Matrix, schema, search
+from proof import Axiom1, Axiom2, Axiom3, Axiom4
+from prop import ForallProp, ImplyProp, NotProp, VarProp
+from variable import Variable
+
+# Two values, 0 designated: classical logic with 0 for true.
+CLASSICAL = Matrix([1, 0], [[0, 1], [0, 0]], [0])
+
+
+class MatrixTest(unittest.TestCase):
+    def test_matrix(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        self.assertEqual(CLASSICAL.table(ImplyProp(vpa, vpb)), (0, 0, 1, 0))
+        self.assertEqual(CLASSICAL.table(NotProp(vpa)), (1, 0))
+        for axiom in [Axiom1, Axiom2, Axiom3]:
+            self.assertTrue(CLASSICAL.validates(axiom))
+        self.assertTrue(CLASSICAL.validatesmp())
+        p = ImplyProp(ImplyProp(vpa, vpb), vpa)
+        self.assertFalse(CLASSICAL.validates(p))
+        self.assertEqual(CLASSICAL.countermodel(p), {vpa: 1, vpb: 0})
+        self.assertFalse(Matrix([1, 0], [[0, 1], [1, 0]], [1]).validatesmp())
+        with self.assertRaises(ValueError):
+            Matrix([1, 0], [[0, 1]], [0])
+        with self.assertRaises(ValueError):
+            Matrix([1, 2], [[0, 1], [0, 0]], [0])
+        with self.assertRaises(ValueError):
+            CLASSICAL.table(ForallProp(Variable("x"), vpa))
+
+    def test_schema(self):
+        p1 = VarProp(Variable("p1"))
+        p2 = VarProp(Variable("p2"))
+        self.assertIs(schema(Axiom1), ImplyProp(p1, ImplyProp(p2, p1)))
+        self.assertIs(schema(p1), p1)
+        with self.assertRaises(ValueError):
+            schema(Axiom4)
+
+    def test_search(self):
+        # Axiom1 and Axiom2 are valid in every two-valued model of the rest.
+        self.assertEqual(list(search(2, [Axiom2, Axiom3], Axiom1)), [])
+        self.assertEqual(list(search(2, [Axiom1, Axiom3], Axiom2)), [])
+        self.assertIn(CLASSICAL, set(search(2, [Axiom1, Axiom2, Axiom3])))
+        # Counted by brute force over all 2 * 3^3 * 3^9 matrices.
+        found = list(search(3, [Axiom1, Axiom2], Axiom3))
+        self.assertEqual(len(found), 1695)
+        self.assertEqual(len(set(found)), len(found))
+        for m in found[:100]:
+            self.assertTrue(m.validates(Axiom1))
+            self.assertTrue(m.validates(Axiom2))
+            self.assertTrue(m.validatesmp())
+            self.assertFalse(m.validates(Axiom3))
+        with self.assertRaises(ValueError):
+            next(search(1, [Axiom1]))
+
+    def test_independence(self):
+        axioms = [Axiom1, Axiom2, Axiom3]
+        for k in [3, 4, 5]:
+            for target in axioms:
+                rest = [a for a in axioms if a is not target]
+                m = next(search(k, rest, target))
+                self.assertEqual(m.k, k)
+                for axiom in rest:
+                    self.assertTrue(m.validates(axiom))
+                self.assertTrue(m.validatesmp())
+                self.assertFalse(m.validates(target))
+
+
+if __name__ == "__main__":
+    unittest.main()
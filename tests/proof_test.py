@@ -5,8 +5,16 @@ sys.path.append("./src")
 
 import unittest
 
-from proof import Assumption, Axiom1, Axiom2, ModusPonens
-from prop import ImplyProp, VarProp
+from proof import (
+    PROOF_NODE_BYTES,
+    Assumption,
+    Axiom1,
+    Axiom2,
+    Generalization,
+    ModusPonens,
+)
+from prop import AndProp, ImplyProp, NotProp, VarProp
+from theorem import Reflexive, Transitive
 from variable import Variable
 
 
@@ -22,3 +30,81 @@ class ProofTest(unittest.TestCase):
         proof5 = ModusPonens(proof1, proof4)
 
         self.assertEqual(proof5, Assumption(p))
+
+    def test_unique(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        p = ImplyProp(vpa, vpa)
+        self.assertIs(Axiom1(vpa, p), Axiom1(vpa, ImplyProp(vpa, vpa)))
+        self.assertIsNot(Axiom1(vpa, p), Axiom1(p, vpa))
+        self.assertIs(Assumption(vpa), Assumption(vpa))
+        proof = ModusPonens(Assumption(vpa), Axiom1(vpa, vpb))
+        self.assertIs(proof, ModusPonens(Assumption(vpa), Axiom1(vpa, vpb)))
+        self.assertIs(Reflexive(vpa).proof, Reflexive(vpa).proof)
+
+    def test_steps(self):
+        vpa = VarProp(Variable("a"))
+        self.assertEqual(Assumption(vpa).steps(), (1, 1))
+        self.assertEqual(Reflexive(vpa).proof.steps(), (5, 5))
+        # Both halves share the proof of a => a.
+        proof = Transitive(Reflexive(vpa).proof, Reflexive(vpa).proof).proof
+        self.assertEqual(proof.steps(), (15, 10))
+
+    def test_assumption(self):
+        x = Variable("x")
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        assume1 = Assumption(vpa)
+        assume2 = Assumption(AndProp(vpa, vpb))
+        proof1 = ModusPonens(assume1, Axiom1(vpa, vpa))
+        proof2 = ModusPonens(proof1, ModusPonens(assume1, Axiom1(vpa, proof1.prop)))
+        # Assumptions are kept once, however often they are used.
+        self.assertEqual(proof2.assumption, (assume1,))
+        self.assertTrue(proof2.isassumed(vpa))
+        self.assertFalse(proof2.isassumed(vpb))
+        self.assertEqual(Axiom1(vpa, vpa).assumption, ())
+        proof3 = ModusPonens(assume2, Axiom1(assume2.prop, vpa))
+        self.assertEqual(Generalization(Axiom1(vpa, vpb), x).assumption, ())
+        proof5 = ModusPonens(proof2, proof3)
+        self.assertEqual(len(proof5.assumption), 2)
+        # Equal props are the same assumption.
+        self.assertTrue(proof5.isassumed(NotProp(ImplyProp(vpa, NotProp(vpb)))))
+        self.assertTrue(Generalization(proof5, x).isassumed(vpa))
+
+    def test_many_assumptions(self):
+        vpa = VarProp(Variable("a"))
+        # Assumptions no longer used give their index back.
+        for i in range(10000):
+            vpv = VarProp(Variable(f"v{i}"))
+            ModusPonens(Assumption(vpv), Axiom1(vpv, vpa))
+        assume1 = Assumption(ImplyProp(vpa, vpa))
+        self.assertLess(assume1.index, 100)
+        # Equal props share one index, which stays in use while one of their
+        # assumptions is alive.
+        vpb = VarProp(Variable("b"))
+        assume2 = Assumption(AndProp(vpa, vpb))
+        assume3 = Assumption(NotProp(ImplyProp(vpa, NotProp(vpb))))
+        self.assertIsNot(assume2, assume3)
+        self.assertEqual(assume2.index, assume3.index)
+        proof = ModusPonens(assume3, Axiom1(assume3.prop, vpa))
+        del assume2, assume3
+        self.assertEqual(len(proof.assumption), 1)
+        self.assertTrue(proof.isassumed(AndProp(vpa, vpb)))
+        self.assertEqual(proof.assumption[0].prop, AndProp(vpa, vpb))
+
+    def test_node_bytes(self):
+        vpa = VarProp(Variable("a"))
+        p = ImplyProp(vpa, vpa)
+        assume1 = Assumption(vpa)
+        proofs = [
+            assume1,
+            Axiom1(vpa, vpa),
+            Axiom2(vpa, p, vpa),
+            ModusPonens(assume1, Axiom1(vpa, vpa)),
+            Generalization(assume1, Variable("x")),
+        ]
+        for proof in proofs:
+            self.assertFalse(hasattr(proof, "__dict__"))
+            self.assertLessEqual(sys.getsizeof(proof), PROOF_NODE_BYTES)
+        self.assertIs(Axiom1(vpa, vpa).assumption, Axiom2(vpa, p, vpa).assumption)
+        self.assertEqual(proofs[3].input["proof1"], assume1)
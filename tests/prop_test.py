@@ -0,0 +1,295 @@
+import sys
+
+sys.path.append(".")
+sys.path.append("./src")
+
+import copy
+import pickle
+import unittest
+
+from proof import Axiom1
+from prop import (
+    NODE_BYTES,
+    AndProp,
+    ExistProp,
+    ForallProp,
+    IIFProp,
+    ImplyProp,
+    NotProp,
+    OrProp,
+    VarProp,
+)
+from variable import Variable
+
+
+class PropTest(unittest.TestCase):
+    def test_unique(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        p1 = ImplyProp(NotProp(vpa), ForallProp(Variable("x"), vpb))
+        p2 = ImplyProp(NotProp(VarProp(Variable("a"))), ForallProp(Variable("x"), vpb))
+        self.assertIs(p1, p2)
+        self.assertIsNot(p1, ImplyProp(NotProp(vpb), ForallProp(Variable("x"), vpa)))
+
+    def test_unique_sharing(self):
+        vpa = VarProp(Variable("a"))
+        p = ImplyProp(vpa, vpa)
+        proof = Axiom1(p, p)
+        self.assertIs(proof.prop.left_child, proof.prop.right_child.right_child)
+
+    def test_unique_alias(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        p1 = AndProp(vpa, vpb)
+        p2 = NotProp(ImplyProp(vpa, NotProp(vpb)))
+        self.assertIs(p1, AndProp(vpa, vpb))
+        self.assertIsNot(p1, p2)
+        self.assertEqual(p1, p2)
+        self.assertEqual(NotProp(p1), NotProp(p2))
+
+    def test_unique_copy(self):
+        vpa = VarProp(Variable("a"))
+        p = ForallProp(Variable("x"), AndProp(vpa, NotProp(vpa)))
+        self.assertIs(copy.deepcopy(p), p)
+        self.assertIs(pickle.loads(pickle.dumps(p)), p)
+
+    def test_hash(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        p1 = ImplyProp(AndProp(vpa, vpb), vpb)
+        p2 = ImplyProp(NotProp(ImplyProp(vpa, NotProp(vpb))), vpb)
+        self.assertEqual(hash(p1), hash(p2))
+        self.assertNotEqual(hash(p2), hash(ImplyProp(vpb, vpa)))
+        cache = {p1: "p1", ImplyProp(vpb, vpa): "p3"}
+        self.assertEqual(cache[p2], "p1")
+        self.assertEqual(len({p1, p2, ImplyProp(vpa, vpb), ImplyProp(vpa, vpb)}), 2)
+
+    def test_eq_symmetric(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        p = AndProp(vpa, vpb)
+        q = p.eval()
+        self.assertTrue(p == q and q == p)
+        self.assertTrue(NotProp(q) == NotProp(p))
+        self.assertEqual(len({p, q}), 1)
+        self.assertEqual(len({q, p}), 1)
+        self.assertEqual({q: "q"}[p], "q")
+        self.assertEqual({p: "p"}[q], "p")
+        self.assertNotEqual(q, OrProp(vpa, vpb))
+
+    def test_node_bytes(self):
+        x = Variable("x")
+        vpa = VarProp(Variable("a"))
+        vpx = VarProp(x)
+        props = [
+            vpa,
+            NotProp(vpa),
+            ImplyProp(vpa, vpx),
+            ForallProp(x, vpx),
+            AndProp(vpa, vpx),
+            OrProp(vpa, vpx),
+            IIFProp(vpa, vpx),
+            ExistProp(x, vpx),
+        ]
+        for p in props:
+            self.assertFalse(hasattr(p, "__dict__"))
+            self.assertLessEqual(sys.getsizeof(p), NODE_BYTES)
+        self.assertFalse(hasattr(x, "__dict__"))
+
+    def test_vars(self):
+        x = Variable("x")
+        y = Variable("y")
+        vpx = VarProp(x)
+        p1 = ImplyProp(vpx, ForallProp(x, vpx))
+        p2 = ForallProp(y, NotProp(p1))
+        self.assertIs(x, Variable("x"))
+        self.assertEqual(p1.freevars, {x})
+        self.assertEqual(p1.boundedvars, {x})
+        self.assertEqual(p2.boundedvars, {x, y})
+        self.assertTrue(p2.isfree(x))
+        self.assertFalse(p2.isfree(y))
+        self.assertTrue(p2.isbounded(y))
+        self.assertFalse(ForallProp(x, vpx).isfree(x))
+
+    def test_many_vars(self):
+        vpa = VarProp(Variable("a"))
+        # Variables no longer used give their index back, so masks stay as
+        # narrow as the number of variables in use.
+        for i in range(100000):
+            ImplyProp(VarProp(Variable(f"v{i}")), vpa)
+        x = Variable("x")
+        p = ForallProp(x, ImplyProp(VarProp(x), vpa))
+        self.assertLess(x.index, 1000)
+        self.assertLessEqual(sys.getsizeof(p.child), NODE_BYTES)
+        self.assertLessEqual(sys.getsizeof(p.child._free), 200)
+        self.assertEqual(p.freevars, {Variable("a")})
+        self.assertEqual(p.boundedvars, {x})
+
+    def test_eval_cached(self):
+        x = Variable("x")
+        vpa = VarProp(Variable("a"))
+        vpx = VarProp(x)
+        p1 = ImplyProp(NotProp(vpa), ForallProp(x, vpx))
+        self.assertIs(p1.eval(), p1)
+        p2 = ImplyProp(p1, IIFProp(vpa, ExistProp(x, vpx)))
+        p3 = p2.eval()
+        self.assertIs(p2.eval(), p3)
+        self.assertIs(p3.eval(), p3)
+        self.assertIs(p3.left_child, p1)
+
+    def test_alias_lazy(self):
+        x = Variable("x")
+        vpa = VarProp(Variable("a"))
+        vpx = VarProp(x)
+        props = [
+            AndProp(vpa, vpx),
+            OrProp(vpa, vpx),
+            IIFProp(vpa, IIFProp(vpx, vpa)),
+            ExistProp(x, ImplyProp(vpa, vpx)),
+        ]
+        for p in props:
+            self.assertIsNone(p._prop)
+            self.assertEqual(hash(p), hash(p.prop))
+            self.assertEqual(hash(p), hash(p.eval()))
+            self.assertEqual(p.freevars, p.prop.freevars)
+            self.assertEqual(p.boundedvars, p.prop.boundedvars)
+            self.assertIs(p.eval(), p.prop.eval())
+
+    def test_shape(self):
+        x = Variable("x")
+        y = Variable("y")
+        vpa = VarProp(Variable("a"))
+        vpx = VarProp(x)
+        vpy = VarProp(y)
+        p = ImplyProp(vpa, ForallProp(x, ExistProp(y, ImplyProp(vpx, vpy))))
+        self.assertEqual(p.size, 7)
+        self.assertEqual(p.depth, 5)
+        self.assertEqual(p.quantifierdepth, 2)
+        self.assertEqual(p.atoms, {vpa, vpx, vpy})
+        self.assertTrue(p.hasalias)
+        self.assertFalse(p.eval().hasalias)
+        self.assertEqual(vpa.size, 1)
+        self.assertEqual(vpa.quantifierdepth, 0)
+        # Shared subformulas count once per occurrence.
+        q = ImplyProp(p, p)
+        self.assertEqual(q.size, 15)
+        self.assertEqual(q.depth, 6)
+        props = [
+            p,
+            AndProp(vpa, OrProp(vpx, vpa)),
+            IIFProp(IIFProp(vpa, vpx), ExistProp(x, vpx)),
+        ]
+        for p in props:
+            self.assertEqual(p.evalsize, p.eval().size)
+
+    def test_deep(self):
+        a = Variable("a")
+        x = Variable("x")
+        y = Variable("y")
+        vpa = VarProp(a)
+        vpx = VarProp(x)
+        p = vpx
+        q = vpx
+        for i in range(20000):
+            p = ImplyProp(vpa, ForallProp(x, p)) if i % 2 else AndProp(vpa, p)
+            q = ImplyProp(vpa, ForallProp(x, q)) if i % 2 else q
+            q = q if i % 2 else NotProp(ImplyProp(vpa, NotProp(q)))
+        self.assertIs(p.eval(), q)
+        self.assertEqual(p, q)
+        self.assertNotEqual(p, ImplyProp(vpa, q))
+        self.assertEqual(len(str(p)), len(str(q)) - 20000)
+        ps = p.substitute(x, y)
+        self.assertTrue(ps.isbounded(y))
+        self.assertFalse(ps.isbounded(x) or ps.isfree(x))
+        self.assertIs(ps.substitute(y, x), p)
+        self.assertIs(p.replacement(vpx, vpa).eval(), q.replacement(vpx, vpa))
+        self.assertEqual(p.size, 50001)
+        self.assertEqual(p.depth, 30001)
+        self.assertEqual(p.quantifierdepth, 10000)
+        self.assertEqual(p.evalsize, q.size)
+
+    def test_substitute_unchanged(self):
+        x = Variable("x")
+        vpa = VarProp(Variable("a"))
+        p = ImplyProp(vpa, ForallProp(x, NotProp(vpa)))
+        self.assertIs(p.substitute(Variable("y"), x), p)
+        self.assertIs(p.substitute(x, x), p)
+
+    def test_copy_on_write(self):
+        x = Variable("x")
+        y = Variable("y")
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        vpx = VarProp(x)
+        left = ForallProp(x, ImplyProp(vpa, vpx))
+        right = AndProp(NotProp(vpb), vpa)
+        p = ImplyProp(left, right)
+        p1 = p.substitute(x, y)
+        self.assertIs(p1.right_child, right)
+        self.assertIs(p1.left_child.child.left_child, vpa)
+        p2 = p.replacement(vpb, vpx)
+        self.assertIs(p2.left_child, left)
+        self.assertIs(p2.right_child.right_child, vpa)
+        self.assertIs(p.replacement(VarProp(y), vpa), p)
+        self.assertIs(p.replacement(p, vpa), vpa)
+        self.assertTrue(right.maycontain(vpb))
+        self.assertTrue(right.maycontain(NotProp(ImplyProp(NotProp(vpb), NotProp(vpa)))))
+
+    def test_substitutevars(self):
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        vpx = VarProp(x)
+        vpy = VarProp(y)
+        p = ImplyProp(vpx, vpy)
+        self.assertEqual(p.substitutevars({x: y, y: x}), (ImplyProp(vpy, vpx), True))
+        self.assertEqual(p.substitutevars({z: x, x: x}), (p, False))
+        # Bound occurrences are not substituted.
+        p1 = ImplyProp(vpx, ForallProp(x, vpx))
+        p2, changed = p1.substitutevars({x: z})
+        self.assertTrue(changed)
+        self.assertIs(p2, ImplyProp(VarProp(z), ForallProp(x, vpx)))
+        # The binder y is renamed so that it does not capture the new y.
+        p3, _ = ForallProp(y, ImplyProp(vpx, vpy)).substitutevars({x: y})
+        self.assertIsNot(p3.variable, y)
+        self.assertIs(p3.child, ImplyProp(vpy, VarProp(p3.variable)))
+        p4, _ = ExistProp(y, vpx).substitutevars({x: y})
+        self.assertIs(p4, ExistProp(p4.variable, vpy))
+        self.assertIsNot(p4.variable, y)
+        p5 = vpx
+        for _ in range(20000):
+            p5 = ForallProp(z, ImplyProp(vpy, p5))
+        p6, changed = p5.substitutevars({x: z, y: x})
+        self.assertTrue(changed)
+        self.assertEqual(p6.freevars, {z, x})
+        self.assertEqual(len(p6.boundedvars), 1)
+
+    def test_alpha(self):
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        vpx = VarProp(x)
+        vpy = VarProp(y)
+        vpz = VarProp(z)
+        p1 = ForallProp(x, ImplyProp(vpx, vpz))
+        p2 = ForallProp(y, ImplyProp(vpy, vpz))
+        self.assertIsNot(p1, p2)
+        self.assertTrue(p1.alphaeq(p2))
+        self.assertEqual(p1.alphahash(), p2.alphahash())
+        self.assertFalse(p1.alphaeq(ForallProp(y, ImplyProp(vpx, vpz))))
+        self.assertFalse(p1.alphaeq(ForallProp(z, ImplyProp(vpz, vpz))))
+        # Nested binders are told apart by their indices.
+        q1 = ForallProp(x, ForallProp(y, ImplyProp(vpx, vpy)))
+        q2 = ForallProp(y, ForallProp(x, ImplyProp(vpy, vpx)))
+        q3 = ForallProp(y, ForallProp(x, ImplyProp(vpx, vpy)))
+        self.assertTrue(q1.alphaeq(q2))
+        self.assertFalse(q1.alphaeq(q3))
+        self.assertTrue(q1.alphaeq(q1.alphakey()))
+        self.assertIs(q1.alphakey().alphakey(), q1.alphakey())
+        # Keys are taken on the eval() form.
+        e1 = ExistProp(x, AndProp(vpx, vpz))
+        e2 = NotProp(ForallProp(y, NotProp(NotProp(ImplyProp(vpy, NotProp(vpz))))))
+        self.assertTrue(e1.alphaeq(e2))
+        self.assertIs(ImplyProp(vpx, vpz).alphakey(), ImplyProp(vpx, vpz))
+        cache = {p1.alphakey(): "p1"}
+        self.assertEqual(cache[p2.alphakey()], "p1")
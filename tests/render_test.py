@@ -0,0 +1,84 @@
+import sys
+
+sys.path.append(".")
+sys.path.append("./src")
+
+import io
+import unittest
+
+from proof import Assumption, Axiom1, Axiom2, Generalization, ModusPonens
+from prop import ForallProp, ImplyProp, NotProp, VarProp
+from render import cached, render, write
+from syntax import parse
+from theorem import MultiDeduction, Reflexive, Replacement, Transitive
+from variable import Variable
+
+
+class RenderTest(unittest.TestCase):
+    def test_plain(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        p = ImplyProp(vpa, NotProp(vpb))
+        proof = Reflexive(p).proof
+        self.assertEqual(render(p), str(p))
+        self.assertEqual(render(proof), str(proof))
+        self.assertEqual(
+            str(Generalization(Axiom1(vpa, vpb), Variable("x"))),
+            "Generalization(Axiom1(a, b), x)",
+        )
+        self.assertEqual(render(Reflexive(vpa)), "Reflexive(a)")
+        assumes = [Assumption(vpa), Assumption(ImplyProp(vpa, vpb))]
+        theorem = MultiDeduction(assumes, ModusPonens(*assumes))
+        text = "MultiDeduction([Assumption[a], Assumption[(a=>b)]], ModusPonens(Assumption[a], Assumption[(a=>b)]))"
+        self.assertEqual(render(theorem), text)
+        self.assertEqual(str(theorem), text)
+        theorems = [
+            Reflexive(vpa),
+            Transitive(Axiom1(vpa, vpb), Reflexive(ImplyProp(vpb, vpa)).proof),
+            Replacement(vpa, vpb, ImplyProp(vpa, NotProp(vpa))),
+        ]
+        for theorem in theorems:
+            self.assertEqual(render(theorem), str(theorem))
+        self.assertEqual(str(Reflexive(vpa)), "Reflexive(a)")
+        self.assertEqual(cached(p), str(p))
+        sink = io.StringIO()
+        self.assertEqual(write(proof, sink), len(str(proof)))
+        self.assertEqual(sink.getvalue(), str(proof))
+
+    def test_limits(self):
+        vpa = VarProp(Variable("a"))
+        p = vpa
+        for _ in range(20000):
+            p = ImplyProp(vpa, NotProp(p))
+        text = render(p, maxlen=100)
+        self.assertEqual(text, str(p)[:100] + "...")
+        self.assertEqual(render(p, maxdepth=3), "(a=>!(a=>!...))")
+        self.assertEqual(render(p, maxdepth=0), "(...=>...)")
+
+    def test_share(self):
+        vpa = VarProp(Variable("a"))
+        p = vpa
+        for _ in range(40):
+            p = Axiom2(p, p, p).prop
+        text = render(p, share=True)
+        self.assertLess(len(text), 5000)
+        lines = text.splitlines()
+        self.assertEqual(lines[0], "let #1 = (a=>a)")
+        # Expanding the definitions gives back the prop.
+        defs = {}
+        for line in lines[:2]:
+            name, body = line[4:].split(" = ")
+            for k in sorted(defs, key=len, reverse=True):
+                body = body.replace(k, defs[k])
+            defs[name] = body
+        q = Axiom2(vpa, vpa, vpa).prop
+        self.assertIs(parse(defs["#2"]), q)
+        # Variables are never named.
+        q = ForallProp(Variable("x"), ImplyProp(vpa, vpa))
+        self.assertEqual(render(q, share=True), str(q))
+        proof = Reflexive(vpa).proof
+        self.assertEqual(
+            render(proof, share=True),
+            "let #1 = (a=>a)\n"
+            "ModusPonens(Axiom1(a, a), ModusPonens(Axiom1(a, #1), Axiom2(a, #1, a)))",
+        )
@@ -0,0 +1,163 @@
+import sys
+
+sys.path.append(".")
+sys.path.append("./src")
+
+import itertools
+import random
+import unittest
+
+import truthtable
+from proof import Axiom1, Axiom2, Axiom3
+from prop import AndProp, ForallProp, ImplyProp, NotProp, OrProp, VarProp
+from sat import Encoder, Solver, _luby, countermodel, isvalid
+from variable import Variable
+
+
+def satisfiable(n, clauses):
+    for values in itertools.product([False, True], repeat=n):
+        if all(any((lit > 0) == values[abs(lit) - 1] for lit in c) for c in clauses):
+            return True
+    return False
+
+
+def evaluate(p, model):
+    """Value of p under model, a dict from atoms to bools."""
+    done = {}
+    stack = [p.eval()]
+    while stack:
+        node = stack.pop()
+        if id(node) in done:
+            continue
+        if isinstance(node, VarProp):
+            done[id(node)] = model[node]
+            continue
+        missing = [c for c in node.children() if id(c) not in done]
+        if missing:
+            stack.append(node)
+            stack.extend(missing)
+        elif isinstance(node, NotProp):
+            done[id(node)] = not done[id(node.child)]
+        else:
+            left = done[id(node.left_child)]
+            done[id(node)] = not left or done[id(node.right_child)]
+    return done[id(p.eval())]
+
+
+class SolverTest(unittest.TestCase):
+    def test_luby(self):
+        self.assertEqual(
+            [_luby(i) for i in range(1, 16)],
+            [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8],
+        )
+
+    def test_random(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            n = rng.randint(1, 8)
+            clauses = [
+                [rng.choice([1, -1]) * rng.randint(1, n) for _ in range(rng.randint(1, 3))]
+                for _ in range(rng.randint(1, 40))
+            ]
+            solver = Solver()
+            for _ in range(n):
+                solver.newvar()
+            for c in clauses:
+                solver.addclause(c)
+            for _ in range(3):
+                assumptions = [rng.choice([1, -1]) * rng.randint(1, n) for _ in range(2)]
+                expected = satisfiable(n, clauses + [[lit] for lit in assumptions])
+                self.assertEqual(solver.solve(assumptions), expected)
+                if expected:
+                    for c in clauses + [[lit] for lit in assumptions]:
+                        self.assertTrue(any((lit > 0) == solver.model[abs(lit)] for lit in c))
+            self.assertEqual(solver.solve(), satisfiable(n, clauses))
+
+    def test_pigeonhole(self):
+        # 6 pigeons in 5 holes needs clause learning to refute quickly.
+        solver = Solver()
+        holes = 5
+        v = {(i, j): solver.newvar() for i in range(holes + 1) for j in range(holes)}
+        for i in range(holes + 1):
+            solver.addclause([v[i, j] for j in range(holes)])
+        for j in range(holes):
+            for a in range(holes + 1):
+                for b in range(a + 1, holes + 1):
+                    solver.addclause([-v[a, j], -v[b, j]])
+        self.assertFalse(solver.solve())
+        self.assertFalse(solver.addclause([v[0, 0]]))
+
+    def test_errors(self):
+        solver = Solver()
+        x = solver.newvar()
+        with self.assertRaises(ValueError):
+            solver.addclause([x, 2])
+        with self.assertRaises(ValueError):
+            solver.addclause([0])
+        self.assertTrue(solver.addclause([x, -x]))
+        self.assertTrue(solver.addclause([x]))
+        self.assertFalse(solver.solve([-x]))
+        self.assertTrue(solver.solve())
+        self.assertFalse(solver.addclause([-x]))
+        self.assertFalse(solver.solve())
+
+
+class EncoderTest(unittest.TestCase):
+    def test_axioms(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        vpc = VarProp(Variable("c"))
+        encoder = Encoder()
+        for proof in [
+            Axiom1(vpa, vpb),
+            Axiom2(vpa, vpb, vpc),
+            Axiom3(vpa, NotProp(vpb)),
+        ]:
+            self.assertTrue(encoder.isvalid(proof.prop))
+        p = ImplyProp(ImplyProp(vpa, vpb), vpa)
+        self.assertEqual(encoder.countermodel(p), {vpa: False, vpb: False})
+        # Shared subformulas are encoded once: only (p => !p) is new.
+        nvars = encoder.solver.nvars
+        encoder.lit(AndProp(p, p))
+        self.assertEqual(encoder.solver.nvars, nvars + 1)
+        self.assertEqual(encoder.lit(NotProp(p)), -encoder.lit(p))
+        with self.assertRaises(ValueError):
+            encoder.lit(ForallProp(Variable("x"), vpa))
+
+    def test_random(self):
+        rng = random.Random(1)
+        vps = [VarProp(Variable(f"v{i}")) for i in range(5)]
+
+        def random_prop(depth):
+            if depth == 0 or rng.random() < 0.2:
+                return rng.choice(vps)
+            r = rng.random()
+            if r < 0.2:
+                return NotProp(random_prop(depth - 1))
+            cls = ImplyProp if r < 0.6 else AndProp if r < 0.8 else OrProp
+            return cls(random_prop(depth - 1), random_prop(depth - 1))
+
+        encoder = Encoder()
+        for _ in range(100):
+            p = random_prop(5)
+            self.assertEqual(encoder.isvalid(p), truthtable.istautology(p))
+            model = countermodel(p)
+            if model is not None:
+                self.assertFalse(evaluate(p, model))
+
+    def test_many_atoms(self):
+        # (a0 => a1) /\ ... /\ (a298 => a299) entails a0 => a299.
+        n = 300
+        vps = [VarProp(Variable(f"a{i}")) for i in range(n)]
+        chain = ImplyProp(vps[0], vps[1])
+        for i in range(1, n - 1):
+            chain = AndProp(chain, ImplyProp(vps[i], vps[i + 1]))
+        self.assertTrue(isvalid(ImplyProp(chain, ImplyProp(vps[0], vps[-1]))))
+        p = ImplyProp(chain, ImplyProp(vps[-1], vps[0]))
+        model = countermodel(p)
+        self.assertEqual(len(model), n)
+        self.assertFalse(evaluate(p, model))
+
+
+if __name__ == "__main__":
+    unittest.main()
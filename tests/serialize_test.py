@@ -0,0 +1,87 @@
+import sys
+
+sys.path.append(".")
+sys.path.append("./src")
+
+import io
+import os
+import tempfile
+import unittest
+
+from proof import Axiom2
+from prop import (
+    AndProp,
+    ExistProp,
+    ForallProp,
+    IIFProp,
+    ImplyProp,
+    NotProp,
+    OrProp,
+    VarProp,
+)
+from serialize import dump, dumps, load, loads
+from syntax import iterparse, parse
+from variable import Variable
+
+
+class SerializeTest(unittest.TestCase):
+    def test_roundtrip(self):
+        x = Variable("x")
+        vpa = VarProp(Variable("a"))
+        vpx = VarProp(x)
+        props = [
+            vpa,
+            NotProp(vpa),
+            ImplyProp(vpa, vpx),
+            ForallProp(x, ImplyProp(vpx, vpa)),
+            AndProp(vpa, NotProp(vpx)),
+            OrProp(NotProp(vpa), vpx),
+            IIFProp(vpa, IIFProp(vpx, vpa)),
+            ExistProp(Variable("α"), NotProp(ForallProp(x, vpx))),
+        ]
+        data = dumps(props)
+        self.assertEqual(len(loads(data)), len(props))
+        for p, q in zip(props, loads(data)):
+            self.assertIs(p, q)
+        self.assertEqual(loads(memoryview(data)), props)
+        self.assertEqual(loads(dumps([])), [])
+
+    def test_sharing(self):
+        p = VarProp(Variable("a"))
+        for _ in range(30):
+            p = Axiom2(p, p, p).prop
+        data = dumps([p, p])
+        self.assertLess(len(data), 500)
+        self.assertEqual(loads(data), [p, p])
+
+    def test_transient(self):
+        # Props built on the fly and dropped once written are not mistaken
+        # for later props that get the same id().
+        texts = [f"(p{i}=>q{i})" for i in range(200)]
+        props = loads(dumps(parse(t) for t in texts))
+        self.assertEqual([str(p) for p in props], texts)
+        props = loads(dumps(iterparse(io.StringIO("\n".join(texts)))))
+        self.assertEqual([str(p) for p in props], texts)
+
+    def test_deep(self):
+        vpa = VarProp(Variable("a"))
+        p = vpa
+        for _ in range(20000):
+            p = ImplyProp(vpa, NotProp(p))
+        self.assertIs(loads(dumps([p]))[0], p)
+
+    def test_file(self):
+        p = ForallProp(Variable("x"), ImplyProp(VarProp(Variable("x")), NotProp(VarProp(Variable("b")))))
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            dump([p, NotProp(p)], path)
+            self.assertEqual(load(path), [p, NotProp(p)])
+        finally:
+            os.remove(path)
+
+    def test_errors(self):
+        data = dumps([ImplyProp(VarProp(Variable("a")), VarProp(Variable("b")))])
+        for bad in [b"", b"FOL", data[:-1], data[:6], data[:4] + b"\x20", data[:4] + b"\x08\x05"]:
+            with self.assertRaises(ValueError):
+                loads(bad)
@@ -0,0 +1,64 @@
+import sys
+
+sys.path.append(".")
+sys.path.append("./src")
+
+import io
+import unittest
+
+from prop import (
+    AndProp,
+    ExistProp,
+    ForallProp,
+    IIFProp,
+    ImplyProp,
+    NotProp,
+    OrProp,
+    VarProp,
+)
+from syntax import iterparse, parse
+from variable import Variable
+
+
+class SyntaxTest(unittest.TestCase):
+    def test_roundtrip(self):
+        x = Variable("x")
+        vpa = VarProp(Variable("a"))
+        vpx = VarProp(x)
+        props = [
+            vpa,
+            NotProp(NotProp(vpa)),
+            ImplyProp(vpa, vpx),
+            ForallProp(x, ImplyProp(vpx, vpa)),
+            AndProp(vpa, NotProp(vpx)),
+            OrProp(NotProp(vpa), vpx),
+            IIFProp(vpa, IIFProp(vpx, vpa)),
+            ExistProp(x, NotProp(ForallProp(Variable("y_1"), vpx))),
+        ]
+        for p in props:
+            self.assertIs(parse(str(p)), p)
+        self.assertIs(parse(" ( a =>\n!x ) "), ImplyProp(vpa, NotProp(vpx)))
+
+    def test_deep(self):
+        vpa = VarProp(Variable("a"))
+        p = vpa
+        for _ in range(20000):
+            p = ImplyProp(vpa, NotProp(p))
+        self.assertIs(parse(str(p)), p)
+
+    def test_errors(self):
+        bad = ["", "(a)", "a=>b", "(a=>b", "(a=>b))", "(a b)", "!", "(a=>b=>c)", "#0"]
+        for text in bad:
+            with self.assertRaises(ValueError):
+                parse(text)
+
+    def test_iterparse(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        stream = io.StringIO("(a=>\nb) !a\n\n(forall x,\nb)a\n")
+        self.assertEqual(
+            list(iterparse(stream)),
+            [ImplyProp(vpa, vpb), NotProp(vpa), ForallProp(Variable("x"), vpb), vpa],
+        )
+        with self.assertRaises(ValueError):
+            list(iterparse(["(a=>b) (a"]))
@@ -4,8 +4,10 @@ sys.path.append(".")
 sys.path.append("./src")
 
 import unittest
+from functools import partial
 
-from proof import Assumption, Axiom1, ModusPonens, Proof
+import theorem
+from proof import Assumption, Axiom1, Axiom4, Generalization, ModusPonens, Proof
 from prop import (
     AndProp,
     ExistProp,
@@ -54,6 +56,7 @@ from theorem import (
     ImplyExchange,
     ImplyIIFExchange,
     ImplyNotExchange,
+    MultiDeduction,
     NotAndToOrNot,
     NotExistToForallNot,
     NotForallToExistNot,
@@ -130,6 +133,120 @@ class TheoremTest(unittest.TestCase):
 
         self.assertEqual(proof2, target)
 
+    def test_Deduction_shared(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        assume1 = Assumption(vpa)
+        # Each step uses the previous one twice: 2^40 steps as a tree.
+        proof1 = assume1
+        for _ in range(40):
+            proof1 = ModusPonens(proof1, ModusPonens(proof1, Axiom1(vpa, vpa)))
+        proof2 = Deduction(assume1, proof1).proof
+        self.assertEqual(proof2, Proof(ImplyProp(vpa, vpa)))
+        self.assertFalse(proof2.assumption)
+        self.assertLess(proof2.steps()[1], 200)
+        # Deeper than the recursion limit.
+        proof3 = assume1
+        for _ in range(2000):
+            proof3 = ModusPonens(proof3, Axiom1(proof3.prop, vpb))
+        proof4 = Deduction(assume1, proof3).proof
+        self.assertEqual(proof4, Proof(ImplyProp(vpa, proof3.prop)))
+        self.assertFalse(proof4.assumption)
+
+    def test_Deduction_compact(self):
+        x = Variable("x")
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        vpx = VarProp(x)
+        assume1 = Assumption(vpa)
+        assume2 = Assumption(ImplyProp(vpa, vpb))
+        # eta: a => b is assume2 itself, where the plain proof takes 11 steps.
+        proof1 = ModusPonens(assume1, assume2)
+        self.assertIs(Deduction(assume1, proof1, compact=True).proof, assume2)
+        self.assertEqual(Deduction(assume1, proof1).proof.steps(), (11, 11))
+        # a, proved again from a => a, is discharged by Reflexive.
+        proof2 = ModusPonens(assume1, Reflexive(vpa).proof)
+        proof3 = Deduction(assume1, proof2, compact=True).proof
+        self.assertIs(proof3, Reflexive(vpa).proof)
+        builds = [
+            lambda: ForallImplyToImplyExist(vpx, vpb, x),
+            lambda: ForallIIFExchange(vpx, vpa, x),
+            lambda: ImplyIIFExchange(vpa, vpb, vpx, NotProp(vpa)),
+            lambda: Replacement(vpa, vpb, ImplyProp(vpa, NotProp(vpa))),
+        ]
+        for build in builds:
+            plain = build().proof
+            theorem.Deduction = partial(Deduction, compact=True)
+            theorem.MultiDeduction = partial(MultiDeduction, compact=True)
+            try:
+                compact = build().proof
+            finally:
+                theorem.Deduction = Deduction
+                theorem.MultiDeduction = MultiDeduction
+            self.assertIs(compact.prop, plain.prop)
+            self.assertEqual(compact.assumption, plain.assumption)
+            self.assertLess(compact.steps()[1], plain.steps()[1])
+
+    def test_MultiDeduction(self):
+        x = Variable("x")
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        vpc = VarProp(Variable("c"))
+        vpx = VarProp(x)
+        assume1 = Assumption(vpa)
+        assume2 = Assumption(ImplyProp(vpa, vpb))
+        assume3 = Assumption(ImplyProp(vpb, vpc))
+        assume4 = Assumption(ForallProp(x, ImplyProp(vpa, vpx)))
+        proof1 = ModusPonens(ModusPonens(assume1, assume2), assume3)
+        proof2 = ModusPonens(
+            assume1, ModusPonens(assume4, Axiom4(ImplyProp(vpa, vpx), x, x))
+        )
+        proof3 = Generalization(proof2, x)
+        # x is free in x => b, which the generalized subproof is not based on.
+        assume7 = Assumption(vpc)
+        assume8 = Assumption(ImplyProp(vpx, vpb))
+        assume9 = Assumption(ImplyProp(vpc, vpa))
+        proof5 = Generalization(ModusPonens(assume7, assume9), x)
+        cases = [
+            ([assume1, assume2, assume3], proof1),
+            ([assume3, assume1], proof1),
+            ([assume2, assume1, assume2], proof1),
+            ([assume1, assume4], proof3),
+            ([assume7, assume8, assume9], proof5),
+            ([assume8, assume1, assume2, assume9, assume7], proof5),
+            ([], proof1),
+        ]
+        for assumes, proof in cases:
+            nested = proof
+            for assume in reversed(assumes):
+                nested = Deduction(assume, nested).proof
+            output = MultiDeduction(assumes, proof).proof
+            self.assertIs(output.prop, nested.prop)
+            self.assertEqual(output.assumption, nested.assumption)
+            self.assertLessEqual(output.steps()[1], nested.steps()[1])
+            compact = MultiDeduction(assumes, proof, compact=True).proof
+            self.assertIs(compact.prop, nested.prop)
+            self.assertEqual(compact.assumption, nested.assumption)
+            self.assertLessEqual(compact.steps()[1], output.steps()[1])
+        # eta: b => (a => b) is Axiom1 itself, then put under a.
+        proof6 = Axiom1(vpb, vpa)
+        output = MultiDeduction(
+            [assume1, Assumption(vpb)], ModusPonens(Assumption(vpb), proof6), compact=True
+        ).proof
+        self.assertIs(output, ModusPonens(proof6, Axiom1(proof6.prop, vpa)))
+        assume6 = Assumption(vpx)
+        for compact in (False, True):
+            with self.assertRaises(ValueError):
+                MultiDeduction([assume1, assume6], Generalization(assume6, x), compact=compact)
+        # Deeper than the recursion limit.
+        assume5 = Assumption(vpb)
+        proof4 = assume1
+        for _ in range(1000):
+            proof4 = ModusPonens(assume5, ModusPonens(proof4, Axiom1(vpa, vpb)))
+        output = MultiDeduction([assume5, assume1], proof4).proof
+        self.assertIs(output.prop, ImplyProp(vpb, ImplyProp(vpa, vpa)))
+        self.assertFalse(output.assumption)
+
     def test_ImplyExchange(self):
         vpa = VarProp(Variable("a"))
         vpb = VarProp(Variable("b"))
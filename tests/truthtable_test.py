@@ -0,0 +1,85 @@
+import sys
+
+sys.path.append(".")
+sys.path.append("./src")
+
+import unittest
+
+from proof import Axiom1, Axiom2, Axiom3
+from prop import AndProp, ForallProp, IIFProp, ImplyProp, NotProp, OrProp, VarProp
+from truthtable import (
+    atoms,
+    column,
+    countermodel,
+    equivalent,
+    issatisfiable,
+    istautology,
+    table,
+    tables,
+)
+from variable import Variable
+
+
+class TruthTableTest(unittest.TestCase):
+    def test_column(self):
+        self.assertEqual(column(0, 3), 0b10101010)
+        self.assertEqual(column(1, 3), 0b11001100)
+        self.assertEqual(column(2, 3), 0b11110000)
+        self.assertEqual(column(0, 1), 0b10)
+        with self.assertRaises(ValueError):
+            column(3, 3)
+
+    def test_table(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        self.assertEqual(atoms(ImplyProp(vpa, ImplyProp(vpb, vpa))), [vpa, vpb])
+        self.assertEqual(table(vpa), 0b10)
+        self.assertEqual(table(NotProp(vpa)), 0b01)
+        self.assertEqual(table(ImplyProp(vpa, vpb)), 0b1101)
+        self.assertEqual(table(AndProp(vpa, vpb)), 0b1000)
+        self.assertEqual(table(OrProp(vpa, vpb)), 0b1110)
+        self.assertEqual(table(IIFProp(vpa, vpb)), 0b1001)
+        self.assertEqual(table(OrProp(vpa, vpb), [vpb, vpa]), 0b1110)
+        self.assertEqual(tables([vpa, vpb]), [0b1010, 0b1100])
+        with self.assertRaises(ValueError):
+            table(ImplyProp(vpa, vpb), [vpa])
+        with self.assertRaises(ValueError):
+            table(ForallProp(Variable("x"), vpa))
+
+    def test_tautology(self):
+        vpa = VarProp(Variable("a"))
+        vpb = VarProp(Variable("b"))
+        vpc = VarProp(Variable("c"))
+        for proof in [
+            Axiom1(vpa, vpb),
+            Axiom2(vpa, vpb, vpc),
+            Axiom3(vpa, NotProp(vpb)),
+        ]:
+            self.assertTrue(istautology(proof.prop))
+            self.assertIsNone(countermodel(proof.prop))
+        p = ImplyProp(ImplyProp(vpa, vpb), vpa)
+        self.assertFalse(istautology(p))
+        self.assertEqual(countermodel(p), {vpa: False, vpb: False})
+        self.assertTrue(issatisfiable(p))
+        self.assertFalse(issatisfiable(AndProp(vpa, NotProp(vpa))))
+        self.assertTrue(equivalent(ImplyProp(vpa, vpb), OrProp(NotProp(vpa), vpb)))
+        self.assertFalse(equivalent(ImplyProp(vpa, vpb), ImplyProp(vpb, vpa)))
+
+    def test_many_atoms(self):
+        # (a0 /\ ... /\ a21) => (a21 \/ a0), over 2^22 rows.
+        vps = [VarProp(Variable(f"a{i}")) for i in range(22)]
+        conj = vps[0]
+        for vp in vps[1:]:
+            conj = AndProp(conj, vp)
+        p = ImplyProp(conj, OrProp(vps[-1], vps[0]))
+        self.assertTrue(istautology(p))
+        q = ImplyProp(OrProp(vps[-1], vps[0]), conj)
+        model = countermodel(q)
+        self.assertIsNotNone(model)
+        self.assertEqual(len(model), 22)
+        self.assertTrue(model[vps[0]] or model[vps[-1]])
+        self.assertFalse(all(model.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()